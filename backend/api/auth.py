@@ -7,28 +7,35 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.cache import LRUCache
 from core.config import settings
 from core.database import get_db
+from core.pubsub import pubsub_hub
+from core.redis import redis_client
 from core.security import (
     create_access_token,
     create_refresh_token,
     decode_token,
-    get_password_hash,
-    verify_password,
 )
 from models.user import User
 from schemas.auth import Token, TokenRefresh, UserCreate, UserResponse
+from services.password_hasher import HasherBusyError, password_hasher
 
 router = APIRouter()
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
+# user_id -> authenticated user (detached from its session), per worker
+user_cache: LRUCache[int, User] = LRUCache(
+    settings.auth_user_cache_size,
+    ttl=settings.auth_user_cache_ttl,
+)
 
-async def get_current_user(
-    token: Annotated[str, Depends(oauth2_scheme)],
-    db: Annotated[AsyncSession, Depends(get_db)],
-) -> User:
-    """Get the current authenticated user from JWT token."""
+# Workers drop a user from their cache when its id is published here
+USER_INVALIDATION_CHANNEL = "auth:user-invalidated"
+
+
+async def _authenticate(token: str, db: AsyncSession, cached: bool) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -43,13 +50,72 @@ async def get_current_user(
     if user_id is None:
         raise credentials_exception
     
+    if cached:
+        user = user_cache.get(int(user_id))
+        if user is not None:
+            return user
+    
     user = await User.get_by_id(db, int(user_id))
     if user is None:
         raise credentials_exception
     
+    if cached:
+        user_cache.set(user.id, user)
     return user
 
 
+async def get_current_user(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+) -> User:
+    """
+    Get the current authenticated user from JWT token.
+
+    The user comes from a short-lived per-worker cache when possible, so
+    read-only endpoints stay off the database. The same instance may be
+    shared by concurrent requests: endpoints that modify the user must use
+    get_current_user_for_update instead.
+    """
+    return await _authenticate(token, db, cached=True)
+
+
+async def get_current_user_for_update(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+) -> User:
+    """
+    Get the current user freshly loaded in this request's session.
+
+    Call invalidate_user() after committing changes to it.
+    """
+    return await _authenticate(token, db, cached=False)
+
+
+async def invalidate_user(user_id: int) -> None:
+    """Drop a user's cached principal on this and every other worker."""
+    user_cache.pop(user_id)
+    try:
+        await redis_client.publish(USER_INVALIDATION_CHANNEL, str(user_id))
+    except Exception as e:
+        print(f"⚠️ Could not publish user invalidation: {e}")
+
+
+def _on_user_invalidated(channel: str, data: str) -> None:
+    user_cache.pop(int(data))
+
+
+pubsub_hub.add(USER_INVALIDATION_CHANNEL, _on_user_invalidated)
+pubsub_hub.subscribe(USER_INVALIDATION_CHANNEL)
+
+
+def _hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many sign-in attempts, please retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def register(
     user_data: UserCreate,
@@ -65,7 +131,10 @@ async def register(
         )
     
     # Create user
-    hashed_password = get_password_hash(user_data.password)
+    try:
+        hashed_password = await password_hasher.hash(user_data.password)
+    except HasherBusyError:
+        raise _hasher_busy()
     user = User(
         email=user_data.email,
         username=user_data.username,
@@ -86,7 +155,14 @@ async def login(
     """Login and get access token."""
     user = await User.get_by_email(db, form_data.username)
     
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    try:
+        verified = user is not None and await password_hasher.verify(
+            form_data.password, user.hashed_password
+        )
+    except HasherBusyError:
+        raise _hasher_busy()
+    
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -136,6 +212,12 @@ async def refresh_token(
     }
 
 
+@router.get("/stats")
+async def auth_stats() -> dict:
+    """Password hashing queue depth and rejections for this worker."""
+    return {"password_hasher": password_hasher.stats()}
+
+
 @router.get("/me", response_model=UserResponse)
 async def get_me(
     current_user: Annotated[User, Depends(get_current_user)],
@@ -2,9 +2,14 @@
 Kalshi API Routes
 Endpoints for prediction market data
 """
+import json
+import time
 from fastapi import APIRouter, HTTPException, Query
 from typing import List, Dict, Any, Optional
-from services.kalshi_service import get_kalshi_markets, get_kalshi_events, kalshi_client
+from services.kalshi_service import kalshi_client
+from services.kalshi_snapshot import kalshi_snapshot
+from core.redis import redis_client
+from services.arbitrage_engine import OPPORTUNITIES_KEY
 
 router = APIRouter(prefix="/api/v1/kalshi", tags=["kalshi"])
 
@@ -12,19 +17,25 @@ router = APIRouter(prefix="/api/v1/kalshi", tags=["kalshi"])
 @router.get("/markets")
 async def get_markets(
     limit: int = Query(50, ge=1, le=200),
-    category: Optional[str] = None
+    category: Optional[str] = None,
+    expires_within_hours: Optional[float] = Query(None, gt=0)
 ) -> Dict[str, Any]:
     """
     Get live Kalshi prediction markets
     
-    Returns markets with current prices, volume, and metadata
+    Returns markets with current prices, volume, and metadata, served from
+    the in-memory snapshot (see services/kalshi_snapshot.py)
     """
     try:
-        markets = get_kalshi_markets(limit=limit)
+        expires_before = None
+        if expires_within_hours is not None:
+            expires_before = time.time() + expires_within_hours * 3600
         
-        # Filter by category if specified
-        if category and category != "All":
-            markets = [m for m in markets if m.get("category", "").lower() == category.lower()]
+        markets = await kalshi_snapshot.markets(
+            limit=limit,
+            category=category if category != "All" else None,
+            expires_before=expires_before,
+        )
         
         return {
             "success": True,
@@ -41,13 +52,17 @@ async def get_market(ticker: str) -> Dict[str, Any]:
     Get a specific Kalshi market by ticker
     """
     try:
-        market = kalshi_client.get_market(ticker)
-        if not market:
-            raise HTTPException(status_code=404, detail=f"Market {ticker} not found")
+        market = await kalshi_snapshot.market(ticker)
+        if market is None:
+            # Not open (or newer than the snapshot): ask Kalshi directly
+            live = await kalshi_client.get_market(ticker)
+            if not live:
+                raise HTTPException(status_code=404, detail=f"Market {ticker} not found")
+            market = kalshi_client.format_market_for_arb(live)
         
         return {
             "success": True,
-            "market": kalshi_client.format_market_for_arb(market)
+            "market": market
         }
     except HTTPException:
         raise
@@ -63,7 +78,7 @@ async def get_events(
     Get Kalshi events (market categories/groupings)
     """
     try:
-        events = get_kalshi_events(limit=limit)
+        events = await kalshi_snapshot.events(limit=limit)
         return {
             "success": True,
             "count": len(events),
@@ -78,72 +93,39 @@ async def get_arbitrage_opportunities(
     limit: int = Query(20, ge=1, le=50)
 ) -> Dict[str, Any]:
     """
-    Get potential arbitrage opportunities
+    Get current arbitrage opportunities
     
-    Compares Kalshi prices with known Polymarket prices
-    to find spreads that could be profitable
+    Spreads between matched Kalshi and Polymarket contracts, as maintained
+    by the arbitrage scanner (workers/arbitrage_scanner.py), largest
+    fee-adjusted edge first
     """
     try:
-        kalshi_markets = get_kalshi_markets(limit=100)
-        
-        # Mock Polymarket data for comparison (in production, fetch from Polymarket API)
-        # Polymarket uses CLOB system - we'd need to query their GraphQL API
-        opportunities = []
-        
-        for market in kalshi_markets[:limit]:
-            kalshi_yes = market.get("kalshi", {}).get("yes", 0.5)
-            
-            # Simulate Polymarket price (in production, fetch real data)
-            # Adding small random spread for demo
-            import random
-            poly_spread = random.uniform(-0.05, 0.05)
-            poly_yes = max(0.01, min(0.99, kalshi_yes + poly_spread))
-            
-            spread = abs(kalshi_yes - poly_yes) * 100
-            
-            if spread >= 2.0:  # Only show opportunities with 2%+ spread
-                opportunities.append({
-                    "id": market.get("id"),
-                    "event": market.get("event"),
-                    "category": market.get("category"),
-                    "kalshi": {
-                        "yes": round(kalshi_yes, 2),
-                        "volume": market.get("kalshi", {}).get("volume", 0)
-                    },
-                    "polymarket": {
-                        "yes": round(poly_yes, 2),
-                        "volume": f"{random.randint(100, 5000)}K"  # Mock for now
-                    },
-                    "spread": round(spread, 1),
-                    "profit": f"${int(spread * 10)} per $1000",
-                    "confidence": "High" if spread >= 4 else "Medium" if spread >= 3 else "Low",
-                    "expiry": market.get("expiry")
-                })
-        
-        # Sort by spread (highest first)
-        opportunities.sort(key=lambda x: x["spread"], reverse=True)
+        cached = await redis_client.get(OPPORTUNITIES_KEY)
+        opportunities = json.loads(cached) if cached else []
         
         return {
             "success": True,
-            "count": len(opportunities),
+            "count": len(opportunities[:limit]),
             "opportunities": opportunities[:limit]
         }
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error calculating arbitrage: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error fetching arbitrage opportunities: {str(e)}")
 
 
 @router.get("/health")
 async def health_check() -> Dict[str, Any]:
     """Check if Kalshi API connection is working"""
     try:
-        markets = kalshi_client.get_markets(limit=1)
+        markets = await kalshi_client.get_markets(limit=1)
         connected = len(markets) > 0
         
         return {
             "success": True,
             "kalshi_connected": connected,
             "api_key_set": bool(kalshi_client.api_key),
-            "private_key_loaded": bool(kalshi_client.private_key)
+            "private_key_loaded": bool(kalshi_client.private_key),
+            "signing": kalshi_client.signing_stats(),
+            "snapshot": kalshi_snapshot.stats()
         }
     except Exception as e:
         return {
@@ -3,8 +3,10 @@
 from typing import Annotated, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from api.auth import get_current_user
+from api.auth import get_current_user, get_current_user_for_update, invalidate_user
+from core.database import get_db
 from models.user import User
 from schemas.market import (
     MarketQuote,
@@ -13,7 +15,10 @@ from schemas.market import (
     WatchlistItem,
     ArbitrageAlert,
 )
-from services.alpaca_service import alpaca_service
+from services.alpaca_service import AlpacaTimeoutError, alpaca_service
+from services.bar_store import bar_store, bars_to_records
+from services.quote_service import quote_service
+from services.stock_snapshot import stock_snapshot
 from core.redis import get_redis, RedisClient
 
 router = APIRouter()
@@ -23,23 +28,9 @@ router = APIRouter()
 async def get_quote(
     symbol: str,
     current_user: Annotated[User, Depends(get_current_user)],
-    redis: Annotated[RedisClient, Depends(get_redis)],
 ) -> dict:
     """Get real-time quote for a symbol."""
-    # Check cache first
-    cached = await redis.get_market_data(symbol)
-    if cached:
-        import json
-        return json.loads(cached)
-    
-    # Fetch from Alpaca
-    quote = await alpaca_service.get_quote(symbol)
-    
-    # Cache for 30 seconds
-    import json
-    await redis.cache_market_data(symbol, json.dumps(quote), ttl=30)
-    
-    return quote
+    return await quote_service.get_quote(symbol)
 
 
 @router.get("/bars/{symbol}", response_model=List[MarketBar])
@@ -50,8 +41,8 @@ async def get_bars(
     limit: int = Query(100, ge=1, le=1000),
 ) -> list:
     """Get historical bars/candles for a symbol."""
-    bars = await alpaca_service.get_bars(symbol, timeframe, limit)
-    return bars
+    bars = await bar_store.get_bars(symbol, timeframe, limit)
+    return bars_to_records(symbol.upper(), bars)
 
 
 @router.get("/screener", response_model=List[StockScreener])
@@ -62,16 +53,20 @@ async def stock_screener(
     min_volume: Optional[int] = None,
     min_change_percent: Optional[float] = None,
     max_change_percent: Optional[float] = None,
+    min_market_cap: Optional[float] = None,
+    max_market_cap: Optional[float] = None,
     sector: Optional[str] = None,
     limit: int = Query(50, ge=1, le=200),
 ) -> list:
-    """Screen stocks based on criteria."""
-    results = await alpaca_service.screen_stocks(
+    """Screen tradable US stocks, most traded first."""
+    results = await stock_snapshot.screen(
         min_price=min_price,
         max_price=max_price,
         min_volume=min_volume,
         min_change_percent=min_change_percent,
         max_change_percent=max_change_percent,
+        min_market_cap=min_market_cap,
+        max_market_cap=max_market_cap,
         sector=sector,
         limit=limit,
     )
@@ -86,9 +81,11 @@ async def get_watchlist(
     if not current_user.watchlist:
         return []
     
+    quotes = await quote_service.get_quotes(current_user.watchlist)
+    
     watchlist_data = []
     for symbol in current_user.watchlist:
-        quote = await alpaca_service.get_quote(symbol)
+        quote = quotes.get(symbol.upper(), {})
         watchlist_data.append({
             "symbol": symbol,
             "price": quote.get("price"),
@@ -102,21 +99,28 @@ async def get_watchlist(
 @router.post("/watchlist/{symbol}")
 async def add_to_watchlist(
     symbol: str,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[User, Depends(get_current_user_for_update)],
+    db: Annotated[AsyncSession, Depends(get_db)],
 ) -> dict[str, str]:
     """Add a symbol to user's watchlist."""
     # Validate symbol exists
     try:
-        await alpaca_service.get_quote(symbol.upper())
+        quote = await alpaca_service.get_quote(symbol.upper())
+    except AlpacaTimeoutError:
+        raise
     except Exception:
+        quote = None
+    if not quote:
         raise HTTPException(status_code=404, detail="Symbol not found")
     
-    if current_user.watchlist is None:
-        current_user.watchlist = []
+    watchlist = current_user.watchlist or []
     
     symbol_upper = symbol.upper()
-    if symbol_upper not in current_user.watchlist:
-        current_user.watchlist.append(symbol_upper)
+    if symbol_upper not in watchlist:
+        # A new list, so the JSON column is seen as changed
+        current_user.watchlist = [*watchlist, symbol_upper]
+        await db.commit()
+        await invalidate_user(current_user.id)
     
     return {"status": "added", "symbol": symbol_upper}
 
@@ -124,11 +128,14 @@ async def add_to_watchlist(
 @router.delete("/watchlist/{symbol}")
 async def remove_from_watchlist(
     symbol: str,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[User, Depends(get_current_user_for_update)],
+    db: Annotated[AsyncSession, Depends(get_db)],
 ) -> dict[str, str]:
     """Remove a symbol from user's watchlist."""
     if current_user.watchlist and symbol.upper() in current_user.watchlist:
-        current_user.watchlist.remove(symbol.upper())
+        current_user.watchlist = [s for s in current_user.watchlist if s != symbol.upper()]
+        await db.commit()
+        await invalidate_user(current_user.id)
     
     return {"status": "removed", "symbol": symbol.upper()}
 
@@ -5,7 +5,7 @@ from typing import Annotated, List
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from api.auth import get_current_user
+from api.auth import get_current_user, get_current_user_for_update, invalidate_user
 from core.database import get_db
 from models.user import User
 from models.notification import Notification
@@ -79,7 +79,7 @@ async def get_notification_settings(
 @router.patch("/settings", response_model=NotificationSettings)
 async def update_notification_settings(
     settings: NotificationSettings,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[User, Depends(get_current_user_for_update)],
     db: Annotated[AsyncSession, Depends(get_db)],
 ) -> dict:
     """Update notification settings."""
@@ -95,6 +95,7 @@ async def update_notification_settings(
         current_user.alert_news = settings.news_alerts
     
     await db.commit()
+    await invalidate_user(current_user.id)
     
     return {
         "push_enabled": current_user.notifications_enabled,
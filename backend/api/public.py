@@ -1,105 +1,68 @@
+"""Unauthenticated market data endpoints."""
+
 from fastapi import APIRouter, HTTPException, Query
-from typing import List, Optional
-from alpaca.data.historical import StockHistoricalDataClient
-from alpaca.data.requests import StockLatestQuoteRequest, StockBarsRequest
-from alpaca.data.timeframe import TimeFrame
-from alpaca.trading.client import TradingClient
-from alpaca.trading.requests import GetAssetsRequest
-from alpaca.trading.enums import AssetClass
-from backend.core.config import settings
+
+from core.config import settings
+from services.asset_search import asset_search
+from services.quote_service import quote_service
 
 router = APIRouter()
 
-# Initialize Alpaca clients
-data_client = StockHistoricalDataClient(
-    api_key=settings.alpaca_api_key,
-    secret_key=settings.alpaca_secret_key
-)
 
-trading_client = TradingClient(
-    api_key=settings.alpaca_api_key,
-    secret_key=settings.alpaca_secret_key,
-    paper=True
-)
+def _bid_ask(quote: dict) -> tuple:
+    """Bid and ask of a cached quote; price-only updates count as both."""
+    bid, ask = quote.get("bid"), quote.get("ask")
+    price = quote.get("price")
+    return (price if bid is None else bid), (price if ask is None else ask)
+
+
+def _price(quote: dict, bid, ask):
+    """Bid/ask midpoint, or the last price when a side of the book is empty."""
+    if bid and ask:
+        return (bid + ask) / 2
+    return quote.get("price")
+
 
 @router.get("/quote/{symbol}")
 async def get_quote(symbol: str):
     """Get real-time quote for a symbol (public)."""
-    try:
-        request = StockLatestQuoteRequest(symbol_or_symbols=symbol.upper())
-        quote = data_client.get_stock_latest_quote(request)
-        quote_data = quote.get(symbol.upper())
-        if not quote_data:
-            raise HTTPException(status_code=404, detail="Symbol not found")
-        return {
-            "symbol": symbol.upper(),
-            "bid": float(quote_data.bid_price),
-            "ask": float(quote_data.ask_price),
-            "bid_size": quote_data.bid_size,
-            "ask_size": quote_data.ask_size,
-            "timestamp": str(quote_data.timestamp)
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    quote = await quote_service.get_quote(symbol)
+    if not quote:
+        raise HTTPException(status_code=404, detail="Symbol not found")
+    bid, ask = _bid_ask(quote)
+    return {
+        "symbol": symbol.upper(),
+        "bid": bid,
+        "ask": ask,
+        "bid_size": quote.get("bid_size", 0),
+        "ask_size": quote.get("ask_size", 0),
+        "timestamp": quote.get("timestamp"),
+    }
 
 @router.get("/search")
 async def search_stocks(q: str = Query(..., min_length=1)):
     """Search for stocks by symbol or name (public)."""
-    try:
-        assets = trading_client.get_all_assets(GetAssetsRequest(asset_class=AssetClass.US_EQUITY))
-        query = q.upper()
-        
-        # Filter matching assets (only tradable)
-        matches = [
-            a for a in assets
-            if a.tradable and (query in a.symbol.upper() or (a.name and query in a.name.upper()))
-        ]
-        
-        # Sort by relevance: exact symbol > symbol starts with > symbol contains > name contains
-        def sort_key(a):
-            symbol = a.symbol.upper()
-            name = (a.name or "").upper()
-            
-            # Exact symbol match = highest priority (0)
-            if symbol == query:
-                return (0, len(symbol), symbol)
-            # Symbol starts with query
-            if symbol.startswith(query):
-                return (1, len(symbol), symbol)
-            # Symbol contains query
-            if query in symbol:
-                return (2, len(symbol), symbol)
-            # Name starts with query
-            if name.startswith(query):
-                return (3, len(name), symbol)
-            # Name contains query
-            return (4, len(name), symbol)
-        
-        matches.sort(key=sort_key)
-        
-        results = [
-            {"symbol": a.symbol, "name": a.name, "exchange": a.exchange, "tradable": a.tradable}
-            for a in matches[:15]
-        ]
-        return results
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return [
+        {"symbol": a["symbol"], "name": a.get("name"), "exchange": a.get("exchange"), "tradable": a.get("tradable")}
+        for a in await asset_search.search(q, limit=15)
+    ]
 
 @router.get("/quotes")
 async def get_multiple_quotes(symbols: str = Query(..., description="Comma-separated symbols")):
     """Get quotes for multiple symbols (public)."""
-    try:
-        symbol_list = [s.strip().upper() for s in symbols.split(",")]
-        request = StockLatestQuoteRequest(symbol_or_symbols=symbol_list)
-        quotes = data_client.get_stock_latest_quote(request)
-        results = {}
-        for symbol, quote_data in quotes.items():
-            results[symbol] = {
-                "bid": float(quote_data.bid_price),
-                "ask": float(quote_data.ask_price),
-                "price": float((quote_data.bid_price + quote_data.ask_price) / 2),
-                "timestamp": str(quote_data.timestamp)
-            }
-        return results
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    symbol_list = list(dict.fromkeys(s.strip().upper() for s in symbols.split(",") if s.strip()))
+    if len(symbol_list) > settings.public_quotes_max_symbols:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.public_quotes_max_symbols} symbols per request",
+        )
+    results = {}
+    for symbol, quote in (await quote_service.get_quotes(symbol_list)).items():
+        bid, ask = _bid_ask(quote)
+        results[symbol] = {
+            "bid": bid,
+            "ask": ask,
+            "price": _price(quote, bid, ask),
+            "timestamp": quote.get("timestamp"),
+        }
+    return results
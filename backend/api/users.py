@@ -5,7 +5,7 @@ from typing import Annotated, List
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from api.auth import get_current_user
+from api.auth import get_current_user, get_current_user_for_update, invalidate_user
 from core.database import get_db
 from models.user import User
 from schemas.user import UserPreferences, UserProfile, UserUpdate
@@ -24,7 +24,7 @@ async def get_profile(
 @router.patch("/profile", response_model=UserProfile)
 async def update_profile(
     update_data: UserUpdate,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[User, Depends(get_current_user_for_update)],
     db: Annotated[AsyncSession, Depends(get_db)],
 ) -> User:
     """Update current user's profile."""
@@ -35,6 +35,7 @@ async def update_profile(
     
     await db.commit()
     await db.refresh(current_user)
+    await invalidate_user(current_user.id)
     
     return current_user
 
@@ -54,7 +55,7 @@ async def get_preferences(
 @router.patch("/preferences", response_model=UserPreferences)
 async def update_preferences(
     preferences: UserPreferences,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[User, Depends(get_current_user_for_update)],
     db: Annotated[AsyncSession, Depends(get_db)],
 ) -> dict:
     """Update user preferences (theme, notifications, watchlist)."""
@@ -66,6 +67,7 @@ async def update_preferences(
         current_user.watchlist = preferences.watchlist
     
     await db.commit()
+    await invalidate_user(current_user.id)
     
     return {
         "theme": current_user.theme,
@@ -78,7 +80,7 @@ async def update_preferences(
 async def register_device_token(
     device_token: str,
     platform: str,  # "ios" or "android"
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[User, Depends(get_current_user_for_update)],
     db: Annotated[AsyncSession, Depends(get_db)],
 ) -> dict[str, str]:
     """Register device token for push notifications."""
@@ -86,5 +88,6 @@ async def register_device_token(
     current_user.device_platform = platform
     
     await db.commit()
+    await invalidate_user(current_user.id)
     
     return {"status": "registered"}
@@ -1,16 +1,27 @@
 """WebSocket endpoints for real-time data."""
 
 import asyncio
-import json
-from typing import Annotated, Dict, Set
+import time
+from typing import Annotated, Callable, Dict, List, Optional, Set, Union
 
 from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect, Query
 from fastapi.websockets import WebSocketState
 
 from core.config import settings
+from core.metrics import LatencyTracker
+from core.pubsub import STREAM_PATTERNS, pubsub_hub
 from core.redis import redis_client
 from core.security import decode_token
-from services.alpaca_service import alpaca_service
+from services.alpaca_service import AlpacaAPIError, alpaca_service
+from services.bar_feed import BarFeed
+from services.bar_store import TIMEFRAME_SECONDS, bar_store, bars_to_records
+from services.presence_service import PresenceService
+from services.price_relay import PriceRelay
+from services.ws_codec import ENCODINGS, BinaryTickCodec, Tick, extract_tick
+from services.ws_fanout import encode_message, fanout
+from services.ws_outbox import Outbox
+from services.ws_registry import SubscriptionIndex
+from services.ws_replay import ReplayBuffer, join_frames
 
 router = APIRouter()
 
@@ -21,15 +32,77 @@ class ConnectionManager:
     def __init__(self) -> None:
         # user_id -> set of websockets
         self.active_connections: Dict[int, Set[WebSocket]] = {}
-        # symbol -> set of websockets subscribed
-        self.symbol_subscriptions: Dict[str, Set[WebSocket]] = {}
+        # websocket <-> symbol subscriptions
+        self.subscriptions = SubscriptionIndex()
+        # Time to fan one message out to every subscriber
+        self.broadcast_latency = LatencyTracker()
+        # Time a frame waits in a connection's outbox before it is written
+        self.delivery_latency = LatencyTracker()
+        # Called when a symbol gains its first / loses its last local subscriber
+        self.on_symbol_added: List[Callable[[str], None]] = []
+        self.on_symbol_removed: List[Callable[[str], None]] = []
+        # Called when a user opens their first / closes their last local socket
+        self.on_user_added: List[Callable[[int], None]] = []
+        self.on_user_removed: List[Callable[[int], None]] = []
+        # Set in cluster mode to reach users whose sockets are on other nodes
+        self.presence: Optional[PresenceService] = None
+        # Sequence numbers and recent frames, for clients that reconnect
+        self.replay = ReplayBuffer(
+            settings.ws_replay_size, settings.ws_replay_channels
+        )
+        # Streamed Redis channel (alerts, social) -> local sockets
+        self.channel_members: Dict[str, Set[WebSocket]] = {}
+
+    @property
+    def symbol_subscriptions(self) -> Dict[str, Set[WebSocket]]:
+        """Symbol -> set of websockets subscribed."""
+        return self.subscriptions.by_symbol
+
+    @staticmethod
+    def market_channel(symbol: str) -> str:
+        """Replay channel for a symbol's market updates."""
+        return f"market:{symbol}"
 
     async def connect(self, websocket: WebSocket, user_id: int) -> None:
         """Accept and track a new WebSocket connection."""
         await websocket.accept()
         if user_id not in self.active_connections:
             self.active_connections[user_id] = set()
+            for hook in self.on_user_added:
+                hook(user_id)
         self.active_connections[user_id].add(websocket)
+        self.subscriptions.register(websocket, user_id)
+
+    def open_outbox(
+        self,
+        websocket: WebSocket,
+        codec: Optional[BinaryTickCodec] = None,
+    ) -> Outbox:
+        """Route this socket's outbound frames through a bounded queue."""
+        state = self.subscriptions.register(websocket)
+        if state.outbox is None:
+            state.outbox = Outbox(
+                websocket,
+                maxsize=settings.ws_queue_size,
+                send_timeout=settings.ws_send_timeout,
+                on_stall=self.evict,
+                latency=self.delivery_latency,
+                codec=codec,
+            )
+            state.outbox.start()
+        return state.outbox
+
+    def queue_message(
+        self,
+        websocket: WebSocket,
+        message: dict,
+        key: Optional[str] = None,
+    ) -> bool:
+        """Queue a message on a socket's outbox (see open_outbox)."""
+        state = self.subscriptions.get(websocket)
+        if state is None or state.outbox is None:
+            return False
+        return state.outbox.put(encode_message(message), key)
 
     def disconnect(self, websocket: WebSocket, user_id: int) -> None:
         """Remove a WebSocket connection."""
@@ -37,73 +110,417 @@ class ConnectionManager:
             self.active_connections[user_id].discard(websocket)
             if not self.active_connections[user_id]:
                 del self.active_connections[user_id]
-        
-        # Remove from all symbol subscriptions
-        for symbol in list(self.symbol_subscriptions.keys()):
-            self.symbol_subscriptions[symbol].discard(websocket)
-            if not self.symbol_subscriptions[symbol]:
-                del self.symbol_subscriptions[symbol]
+                for hook in self.on_user_removed:
+                    hook(user_id)
+
+        state = self.subscriptions.get(websocket)
+        if state is not None and state.outbox is not None:
+            state.outbox.close()
+
+        # Only touches the symbols this socket actually held
+        for symbol in self.subscriptions.remove(websocket):
+            self._symbol_removed(symbol)
 
     def subscribe_symbol(self, websocket: WebSocket, symbol: str) -> None:
         """Subscribe a websocket to a symbol's updates."""
-        if symbol not in self.symbol_subscriptions:
-            self.symbol_subscriptions[symbol] = set()
-        self.symbol_subscriptions[symbol].add(websocket)
+        if self.subscriptions.subscribe(websocket, symbol):
+            for hook in self.on_symbol_added:
+                hook(symbol)
 
     def unsubscribe_symbol(self, websocket: WebSocket, symbol: str) -> None:
         """Unsubscribe a websocket from a symbol's updates."""
-        if symbol in self.symbol_subscriptions:
-            self.symbol_subscriptions[symbol].discard(websocket)
+        if self.subscriptions.unsubscribe(websocket, symbol):
+            self._symbol_removed(symbol)
+
+    def _symbol_removed(self, symbol: str) -> None:
+        # Updates stop reaching this node, so the buffered ones go stale
+        self.replay.forget(self.market_channel(symbol))
+        for hook in self.on_symbol_removed:
+            hook(symbol)
+
+    def join_channel(self, websocket: WebSocket, channel: str) -> None:
+        """Stream a Redis channel (see relay_channel) to a socket."""
+        self.channel_members.setdefault(channel, set()).add(websocket)
+
+    def leave_channel(self, websocket: WebSocket, channel: str) -> None:
+        """Stop streaming a Redis channel to a socket."""
+        members = self.channel_members.get(channel)
+        if members is None:
+            return
+        members.discard(websocket)
+        if not members:
+            del self.channel_members[channel]
+
+    def relay_channel(self, channel: str, data: str) -> None:
+        """
+        Stamp a frame from a streamed channel and queue it for local sockets.
+
+        Frames are recorded whether or not anyone is connected, so a client
+        that reconnects can be sent what it missed.
+        """
+        payload = self.replay.record(channel, data)
+        members = self.channel_members.get(channel)
+        if not members:
+            return
+        by_socket = self.subscriptions.by_socket
+        # A failed write evicts its socket, which shrinks the live set
+        for websocket in list(members):
+            state = by_socket.get(websocket)
+            if state is not None and state.outbox is not None:
+                state.outbox.put(payload)
+
+    def resume_channel(
+        self,
+        websocket: WebSocket,
+        channel: str,
+        epoch: Optional[str],
+        last_seq: int,
+        fallback: Optional[str] = None,
+    ) -> bool:
+        """
+        Queue what a reconnecting socket missed on a channel.
+
+        Sends one ``replay`` frame with the missed frames if they are still
+        buffered, otherwise one ``snapshot`` frame with everything buffered
+        (or ``fallback`` when nothing is).
+
+        Returns:
+            True if the gap was replayed, False if a snapshot was sent
+        """
+        missed = self.replay.since(epoch, channel, last_seq)
+        if missed is not None:
+            if missed:
+                self.queue_frame(
+                    websocket,
+                    join_frames("replay", channel, self.replay.last_seq(channel), missed),
+                )
+            return True
+
+        seq, frames = self.replay.snapshot(channel)
+        if not frames and fallback is not None:
+            frames = [fallback]
+        self.queue_frame(websocket, join_frames("snapshot", channel, seq, frames))
+        return False
+
+    async def resume_symbols(
+        self,
+        websocket: WebSocket,
+        epoch: Optional[str],
+        last_seq: Dict[str, int],
+    ) -> None:
+        """
+        Queue what a reconnecting market socket missed per symbol.
+
+        A symbol whose gap cannot be replayed gets a snapshot of its latest
+        update: the newest buffered frame, or the cached quote when this
+        node has not been receiving it. Call before subscribing so replayed
+        frames precede live ones.
+        """
+        # Symbols with neither a replayable gap nor a buffered frame fall
+        # back to the quote cache; look those up first, then build every
+        # reply from the buffers as they are after the await.
+        cached: Dict[str, str] = {}
+        uncovered = [
+            symbol for symbol, after in last_seq.items()
+            if self.replay.since(epoch, self.market_channel(symbol), after) is None
+            and not self.replay.last_seq(self.market_channel(symbol))
+        ]
+        if uncovered:
+            values = await asyncio.gather(
+                *(redis_client.get_market_data(symbol) for symbol in uncovered),
+                return_exceptions=True,
+            )
+            for symbol, value in zip(uncovered, values):
+                if isinstance(value, dict):
+                    cached[symbol] = encode_message({
+                        "type": "quote",
+                        "symbol": symbol,
+                        "data": value,
+                    })
+
+        for symbol, after in last_seq.items():
+            channel = self.market_channel(symbol)
+            seq = self.replay.last_seq(channel)
+            missed = self.replay.since(epoch, channel, after)
+            if missed is not None:
+                if missed:
+                    self.queue_frame(websocket, join_frames("replay", channel, seq, missed))
+                continue
+            # Only the latest update matters for a quote
+            frames = self.replay.snapshot(channel)[1][-1:]
+            if not frames and symbol in cached:
+                frames = [cached[symbol]]
+            self.queue_frame(websocket, join_frames("snapshot", channel, seq, frames))
+
+    def queue_frame(self, websocket: WebSocket, payload: str) -> bool:
+        """Queue an already-serialized frame on a socket's outbox."""
+        state = self.subscriptions.get(websocket)
+        if state is None or state.outbox is None:
+            return False
+        return state.outbox.put(payload)
 
     async def send_personal_message(self, message: dict, user_id: int) -> None:
-        """Send a message to a specific user."""
-        if user_id in self.active_connections:
-            for websocket in self.active_connections[user_id]:
-                if websocket.client_state == WebSocketState.CONNECTED:
-                    await websocket.send_json(message)
+        """
+        Send a message to a specific user.
+
+        In cluster mode the message is also published to the other nodes
+        that hold sockets for this user (and only to those).
+        """
+        payload = encode_message(message)
+        await self.deliver_to_user(user_id, payload)
+        if self.presence is not None:
+            await self.presence.route(user_id, payload)
+
+    async def deliver_to_user(self, user_id: int, payload: str) -> int:
+        """Send a serialized message to this node's sockets for a user."""
+        websockets = self.active_connections.get(user_id)
+        if not websockets:
+            return 0
+
+        count = len(websockets)
+        by_socket = self.subscriptions.by_socket
+        direct = []
+        # A failed write evicts its socket, which shrinks the live set
+        for websocket in list(websockets):
+            state = by_socket.get(websocket)
+            if state is not None and state.outbox is not None:
+                state.outbox.put(payload)
+            elif websocket.client_state == WebSocketState.CONNECTED:
+                direct.append(websocket)
+
+        if direct:
+            _, timed_out = await fanout(direct, payload, settings.ws_send_timeout)
+            for ws in timed_out:
+                self.evict(ws)
+        return count
 
     async def broadcast_to_symbol(self, symbol: str, message: dict) -> None:
         """Broadcast a message to all subscribers of a symbol."""
-        if symbol in self.symbol_subscriptions:
-            disconnected = []
-            for websocket in self.symbol_subscriptions[symbol]:
-                try:
-                    if websocket.client_state == WebSocketState.CONNECTED:
-                        await websocket.send_json(message)
-                except Exception:
-                    disconnected.append(websocket)
-            
-            for ws in disconnected:
-                self.symbol_subscriptions[symbol].discard(ws)
+        if symbol not in self.symbol_subscriptions:
+            return
+        await self.broadcast_payload(
+            symbol,
+            encode_message(message),
+            key=f"{message.get('type')}:{symbol}",
+            message=message,
+        )
+
+    async def broadcast_payload(
+        self,
+        symbol: str,
+        payload: str,
+        key: str,
+        message: Optional[dict] = None,
+    ) -> None:
+        """
+        Broadcast an already-serialized frame to all subscribers of a symbol.
+
+        Sockets with an outbox get it queued (conflated with any undelivered
+        frame sharing ``key``); binary clients get the tick instead, decoded
+        once per broadcast. The rest are written concurrently, and sockets
+        that miss the send deadline are evicted.
+        """
+        subscribers = self.symbol_subscriptions.get(symbol)
+        if not subscribers:
+            return
+
+        start = time.perf_counter()
+        payload = self.replay.record(self.market_channel(symbol), payload)
+        by_socket = self.subscriptions.by_socket
+        tick: Union[Tick, str, None] = None
+        direct = []
+        # A failed write evicts its socket, which shrinks the live set
+        for websocket in list(subscribers):
+            state = by_socket.get(websocket)
+            if state is not None and state.outbox is not None:
+                if state.outbox.codec is None:
+                    state.outbox.put(payload, key)
+                    continue
+                if tick is None:
+                    tick = extract_tick(symbol, message or payload) or payload
+                state.outbox.put(tick, key)
+            elif websocket.client_state == WebSocketState.CONNECTED:
+                direct.append(websocket)
+
+        if direct:
+            failed, timed_out = await fanout(direct, payload, settings.ws_send_timeout)
+            for ws in failed:
+                self.unsubscribe_symbol(ws, symbol)
+            for ws in timed_out:
+                self.evict(ws)
+
+        self.broadcast_latency.record(time.perf_counter() - start)
+
+    def evict(self, websocket: WebSocket) -> None:
+        """Drop a slow socket from every index and close it in the background."""
+        state = self.subscriptions.get(websocket)
+        if state is not None:
+            self.disconnect(websocket, state.user_id)
+        asyncio.ensure_future(self._close_quietly(websocket, code=1013))
+
+    @staticmethod
+    async def _close_quietly(websocket: WebSocket, code: int) -> None:
+        try:
+            await websocket.close(code=code, reason="Too slow")
+        except Exception:
+            pass
 
 
 manager = ConnectionManager()
 
+price_relay = PriceRelay(pubsub_hub, manager.broadcast_payload)
+manager.on_symbol_added.append(price_relay.watch)
+manager.on_symbol_removed.append(price_relay.unwatch)
+
+bar_feed = BarFeed(bar_store, manager.queue_message)
+price_relay.listeners.append(bar_feed.on_tick)
+
+# Alerts and the social feed are recorded for replay even with no socket open
+for _pattern in STREAM_PATTERNS:
+    pubsub_hub.on_pattern(_pattern, manager.relay_channel)
+
+presence_service = PresenceService(
+    redis_client,
+    pubsub_hub,
+    manager.deliver_to_user,
+    ttl=settings.ws_presence_ttl,
+    heartbeat_interval=settings.ws_presence_heartbeat,
+)
+manager.on_user_added.append(presence_service.user_added)
+manager.on_user_removed.append(presence_service.user_removed)
+manager.on_symbol_added.append(presence_service.symbol_added)
+manager.on_symbol_removed.append(presence_service.symbol_removed)
+
+
+async def start_cluster_mode() -> None:
+    """Register this node's presence and route targeted messages through it."""
+    await presence_service.start()
+    manager.presence = presence_service
+
+
+async def stop_cluster_mode() -> None:
+    """Leave the cluster."""
+    manager.presence = None
+    await presence_service.stop()
+
+
+@router.get("/stats")
+async def websocket_stats() -> dict:
+    """Connection counts and broadcast fan-out latency for this worker."""
+    return {
+        "connections": len(manager.subscriptions),
+        "users": len(manager.active_connections),
+        "symbols": len(manager.symbol_subscriptions),
+        "broadcast_latency": manager.broadcast_latency.snapshot(),
+        "delivery_latency": manager.delivery_latency.snapshot(),
+    }
+
+
+def whole_number(value: object) -> Optional[int]:
+    """A client-sent number as an int; None if it is not one."""
+    if isinstance(value, bool):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+def batch_window(batch_ms: object) -> Optional[float]:
+    """
+    Batch window in seconds for a client's ``batch_ms``, clamped to
+    [0, WS_MAX_BATCH_MS]; None if it is not a number.
+    """
+    value = whole_number(batch_ms)
+    if value is None:
+        return None
+    return min(max(value, 0), settings.ws_max_batch_ms) / 1000
+
+
+def resume_points(last_seq: object, symbols: Set[str]) -> Optional[Dict[str, int]]:
+    """
+    Last seen seq per subscribed symbol from a client's ``last_seq``; None
+    if it is not a mapping of symbols to non-negative whole numbers.
+    """
+    if not last_seq:
+        return {}
+    if not isinstance(last_seq, dict):
+        return None
+    resume = {}
+    for symbol, seq in last_seq.items():
+        if symbol.upper() not in symbols:
+            continue
+        value = whole_number(seq)
+        if value is None or value < 0:
+            return None
+        resume[symbol.upper()] = value
+    return resume
+
 
 @router.websocket("/market")
 async def websocket_market(
     websocket: WebSocket,
     token: str = Query(...),
+    encoding: str = Query("json"),
 ) -> None:
     """
     WebSocket endpoint for real-time market data.
     
     Messages from client:
-    - {"action": "subscribe", "symbols": ["AAPL", "GOOGL"]}
+    - {"action": "subscribe", "symbols": ["AAPL", "GOOGL"], "batch_ms": 50}
+    - {"action": "subscribe", "symbols": ["AAPL"], "epoch": "...", "last_seq": {"AAPL": 41}}
     - {"action": "unsubscribe", "symbols": ["AAPL"]}
+    - {"action": "chart", "symbol": "AAPL", "timeframe": "5Min", "limit": 200}
+    - {"action": "unchart", "symbol": "AAPL", "timeframe": "5Min"}
     
     Messages to client:
-    - {"type": "quote", "symbol": "AAPL", "data": {...}}
-    - {"type": "trade", "symbol": "AAPL", "data": {...}}
+    - {"type": "subscribed", "symbols": [...], "epoch": "..."}
+    - {"seq": 42, "type": "quote", "symbol": "AAPL", "data": {...}}
+    - {"seq": 43, "type": "trade", "symbol": "AAPL", "data": {...}}
+    - {"type": "batch", "messages": [...]}  (when batch_ms is set)
+    - {"type": "replay" | "snapshot", "channel": "market:AAPL", "seq": 43, "messages": [...]}
+    - {"type": "bars", "symbol": "AAPL", "timeframe": "5Min", "data": [...]}
+    - {"type": "bar", "symbol": "AAPL", "timeframe": "5Min", "data": {...}}
+    - {"type": "error", "symbol": "AAPL", "message": "..."}  (invalid chart or history unavailable)
+    - {"type": "error", "message": "..."}  (invalid batch_ms or last_seq)
+
+    The optional ``batch_ms`` coalesces updates for that long and sends
+    them as one frame with only the latest value per symbol (0 turns it
+    off, capped at WS_MAX_BATCH_MS); a value that is not a number leaves
+    the window as it was and gets an "error" reply.
+
+    JSON updates carry a ``seq`` that increases per symbol (with gaps). A
+    client that reconnects sends the ``epoch`` from its last "subscribed"
+    reply and the last ``seq`` it saw per symbol; it then gets one "replay"
+    frame with the updates it missed, or, if those are no longer buffered,
+    one "snapshot" frame with the latest update. A ``last_seq`` that is
+    not a map of whole numbers gets an "error" reply and no replay.
+
+    With ``encoding=binary``, price ticks arrive as binary frames (see
+    services/ws_codec.py) and "subscribed" replies include an "ids" map
+    from symbol to the id used in those frames.
+
+    "chart" sends the latest ``limit`` bars once, as /bars would return
+    them, then the in-progress bar as a "bar" frame on every tick. It also
+    subscribes the socket to the symbol's quotes; closing the symbol's last
+    chart unsubscribes them again, unless the client subscribed to the
+    symbol itself.
     """
     # Authenticate
     payload = decode_token(token)
     if not payload:
         await websocket.close(code=4001, reason="Invalid token")
         return
+    if encoding not in ENCODINGS:
+        await websocket.close(code=4002, reason="Unsupported encoding")
+        return
     
     user_id = int(payload.get("sub", 0))
     await manager.connect(websocket, user_id)
+    codec = BinaryTickCodec() if encoding == "binary" else None
+    outbox = manager.open_outbox(websocket, codec=codec)
+    # Symbols subscribed with "subscribe", as opposed to only charted
+    subscribed: Set[str] = set()
     
     try:
         while True:
@@ -112,23 +529,97 @@ async def websocket_market(
             
             if action == "subscribe":
                 symbols = data.get("symbols", [])
-                for symbol in symbols:
-                    manager.subscribe_symbol(websocket, symbol.upper())
-                await websocket.send_json({
+                if "batch_ms" in data:
+                    window = batch_window(data["batch_ms"])
+                    if window is None:
+                        manager.queue_message(websocket, {
+                            "type": "error",
+                            "message": "batch_ms must be a whole number of milliseconds",
+                        })
+                    else:
+                        outbox.set_batch_window(window)
+                resume = resume_points(data.get("last_seq"), {s.upper() for s in symbols})
+                if resume is None:
+                    manager.queue_message(websocket, {
+                        "type": "error",
+                        "message": "last_seq must map symbols to whole-number sequence numbers",
+                    })
+                    resume = {}
+                reply = {
                     "type": "subscribed",
                     "symbols": symbols,
-                })
+                    "epoch": manager.replay.epoch,
+                }
+                if codec is not None:
+                    # Send ids before any tick for these symbols can be queued
+                    reply["ids"] = codec.assign_ids([s.upper() for s in symbols])
+                manager.queue_message(websocket, reply)
+                if resume:
+                    await manager.resume_symbols(websocket, data.get("epoch"), resume)
+                for symbol in symbols:
+                    manager.subscribe_symbol(websocket, symbol.upper())
+                    subscribed.add(symbol.upper())
             
             elif action == "unsubscribe":
                 symbols = data.get("symbols", [])
                 for symbol in symbols:
-                    manager.unsubscribe_symbol(websocket, symbol.upper())
-                await websocket.send_json({
+                    subscribed.discard(symbol.upper())
+                    # An open chart still needs the symbol's ticks
+                    if not bar_feed.charted(websocket, symbol.upper()):
+                        manager.unsubscribe_symbol(websocket, symbol.upper())
+                manager.queue_message(websocket, {
                     "type": "unsubscribed",
                     "symbols": symbols,
                 })
+
+            elif action == "chart":
+                symbol = str(data.get("symbol", "")).upper()
+                timeframe = data.get("timeframe", "1D")
+                limit = whole_number(data.get("limit", 100))
+                valid = isinstance(timeframe, str) and timeframe in TIMEFRAME_SECONDS
+                if not symbol or not valid or limit is None:
+                    manager.queue_message(websocket, {
+                        "type": "error",
+                        "symbol": symbol,
+                        "message": (
+                            "chart needs a symbol, a timeframe "
+                            f"({', '.join(TIMEFRAME_SECONDS)}) and a whole-number limit"
+                        ),
+                    })
+                    continue
+                limit = min(max(limit, 1), 1000)
+                try:
+                    bars = await bar_store.get_bars(symbol, timeframe, limit)
+                except AlpacaAPIError as e:
+                    manager.queue_message(websocket, {
+                        "type": "error",
+                        "symbol": symbol,
+                        "message": str(e),
+                    })
+                    continue
+                manager.queue_message(websocket, {
+                    "type": "bars",
+                    "symbol": symbol,
+                    "timeframe": timeframe,
+                    "data": bars_to_records(symbol, bars),
+                })
+                # No await since the history, so live bars follow it
+                bar_feed.add(websocket, symbol, timeframe)
+                manager.subscribe_symbol(websocket, symbol)
+
+            elif action == "unchart":
+                symbol = str(data.get("symbol", "")).upper()
+                timeframe = data.get("timeframe")
+                if timeframe is not None and not isinstance(timeframe, str):
+                    continue
+                bar_feed.remove(websocket, symbol, timeframe)
+                if symbol not in subscribed and not bar_feed.charted(websocket, symbol):
+                    manager.unsubscribe_symbol(websocket, symbol)
     
     except WebSocketDisconnect:
+        pass
+    finally:
+        bar_feed.drop(websocket)
         manager.disconnect(websocket, user_id)
 
 
@@ -136,13 +627,22 @@ async def websocket_market(
 async def websocket_alerts(
     websocket: WebSocket,
     token: str = Query(...),
+    epoch: Optional[str] = Query(None),
+    last_seq: Optional[int] = Query(None),
 ) -> None:
     """
     WebSocket endpoint for real-time arbitrage and price alerts.
     
     Messages to client:
-    - {"type": "arbitrage", "data": {...}}
-    - {"type": "price_alert", "data": {...}}
+    - {"type": "stream", "channel": "alerts:user:1", "epoch": "...", "seq": 41}
+    - {"seq": 42, "type": "arbitrage", "data": {...}}
+    - {"seq": 43, "type": "price_alert", "data": {...}}
+    - {"type": "replay" | "snapshot", "channel": "...", "seq": 43, "messages": [...]}
+
+    To resume after a reconnect, pass the ``epoch`` from the "stream"
+    frame and the last ``seq`` seen as query parameters: the missed alerts
+    arrive as one "replay" frame, or, if they are no longer buffered, one
+    "snapshot" frame with the most recent alerts.
     """
     # Authenticate
     payload = decode_token(token)
@@ -152,44 +652,27 @@ async def websocket_alerts(
     
     user_id = int(payload.get("sub", 0))
     await manager.connect(websocket, user_id)
-    
-    # Subscribe to Redis pubsub for alerts
-    pubsub = redis_client.pubsub()
-    await pubsub.subscribe(f"alerts:user:{user_id}")
-    
-    try:
-        while True:
-            message = await pubsub.get_message(ignore_subscribe_messages=True)
-            if message:
-                await websocket.send_json(json.loads(message["data"]))
-            
-            # Also check for incoming messages from client
-            try:
-                data = await asyncio.wait_for(
-                    websocket.receive_json(),
-                    timeout=0.1,
-                )
-                # Handle any client messages if needed
-            except asyncio.TimeoutError:
-                pass
-    
-    except WebSocketDisconnect:
-        await pubsub.unsubscribe(f"alerts:user:{user_id}")
-        manager.disconnect(websocket, user_id)
+    await _stream_channel(
+        websocket, user_id, f"alerts:user:{user_id}", epoch, last_seq
+    )
 
 
 @router.websocket("/social")
 async def websocket_social(
     websocket: WebSocket,
     token: str = Query(...),
+    epoch: Optional[str] = Query(None),
+    last_seq: Optional[int] = Query(None),
 ) -> None:
     """
     WebSocket endpoint for real-time social feed updates.
     
     Messages to client:
-    - {"type": "new_post", "data": {...}}
-    - {"type": "new_comment", "data": {...}}
-    - {"type": "new_like", "data": {...}}
+    - {"seq": 42, "type": "new_post", "data": {...}}
+    - {"seq": 43, "type": "new_comment", "data": {...}}
+    - {"seq": 44, "type": "new_like", "data": {...}}
+
+    Resumes like /alerts.
     """
     # Authenticate
     payload = decode_token(token)
@@ -199,18 +682,34 @@ async def websocket_social(
     
     user_id = int(payload.get("sub", 0))
     await manager.connect(websocket, user_id)
-    
-    # Subscribe to Redis pubsub for social updates
-    pubsub = redis_client.pubsub()
-    await pubsub.subscribe("social:feed")
-    
+    await _stream_channel(websocket, user_id, "social:feed", epoch, last_seq)
+
+
+async def _stream_channel(
+    websocket: WebSocket,
+    user_id: int,
+    channel: str,
+    epoch: Optional[str],
+    last_seq: Optional[int],
+) -> None:
+    """Relay a Redis channel to a connected socket until it disconnects."""
+    manager.open_outbox(websocket)
+    manager.queue_message(websocket, {
+        "type": "stream",
+        "channel": channel,
+        "epoch": manager.replay.epoch,
+        "seq": manager.replay.last_seq(channel),
+    })
+    if last_seq is not None:
+        manager.resume_channel(websocket, channel, epoch, last_seq)
+    # No await since the replay, so live frames follow it in order
+    manager.join_channel(websocket, channel)
     try:
         while True:
-            message = await pubsub.get_message(ignore_subscribe_messages=True)
-            if message:
-                await websocket.send_json(json.loads(message["data"]))
-            await asyncio.sleep(0.1)
-    
+            # Client messages are not used yet; reading detects disconnects
+            await websocket.receive_text()
     except WebSocketDisconnect:
-        await pubsub.unsubscribe("social:feed")
+        pass
+    finally:
+        manager.leave_channel(websocket, channel)
         manager.disconnect(websocket, user_id)
@@ -0,0 +1,129 @@
+"""
+Arbitrage scan benchmark: per-dict loop vs the columnar MarketTable.
+
+Scores every matched Kalshi/Polymarket pair (spread, fee-adjusted edge,
+confidence tier) and ranks the ones with a positive edge, first the
+way /arbitrage used to (a Python loop over market dicts), then as NumPy
+passes over services/arbitrage_table.py.
+
+Usage:
+    python -m benchmarks.bench_arbitrage_scan --pairs 50000
+"""
+
+import argparse
+import math
+import random
+import statistics
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+
+from services.arbitrage_table import TIER_LABELS, MarketTable, confidence_tiers
+
+MIN_EDGE = 0.0
+KALSHI_FEE_RATE = 0.07
+
+
+def _pairs(count: int) -> List[Dict[str, Any]]:
+    rng = random.Random(7)
+    pairs = []
+    for i in range(count):
+        yes = rng.uniform(0.05, 0.95)
+        poly_yes = min(0.99, max(0.01, yes + rng.gauss(0, 0.03)))
+        pairs.append({
+            "id": f"MKT-{i}",
+            "kalshi": {"yes": round(yes, 2), "no": round(1.02 - yes, 2), "volume": rng.randint(0, 10**5)},
+            "polymarket": {"yes": round(poly_yes, 3), "no": round(1.01 - poly_yes, 3)},
+        })
+    return pairs
+
+
+def _fee(rate: float, price: float) -> float:
+    return math.ceil(round(rate * price * (1 - price) * 100, 6)) / 100
+
+
+def scan_dicts(pairs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """One market at a time, as the old /arbitrage loop did"""
+    opportunities = []
+    for pair in pairs:
+        kalshi, poly = pair["kalshi"], pair["polymarket"]
+        spread = round(abs(kalshi["yes"] - poly["yes"]) * 100, 1)
+        cost = min(
+            kalshi["yes"] + poly["no"] + _fee(KALSHI_FEE_RATE, kalshi["yes"]),
+            poly["yes"] + kalshi["no"] + _fee(KALSHI_FEE_RATE, kalshi["no"]),
+        )
+        edge = round((1 - cost) * 100, 2)
+        if edge <= MIN_EDGE:
+            continue
+        opportunities.append({
+            "id": pair["id"],
+            "spread": spread,
+            "edge": edge,
+            "confidence": "High" if edge >= 2 else "Medium" if edge >= 1 else "Low",
+        })
+    opportunities.sort(key=lambda o: o["edge"], reverse=True)
+    return opportunities
+
+
+def _table(pairs: List[Dict[str, Any]]) -> MarketTable:
+    table = MarketTable(capacity=len(pairs))
+    for pair in pairs:
+        table.set(
+            table.row(pair["id"]),
+            kalshi_yes_ask=pair["kalshi"]["yes"],
+            kalshi_no_ask=pair["kalshi"]["no"],
+            kalshi_volume=pair["kalshi"]["volume"],
+            poly_yes_ask=pair["polymarket"]["yes"],
+            poly_no_ask=pair["polymarket"]["no"],
+        )
+    return table
+
+
+def scan_table(table: MarketTable) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """The same scan as column passes: ranked rows with their spreads, edges and tiers"""
+    spread = table.spread()
+    edge = table.edge(kalshi_fee_rate=KALSHI_FEE_RATE)
+    tiers = TIER_LABELS[confidence_tiers(edge)]
+    rows = table.rank(edge, MIN_EDGE, len(table))
+    return rows, spread[rows], edge[rows], tiers[rows]
+
+
+def _time(fn: Callable[[], Any], repeat: int) -> float:
+    """Median milliseconds per call"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pairs", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    pairs = _pairs(args.pairs)
+    table = _table(pairs)
+
+    # Both must agree before timing means anything
+    expected = scan_dicts(pairs)
+    rows, spread, edge, tiers = scan_table(table)
+    assert [o["id"] for o in expected] == [table.keys[r] for r in rows]
+    assert np.allclose([o["spread"] for o in expected], spread)
+    assert np.allclose([o["edge"] for o in expected], edge)
+    assert [o["confidence"] for o in expected] == list(tiers)
+
+    dicts_ms = _time(lambda: scan_dicts(pairs), args.repeat)
+    table_ms = _time(lambda: scan_table(table), args.repeat)
+    top_ms = _time(lambda: table.rank(table.edge(kalshi_fee_rate=KALSHI_FEE_RATE), MIN_EDGE, 20), args.repeat)
+    print(f"{args.pairs} pairs, {len(expected)} with an edge above {MIN_EDGE}pt")
+    print(f"  per-dict loop:  {dicts_ms:8.2f} ms")
+    print(f"  columnar table: {table_ms:8.2f} ms  ({dicts_ms / table_ms:.0f}x)")
+    print(f"  top 20 only:    {top_ms:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
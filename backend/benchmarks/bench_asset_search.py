@@ -0,0 +1,99 @@
+"""
+Typeahead benchmark: substring scan vs the asset search indexes.
+
+Runs every prefix of a set of typed queries against a synthetic US equity
+universe, first the way /api/public/search used to (substring scan and
+sort over the whole asset list, after downloading it), then through the
+tries and name n-gram index in services/asset_search.py.
+
+Usage:
+    python -m benchmarks.bench_asset_search --assets 12000
+"""
+
+import argparse
+import random
+import statistics
+import string
+import time
+from typing import Any, Callable, Dict, List
+
+from services.asset_search import AssetIndex
+
+WORDS = [
+    "Apple", "Micro", "Systems", "Holdings", "Inc.", "Corp", "Energy", "Bank", "Pharmaceuticals",
+    "Technologies", "Group", "Trust", "Capital", "Acquisition", "Global", "Therapeutics", "ETF",
+]
+QUERIES = ["apple", "NVDA", "tesla", "micro systems", "BRK", "therap", "spy", "zzz"]
+
+
+def _assets(count: int) -> List[Dict[str, Any]]:
+    rng = random.Random(13)
+    symbols = set()
+    while len(symbols) < count:
+        symbols.add("".join(rng.choice(string.ascii_uppercase) for _ in range(rng.randint(1, 5))))
+    return [
+        {"symbol": symbol, "name": " ".join(rng.sample(WORDS, rng.randint(2, 4))), "exchange": "NASDAQ"}
+        for symbol in sorted(symbols)
+    ]
+
+
+def search_scan(assets: List[Dict[str, Any]], q: str) -> List[str]:
+    """The old endpoint, minus the asset list download"""
+    query = q.upper()
+    matches = [a for a in assets if query in a["symbol"].upper() or query in a["name"].upper()]
+
+    def sort_key(a: Dict[str, Any]) -> tuple:
+        symbol, name = a["symbol"].upper(), a["name"].upper()
+        if symbol == query:
+            return (0, len(symbol), symbol)
+        if symbol.startswith(query):
+            return (1, len(symbol), symbol)
+        if query in symbol:
+            return (2, len(symbol), symbol)
+        if name.startswith(query):
+            return (3, len(name), symbol)
+        return (4, len(name), symbol)
+
+    return [a["symbol"] for a in sorted(matches, key=sort_key)[:15]]
+
+
+def _keystrokes() -> List[str]:
+    return [query[:n] for query in QUERIES for n in range(1, len(query) + 1)]
+
+
+def _time(fn: Callable[[], Any], repeat: int) -> float:
+    """Median milliseconds per call"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--assets", type=int, default=12_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    assets = _assets(args.assets)
+    build_start = time.perf_counter()
+    index = AssetIndex(assets)
+    build_ms = (time.perf_counter() - build_start) * 1000
+    keystrokes = _keystrokes()
+
+    # Both must agree before timing means anything
+    for q in keystrokes:
+        assert search_scan(assets, q) == [a["symbol"] for a in index.search(q)], q
+
+    scan_ms = _time(lambda: [search_scan(assets, q) for q in keystrokes], args.repeat) / len(keystrokes)
+    index_ms = _time(lambda: [index.search(q) for q in keystrokes], args.repeat) / len(keystrokes)
+    print(f"{args.assets} assets, {len(keystrokes)} keystrokes")
+    print(f"  substring scan: {scan_ms:8.3f} ms per keystroke")
+    print(f"  indexes:        {index_ms:8.3f} ms per keystroke  ({scan_ms / index_ms:.0f}x)")
+    print(f"  index build:    {build_ms:8.1f} ms  (once per asset refresh)")
+
+
+if __name__ == "__main__":
+    main()
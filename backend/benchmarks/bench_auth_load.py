@@ -0,0 +1,150 @@
+"""
+Load benchmark: latency of unrelated endpoints during a login burst.
+
+Fires concurrent /login requests at an in-process app while a probe keeps
+requesting a trivial endpoint, and reports the probe's latency percentiles
+with bcrypt running inline on the event loop (the old behavior) and in the
+bounded password hashing pool. The "noop" run skips bcrypt entirely, giving
+the cost of handling the burst itself.
+
+Usage:
+    python -m benchmarks.bench_auth_load --logins 200
+    python -m benchmarks.bench_auth_load --logins 200 --max-pending 256 --rounds 12
+"""
+
+import argparse
+import asyncio
+import time
+from collections import Counter
+from typing import AsyncGenerator, Tuple
+
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from api import auth
+from core.database import get_db
+from core.metrics import LatencyTracker
+from core.security import get_password_hash, pwd_context, verify_password
+from models.user import User
+from services.password_hasher import PasswordHasher
+
+
+class InlineHasher:
+    """bcrypt on the event loop, as /login and /register used to run it."""
+
+    async def hash(self, password: str) -> str:
+        return get_password_hash(password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return verify_password(plain_password, hashed_password)
+
+
+class NoopHasher:
+    """Accepts any password instantly: the cost of the burst itself."""
+
+    async def hash(self, password: str) -> str:
+        return password
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return True
+
+
+class _Session:
+    async def commit(self) -> None:
+        pass
+
+
+def _app(user: User) -> FastAPI:
+    app = FastAPI()
+    app.include_router(auth.router, prefix="/api/v1/auth")
+
+    @app.get("/ping")
+    async def ping() -> dict:
+        return {"status": "ok"}
+
+    async def override_get_db() -> AsyncGenerator[_Session, None]:
+        yield _Session()
+
+    async def get_by_email(cls, db, email):
+        return user
+
+    app.dependency_overrides[get_db] = override_get_db
+    User.get_by_email = classmethod(get_by_email)
+    return app
+
+
+async def _probe(client: AsyncClient, stop: asyncio.Event, interval: float) -> LatencyTracker:
+    """
+    Request /ping on a fixed schedule. Latency is measured from when each
+    request was due, so time spent unable to even send it (a blocked event
+    loop) is counted.
+    """
+    latency = LatencyTracker(window=100_000)
+    due = time.perf_counter()
+    while not stop.is_set():
+        await client.get("/ping")
+        now = time.perf_counter()
+        # Requests that fell due while this one was stuck count as late too
+        while due <= now:
+            latency.record(now - due)
+            due += interval
+        await asyncio.sleep(due - now)
+    return latency
+
+
+async def _run(app: FastAPI, logins: int, interval: float) -> Tuple[LatencyTracker, Counter, float]:
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        stop = asyncio.Event()
+        probe = asyncio.create_task(_probe(client, stop, interval))
+        await asyncio.sleep(0.05)
+
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(
+            client.post(
+                "/api/v1/auth/login",
+                data={"username": "bench@example.com", "password": "password123"},
+            )
+            for _ in range(logins)
+        ))
+        elapsed = time.perf_counter() - start
+
+        stop.set()
+        latency = await probe
+    return latency, Counter(r.status_code for r in responses), elapsed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--max-pending", type=int, default=64)
+    parser.add_argument("--rounds", type=int, default=10, help="bcrypt cost of the stored hash")
+    parser.add_argument("--interval-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    user = User(
+        id=1,
+        email="bench@example.com",
+        username="bench",
+        hashed_password=pwd_context.hash("password123", rounds=args.rounds),
+    )
+    app = _app(user)
+    interval = args.interval_ms / 1000
+
+    for name, hasher in (
+        ("noop", NoopHasher()),
+        ("inline", InlineHasher()),
+        ("pool", PasswordHasher(workers=args.workers, max_pending=args.max_pending)),
+    ):
+        auth.password_hasher = hasher
+        latency, statuses, elapsed = await _run(app, args.logins, interval)
+        print(f"{name:>6}: /ping {latency.snapshot()}")
+        print(f"        {args.logins} logins in {elapsed:.2f}s, statuses {dict(statuses)}")
+        if isinstance(hasher, PasswordHasher):
+            print(f"        hasher {hasher.stats()}")
+            hasher.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,91 @@
+"""
+Throughput benchmark for signed Kalshi requests.
+
+Sends concurrent signed GETs through KalshiClient against an in-process
+transport that answers instantly, so the cost measured is signing plus
+client overhead. Compares signing inline on the event loop (the old
+behavior), on the signing thread, and on the signing thread with
+signature reuse.
+
+Requests per CPU-second (whole process) approximates requests per core;
+requests per loop CPU-second counts only the event loop thread, i.e. how
+much of the loop's capacity each request costs.
+
+Usage:
+    python -m benchmarks.bench_kalshi_signing --requests 5000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Dict, Tuple
+
+import httpx
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from services.kalshi_service import KalshiClient
+
+
+class InlineSigningClient(KalshiClient):
+    """Signs on the event loop, as every request used to."""
+
+    async def _sign(self, timestamp: str, method: str, path: str) -> str:
+        return self._sign_request(timestamp, method, path)
+
+
+def _handler(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200, json={"markets": []})
+
+
+async def _run(
+    client: KalshiClient, requests: int, concurrency: int
+) -> Tuple[float, float, float]:
+    """Returns wall, process CPU and loop thread CPU seconds for the run."""
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(_handler))
+    queue = iter(range(requests))
+
+    async def worker() -> None:
+        for _ in queue:
+            await client.get_markets(limit=100)
+
+    wall, cpu, loop_cpu = time.perf_counter(), time.process_time(), time.thread_time()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - wall
+    cpu = time.process_time() - cpu
+    loop_cpu = time.thread_time() - loop_cpu
+    await client.close()
+    return wall, cpu, loop_cpu
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--key-size", type=int, default=2048)
+    args = parser.parse_args()
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=args.key_size)
+    modes: Dict[str, KalshiClient] = {
+        "inline": InlineSigningClient(),
+        "thread": KalshiClient(),
+        "reuse": KalshiClient(),
+    }
+    modes["reuse"].signature_reuse = True
+
+    for name, client in modes.items():
+        client.api_key = "bench"
+        client.private_key = key
+        client.max_concurrency = args.concurrency
+        client._semaphore = asyncio.Semaphore(args.concurrency)
+        wall, cpu, loop_cpu = await _run(client, args.requests, args.concurrency)
+        print(
+            f"{name:>6}: {args.requests / wall:,.0f} req/s, "
+            f"{args.requests / cpu:,.0f} req per CPU-second, "
+            f"{args.requests / loop_cpu:,.0f} req per loop CPU-second"
+        )
+        if name != "inline":
+            print(f"        signing {client.signing_stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,120 @@
+"""
+Screener benchmark: per-dict filter vs the columnar StockTable.
+
+Screens a synthetic universe with five predicates (price range, minimum
+volume, change % range, minimum market cap, sector) and returns the most
+traded matches, first as a Python loop over stock dicts, then through the
+sorted indexes and masks in services/stock_snapshot.py.
+
+Usage:
+    python -m benchmarks.bench_screener --symbols 10000
+"""
+
+import argparse
+import math
+import random
+import statistics
+import time
+from typing import Any, Callable, Dict, List
+
+from services.stock_snapshot import StockTable
+
+SECTORS = ["Technology", "Health Care", "Financials", "Energy", "Industrials", "Utilities"]
+LIMIT = 50
+FILTERS = {
+    "price": (10.0, 200.0),
+    "volume": (500_000, None),
+    "change_percent": (-1.0, 4.0),
+    "market_cap": (2e9, None),
+}
+SECTOR = "Technology"
+
+
+def _stocks(count: int) -> List[Dict[str, Any]]:
+    rng = random.Random(11)
+    stocks = []
+    for i in range(count):
+        price = rng.lognormvariate(3.5, 1.2)
+        stocks.append({
+            "symbol": f"SYM{i}",
+            "name": f"Company {i}",
+            "price": price,
+            "previous_close": price / (1 + rng.gauss(0, 0.03)),
+            "volume": int(rng.lognormvariate(12, 2)),
+            "market_cap": rng.choice([math.nan, rng.lognormvariate(21, 2)]),
+            "sector": rng.choice(SECTORS + [None]),
+        })
+    return stocks
+
+
+def screen_dicts(stocks: List[Dict[str, Any]]) -> List[str]:
+    """One stock at a time"""
+    matches = []
+    for stock in stocks:
+        change_percent = (stock["price"] - stock["previous_close"]) / stock["previous_close"] * 100
+        if not FILTERS["price"][0] <= stock["price"] <= FILTERS["price"][1]:
+            continue
+        if stock["volume"] < FILTERS["volume"][0]:
+            continue
+        if not FILTERS["change_percent"][0] <= change_percent <= FILTERS["change_percent"][1]:
+            continue
+        if not stock["market_cap"] >= FILTERS["market_cap"][0]:
+            continue
+        if stock["sector"] != SECTOR:
+            continue
+        matches.append(stock)
+    matches.sort(key=lambda s: -s["volume"])
+    return [s["symbol"] for s in matches[:LIMIT]]
+
+
+def _table(stocks: List[Dict[str, Any]]) -> StockTable:
+    return StockTable(
+        symbols=[s["symbol"] for s in stocks],
+        names=[s["name"] for s in stocks],
+        price=[s["price"] for s in stocks],
+        volume=[s["volume"] for s in stocks],
+        previous_close=[s["previous_close"] for s in stocks],
+        sectors=[s["sector"] for s in stocks],
+        market_cap=[s["market_cap"] for s in stocks],
+    )
+
+
+def screen_table(table: StockTable) -> List[Dict[str, Any]]:
+    """Sorted-index range, masks, then records for the page"""
+    return [table.record(row) for row in table.screen(FILTERS, sector=SECTOR, limit=LIMIT)]
+
+
+def _time(fn: Callable[[], Any], repeat: int) -> float:
+    """Median milliseconds per call"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--symbols", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=21)
+    args = parser.parse_args()
+
+    stocks = _stocks(args.symbols)
+    table = _table(stocks)
+
+    # Both must agree before timing means anything
+    expected = screen_dicts(stocks)
+    assert expected == [r["symbol"] for r in screen_table(table)]
+
+    dicts_ms = _time(lambda: screen_dicts(stocks), args.repeat)
+    table_ms = _time(lambda: screen_table(table), args.repeat)
+    build_ms = _time(lambda: _table(stocks), 3)
+    print(f"{args.symbols} symbols, {len(expected)} returned (top {LIMIT})")
+    print(f"  per-dict loop:  {dicts_ms:8.2f} ms")
+    print(f"  columnar table: {table_ms:8.2f} ms  ({dicts_ms / table_ms:.0f}x)")
+    print(f"  table rebuild:  {build_ms:8.2f} ms  (once per refresh)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Wire-format benchmark for market WebSocket ticks.
+
+Compares bytes per tick and encode cost of the JSON frames against the
+binary FULL/DELTA records from services/ws_codec.py.
+
+Usage:
+    python -m benchmarks.bench_ws_codec --ticks 100000
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+from services.ws_codec import BinaryTickCodec, extract_tick
+from services.ws_fanout import encode_message
+
+
+def _messages(count: int, symbols: List[str]) -> List[Dict[str, Any]]:
+    rng = random.Random(7)
+    prices = {symbol: rng.uniform(20, 600) for symbol in symbols}
+    now = datetime(2026, 1, 25, 14, 30, tzinfo=timezone.utc)
+    messages = []
+    for i in range(count):
+        symbol = symbols[i % len(symbols)]
+        prices[symbol] = round(prices[symbol] * (1 + rng.gauss(0, 0.0005)), 2)
+        price = prices[symbol]
+        messages.append({
+            "type": "quote",
+            "symbol": symbol,
+            "data": {
+                "symbol": symbol,
+                "price": price,
+                "bid": round(price - 0.01, 2),
+                "ask": price,
+                "volume": 0,
+                "change": 0.0,
+                "change_percent": 0.0,
+                "timestamp": (now + timedelta(milliseconds=37 * i)).isoformat(),
+            },
+        })
+    return messages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ticks", type=int, default=100_000)
+    parser.add_argument("--symbols", type=int, default=50)
+    args = parser.parse_args()
+
+    symbols = [f"SYM{i}" for i in range(args.symbols)]
+    messages = _messages(args.ticks, symbols)
+
+    start = time.perf_counter()
+    json_bytes = sum(len(encode_message(m).encode()) for m in messages)
+    json_elapsed = time.perf_counter() - start
+
+    # Tick extraction happens once per broadcast, not per subscriber
+    start = time.perf_counter()
+    ticks = [extract_tick(m["symbol"], m) for m in messages]
+    extract_elapsed = time.perf_counter() - start
+
+    codec = BinaryTickCodec()
+    codec.assign_ids(symbols)
+    start = time.perf_counter()
+    binary_bytes = sum(len(codec.encode(tick)) for tick in ticks)
+    binary_elapsed = time.perf_counter() - start
+
+    n = len(messages)
+    print(f"json:   {json_bytes / n:6.1f} B/tick  {json_elapsed / n * 1e6:5.2f} us/tick")
+    print(
+        f"binary: {binary_bytes / n:6.1f} B/tick  {binary_elapsed / n * 1e6:5.2f} us/tick "
+        f"(+{extract_elapsed / n * 1e6:.2f} us/tick extract, once per broadcast)"
+    )
+    print(f"egress: {json_bytes / binary_bytes:.1f}x smaller")
+
+
+if __name__ == "__main__":
+    main()
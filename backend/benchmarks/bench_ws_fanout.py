@@ -0,0 +1,108 @@
+"""
+Fan-out benchmark for ConnectionManager.broadcast_to_symbol.
+
+Subscribes in-memory sockets to SPY, a handful of which never finish their
+writes, and reports fan-out latency percentiles against the old sequential
+send_json loop.
+
+Usage:
+    python -m benchmarks.bench_ws_fanout --subscribers 10000 --ticks 50
+    python -m benchmarks.bench_ws_fanout --subscribers 10000 --outbox
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Dict, List
+
+from fastapi.websockets import WebSocketState
+
+from api.websocket import ConnectionManager
+from core.metrics import LatencyTracker
+
+
+class FakeSocket:
+    """In-memory socket; slow sockets never complete a write."""
+
+    def __init__(self, slow: bool = False) -> None:
+        self.client_state = WebSocketState.CONNECTED
+        self.slow = slow
+        self.received = 0
+
+    async def send_text(self, data: str) -> None:
+        if self.slow:
+            await asyncio.sleep(3600)
+        self.received += 1
+
+    async def send_json(self, data: Dict[str, Any]) -> None:
+        await self.send_text(json.dumps(data))
+
+    async def close(self, code: int = 1000, reason: str = "") -> None:
+        self.client_state = WebSocketState.DISCONNECTED
+
+
+def _tick(seq: int) -> Dict[str, Any]:
+    return {
+        "type": "quote",
+        "symbol": "SPY",
+        "data": {"price": 512.34 + seq / 100, "bid": 512.33, "ask": 512.35, "seq": seq},
+    }
+
+
+async def _legacy(sockets: List[FakeSocket], ticks: int) -> LatencyTracker:
+    tracker = LatencyTracker()
+    for seq in range(ticks):
+        start = time.perf_counter()
+        for websocket in sockets:
+            await websocket.send_json(_tick(seq))
+        tracker.record(time.perf_counter() - start)
+    return tracker
+
+
+async def _engine(
+    sockets: List[FakeSocket],
+    ticks: int,
+    outbox: bool,
+) -> ConnectionManager:
+    manager = ConnectionManager()
+    for websocket in sockets:
+        manager.subscribe_symbol(websocket, "SPY")
+        if outbox:
+            manager.open_outbox(websocket)
+    for seq in range(ticks):
+        await manager.broadcast_to_symbol("SPY", _tick(seq))
+        # Let writer tasks drain between ticks
+        await asyncio.sleep(0)
+    await asyncio.sleep(0.5)
+    return manager
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--subscribers", type=int, default=10_000)
+    parser.add_argument("--slow", type=int, default=5)
+    parser.add_argument("--ticks", type=int, default=50)
+    parser.add_argument(
+        "--outbox",
+        action="store_true",
+        help="Give every socket a queued writer, as the /market endpoint does",
+    )
+    args = parser.parse_args()
+
+    fast = [FakeSocket() for _ in range(args.subscribers - args.slow)]
+    slow = [FakeSocket(slow=True) for _ in range(args.slow)]
+    manager = await _engine(fast + slow, args.ticks, args.outbox)
+    print(f"engine: {manager.broadcast_latency.snapshot()}")
+    if args.outbox:
+        print(f"        per-frame delivery {manager.delivery_latency.snapshot()}")
+    remaining = len(manager.symbol_subscriptions["SPY"])
+    print(f"        {remaining:,} subscribers left after eviction")
+
+    # The legacy loop would block forever on a slow socket, so only time fast ones
+    legacy = await _legacy([FakeSocket() for _ in fast], args.ticks)
+    print(f"legacy: {legacy.snapshot()} (fast sockets only)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,96 @@
+"""
+Microbenchmark for the WebSocket subscription registry.
+
+Simulates a reconnect storm: every socket disconnects and resubscribes to a
+fresh set of symbols, and compares the indexed registry against the old
+scan-every-symbol disconnect.
+
+Usage:
+    python -m benchmarks.bench_ws_registry --sockets 50000 --symbols 5000
+"""
+
+import argparse
+import random
+import time
+from typing import Any, Dict, List, Set
+
+from services.ws_registry import SubscriptionIndex
+
+
+class LegacyRegistry:
+    """The previous ConnectionManager bookkeeping, for comparison."""
+
+    def __init__(self) -> None:
+        self.symbol_subscriptions: Dict[str, Set[Any]] = {}
+
+    def subscribe(self, websocket: Any, symbol: str) -> None:
+        if symbol not in self.symbol_subscriptions:
+            self.symbol_subscriptions[symbol] = set()
+        self.symbol_subscriptions[symbol].add(websocket)
+
+    def remove(self, websocket: Any) -> None:
+        for symbol in list(self.symbol_subscriptions.keys()):
+            self.symbol_subscriptions[symbol].discard(websocket)
+            if not self.symbol_subscriptions[symbol]:
+                del self.symbol_subscriptions[symbol]
+
+
+def _populate(registry: Any, sockets: List[Any], plans: List[List[str]]) -> None:
+    for websocket, symbols in zip(sockets, plans):
+        for symbol in symbols:
+            registry.subscribe(websocket, symbol)
+
+
+def _churn(registry: Any, sockets: List[Any], plans: List[List[str]]) -> float:
+    """Disconnect and resubscribe each socket, returning seconds elapsed."""
+    start = time.perf_counter()
+    for websocket, symbols in zip(sockets, plans):
+        registry.remove(websocket)
+        for symbol in symbols:
+            registry.subscribe(websocket, symbol)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sockets", type=int, default=50_000)
+    parser.add_argument("--symbols", type=int, default=5_000)
+    parser.add_argument("--per-socket", type=int, default=10)
+    parser.add_argument(
+        "--legacy-sample",
+        type=int,
+        default=500,
+        help="Disconnects to time on the legacy registry (it is too slow to run fully)",
+    )
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    universe = [f"SYM{i}" for i in range(args.symbols)]
+    sockets = [object() for _ in range(args.sockets)]
+    plans = [rng.sample(universe, args.per_socket) for _ in sockets]
+    replans = [rng.sample(universe, args.per_socket) for _ in sockets]
+
+    indexed = SubscriptionIndex()
+    _populate(indexed, sockets, plans)
+    elapsed = _churn(indexed, sockets, replans)
+    per_op = elapsed / len(sockets) * 1e6
+    print(
+        f"indexed: {len(sockets):,} reconnects in {elapsed * 1e3:.1f} ms "
+        f"({per_op:.2f} us/reconnect)"
+    )
+
+    legacy = LegacyRegistry()
+    _populate(legacy, sockets, plans)
+    sample = min(args.legacy_sample, len(sockets))
+    legacy_elapsed = _churn(legacy, sockets[:sample], replans[:sample])
+    legacy_per_op = legacy_elapsed / sample * 1e6
+    print(
+        f"legacy:  {sample:,} reconnects in {legacy_elapsed * 1e3:.1f} ms "
+        f"({legacy_per_op:.2f} us/reconnect, "
+        f"~{legacy_per_op * len(sockets) / 1e6:.1f} s projected for {len(sockets):,})"
+    )
+    print(f"speedup: {legacy_per_op / per_op:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
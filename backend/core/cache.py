@@ -0,0 +1,69 @@
+"""Bounded in-process caches."""
+
+import time
+from collections import OrderedDict
+from typing import Generic, Hashable, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """
+    Least-recently-used cache with expiring entries.
+
+    An entry expires ``ttl`` seconds after it is set, or at the epoch time
+    given to set(), whichever comes first. Expired entries are dropped when
+    read; the size bound evicts the least recently used entry.
+    """
+
+    def __init__(self, maxsize: int, ttl: Optional[float] = None) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # key -> (expires_at, value)
+        self._data: "OrderedDict[K, Tuple[float, V]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: K) -> Optional[V]:
+        """Get a live entry, or None."""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry[0] <= time.time():
+            del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: K, value: V, expires_at: Optional[float] = None) -> None:
+        """Store an entry, expiring after ``ttl`` or at ``expires_at``."""
+        if self.ttl is not None:
+            ttl_expiry = time.time() + self.ttl
+            expires_at = ttl_expiry if expires_at is None else min(expires_at, ttl_expiry)
+        elif expires_at is None:
+            expires_at = float("inf")
+
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: K) -> Optional[V]:
+        """Remove an entry, returning its value if it was cached."""
+        entry = self._data.pop(key, None)
+        return entry[1] if entry is not None else None
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        self._data.clear()
+
+    def stats(self) -> dict:
+        """Size and hit/miss counters."""
+        return {"size": len(self._data), "hits": self.hits, "misses": self.misses}
@@ -37,11 +37,51 @@ class Settings(BaseSettings):
     kafka_topic_alerts: str = "arbitrage-alerts"
     kafka_topic_lines: str = "line-movements"
 
+    # WebSocket
+    ws_send_timeout: float = 0.25
+    ws_queue_size: int = 256
+    ws_max_batch_ms: int = 1000
+    # Resumable streams: recent frames kept per channel, and channels kept
+    ws_replay_size: int = 64
+    ws_replay_channels: int = 5000
+    # Cluster mode: share user/symbol presence across nodes through Redis
+    ws_cluster_mode: bool = False
+    ws_presence_ttl: int = 30
+    ws_presence_heartbeat: int = 10
+
     # Alpaca API
     alpaca_api_key: str = ""
     alpaca_secret_key: str = ""
     alpaca_base_url: str = "https://paper-api.alpaca.markets"
     alpaca_data_url: str = "https://data.alpaca.markets"
+    # Seconds before a request fails, pooled connections, requests in flight per host
+    alpaca_timeout: float = 10.0
+    alpaca_max_connections: int = 20
+    alpaca_max_concurrency_per_host: int = 10
+    # Quote cache: seconds a quote is fresh, extra seconds it may be served
+    # stale while one refresh runs, and the cross-node refresh lock TTL (ms)
+    quote_cache_ttl: int = 30
+    quote_stale_ttl: int = 15
+    quote_lock_ttl_ms: int = 3000
+    # Most symbols one unauthenticated /api/public/quotes request may ask for
+    public_quotes_max_symbols: int = 50
+    # In-process cache of parsed market:{symbol} values in front of Redis.
+    # Set the keyspace flag when Redis has notify-keyspace-events enabled
+    # (e.g. "Kg$x") to drop entries as soon as another process writes them.
+    market_cache_size: int = 10000
+    market_cache_ttl: float = 1.0
+    market_cache_keyspace_events: bool = False
+    # Local bar store: column files root, seconds between upstream tail
+    # checks per series, and how many series keep their files mapped
+    bar_store_path: str = "./data/bars"
+    bar_store_refresh_seconds: float = 5.0
+    bar_store_open_series: int = 512
+    # Screener universe: seconds between bulk price refreshes and asset list
+    # refreshes, plus an optional CSV of symbol,sector,market_cap (or
+    # shares_outstanding) since Alpaca has no sector or size data
+    stock_snapshot_refresh_seconds: float = 60.0
+    stock_universe_refresh_seconds: float = 3600.0
+    stock_reference_path: str = ""
 
     # Finnhub API
     finnhub_api_key: str = ""
@@ -55,6 +95,13 @@ class Settings(BaseSettings):
     jwt_algorithm: str = "HS256"
     jwt_access_token_expire_minutes: int = 30
     jwt_refresh_token_expire_days: int = 7
+    # Verified tokens and authenticated users kept in memory per worker
+    auth_token_cache_size: int = 10000
+    auth_user_cache_size: int = 10000
+    auth_user_cache_ttl: int = 30
+    # bcrypt worker threads, and calls allowed to queue before rejecting
+    auth_hash_workers: int = 2
+    auth_hash_max_pending: int = 64
 
     # ML Model
     ml_model_path: str = "./ml/models"
@@ -0,0 +1,33 @@
+"""In-process latency metrics."""
+
+from collections import deque
+from typing import Deque, Dict
+
+
+class LatencyTracker:
+    """Rolling window of durations with percentile reporting."""
+
+    def __init__(self, window: int = 2048) -> None:
+        self._samples: Deque[float] = deque(maxlen=window)
+        self.total = 0
+
+    def record(self, seconds: float) -> None:
+        """Record one duration."""
+        self._samples.append(seconds)
+        self.total += 1
+
+    def snapshot(self) -> Dict[str, float]:
+        """Summarize the window in milliseconds."""
+        ordered = sorted(self._samples) or [0.0]
+        last = len(ordered) - 1
+
+        def pick(pct: float) -> float:
+            return round(ordered[int(round(pct / 100 * last))] * 1000, 3)
+
+        return {
+            "count": self.total,
+            "p50_ms": pick(50),
+            "p95_ms": pick(95),
+            "p99_ms": pick(99),
+            "max_ms": pick(100),
+        }
@@ -0,0 +1,201 @@
+"""Process-wide Redis pub/sub listener with in-memory dispatch."""
+
+import asyncio
+import inspect
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set, Union
+
+from redis.asyncio.client import PubSub
+
+from core.config import settings
+from core.redis import RedisClient, redis_client
+
+# handler(channel, data) - may return an awaitable, which the listener awaits
+Handler = Callable[[str, str], Union[None, Awaitable[None]]]
+
+
+class PubSubHub:
+    """
+    One Redis pub/sub connection per process, shared by every WebSocket.
+
+    The hub pattern-subscribes once and routes each message through an
+    in-memory table: handlers registered for the exact channel (one per
+    local socket) and handlers registered for the pattern that matched.
+    Delivery is push-driven, with no per-socket polling.
+
+    Channels outside the patterns can be subscribed on demand with
+    subscribe()/unsubscribe(); changes are applied in batches by a sync task
+    and replayed after a reconnect.
+    """
+
+    def __init__(
+        self,
+        redis: RedisClient,
+        patterns: Iterable[str],
+        reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 30.0,
+    ) -> None:
+        self.redis = redis
+        self.patterns = list(patterns)
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+
+        # channel -> handlers for that exact channel
+        self._channel_handlers: Dict[str, Set[Handler]] = {}
+        # pattern -> handlers for every channel matching it
+        self._pattern_handlers: Dict[str, Set[Handler]] = {}
+
+        # Channels we want vs. channels subscribed on the live connection
+        self._channels: Set[str] = set()
+        self._subscribed: Set[str] = set()
+        self._pubsub: Optional[PubSub] = None
+        self._dirty = asyncio.Event()
+
+        self._task: Optional[asyncio.Task] = None
+        self._sync_task: Optional[asyncio.Task] = None
+
+    def add(self, channel: str, handler: Handler) -> None:
+        """Route messages on an exact channel to a handler."""
+        self._channel_handlers.setdefault(channel, set()).add(handler)
+
+    def remove(self, channel: str, handler: Handler) -> None:
+        """Stop routing a channel to a handler."""
+        handlers = self._channel_handlers.get(channel)
+        if handlers is None:
+            return
+        handlers.discard(handler)
+        if not handlers:
+            del self._channel_handlers[channel]
+
+    def on_pattern(self, pattern: str, handler: Handler) -> None:
+        """Route every message matched by a subscribed pattern to a handler."""
+        self._pattern_handlers.setdefault(pattern, set()).add(handler)
+
+    def subscribe(self, channel: str) -> None:
+        """Subscribe to an exact channel (applied asynchronously)."""
+        self._channels.add(channel)
+        self._dirty.set()
+
+    def unsubscribe(self, channel: str) -> None:
+        """Unsubscribe from an exact channel (applied asynchronously)."""
+        self._channels.discard(channel)
+        self._dirty.set()
+
+    @property
+    def channels(self) -> Set[str]:
+        """Exact channels this process wants to receive."""
+        return self._channels
+
+    async def start(self) -> None:
+        """Start the listener and subscription sync tasks."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+            self._sync_task = asyncio.create_task(self._sync())
+
+    async def stop(self) -> None:
+        """Stop the listener and subscription sync tasks."""
+        for task in (self._task, self._sync_task):
+            if task is None:
+                continue
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self._sync_task = None
+
+    async def dispatch(self, message: Dict[str, Any]) -> None:
+        """Deliver one message from Redis to its local handlers."""
+        if message.get("type") not in ("message", "pmessage"):
+            return
+
+        channel = message["channel"]
+        data = message["data"]
+        handlers = list(self._channel_handlers.get(channel, ()))
+        pattern = message.get("pattern")
+        if pattern is not None:
+            handlers.extend(self._pattern_handlers.get(pattern, ()))
+
+        for handler in handlers:
+            try:
+                result = handler(channel, data)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                print(f"Error dispatching {channel}: {e}")
+
+    async def _listen(self) -> None:
+        """Listener loop, reconnecting with backoff on connection errors."""
+        delay = self.reconnect_delay
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.psubscribe(*self.patterns)
+                channels = set(self._channels)
+                if channels:
+                    await pubsub.subscribe(*channels)
+                self._subscribed = channels
+                self._pubsub = pubsub
+                # Pick up anything that changed while we were subscribing
+                self._dirty.set()
+
+                delay = self.reconnect_delay
+                async for message in pubsub.listen():
+                    await self.dispatch(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ Redis pub/sub listener error: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+            finally:
+                self._pubsub = None
+                self._subscribed = set()
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    async def _sync(self) -> None:
+        """Apply subscribe()/unsubscribe() changes to the live connection."""
+        while True:
+            await self._dirty.wait()
+            self._dirty.clear()
+
+            pubsub = self._pubsub
+            if pubsub is None:
+                # The listener subscribes everything wanted when it connects
+                continue
+
+            added = self._channels - self._subscribed
+            removed = self._subscribed - self._channels
+            try:
+                if added:
+                    await pubsub.subscribe(*added)
+                    self._subscribed |= added
+                if removed:
+                    await pubsub.unsubscribe(*removed)
+                    self._subscribed -= removed
+            except Exception as e:
+                # The listener sees the broken connection and resubscribes
+                print(f"⚠️ Redis pub/sub sync error: {e}")
+
+
+# Channels streamed to WebSocket clients
+STREAM_PATTERNS = ["alerts:user:*", "social:feed"]
+# Writes to market:{symbol} keys, when Redis has keyspace notifications on
+MARKET_KEYSPACE_PATTERN = "__keyspace@*__:market:*"
+
+
+def _invalidate_market_data(channel: str, data: str) -> None:
+    redis_client.invalidate_market_data(channel.split(":market:", 1)[1])
+
+
+# Global pub/sub hub instance
+pubsub_hub = PubSubHub(
+    redis_client,
+    patterns=STREAM_PATTERNS + (
+        [MARKET_KEYSPACE_PATTERN] if settings.market_cache_keyspace_events else []
+    ),
+)
+pubsub_hub.on_pattern(MARKET_KEYSPACE_PATTERN, _invalidate_market_data)
@@ -1,17 +1,33 @@
 """Redis client configuration for caching and pub/sub."""
 
-from typing import Optional
+import json
+import secrets
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
 import redis.asyncio as redis
 
+from core.cache import LRUCache
 from core.config import settings
 
 
+_RELEASE_LOCK = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
 class RedisClient:
     """Redis client wrapper for async operations."""
 
     def __init__(self) -> None:
         self._client: Optional[redis.Redis] = None
+        # symbol -> (parsed market data, Redis expiry as epoch seconds)
+        self.market_cache: LRUCache[str, Tuple[Dict[str, Any], float]] = LRUCache(
+            settings.market_cache_size, ttl=settings.market_cache_ttl
+        )
 
     async def connect(self) -> None:
         """Initialize Redis connection."""
@@ -52,14 +68,110 @@ class RedisClient:
         await self.client.delete(key)
 
     # Real-time data caching
+    #
+    # Parsed market data is also kept in a small in-process LRU (L1) for
+    # market_cache_ttl seconds, never past the Redis key's own expiry.
+    # Writes through this client drop the local entry; writes by other
+    # processes arrive through invalidate_market_data (prices:* relay and,
+    # when enabled, keyspace notifications).
     async def cache_market_data(self, symbol: str, data: str, ttl: int = 60) -> None:
         """Cache market data for a symbol."""
         key = f"market:{symbol}"
         await self.set(key, data, expire=ttl)
+        self.market_cache.pop(symbol)
 
-    async def get_market_data(self, symbol: str) -> Optional[str]:
-        """Get cached market data for a symbol."""
-        return await self.get(f"market:{symbol}")
+    async def get_market_data(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Get cached market data for a symbol, parsed."""
+        value, _ = await self.get_market_data_with_ttl(symbol)
+        return value
+
+    async def get_market_data_with_ttl(
+        self,
+        symbol: str,
+        local: bool = True,
+    ) -> Tuple[Optional[Dict[str, Any]], int]:
+        """
+        Get cached market data, parsed, and its remaining TTL in ms
+        (-1 if the key never expires, -2 if it does not exist).
+
+        ``local=False`` skips the in-process cache. Values are shared with
+        that cache, so callers must not mutate them.
+        """
+        if local:
+            entry = self.market_cache.get(symbol)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at == float("inf"):
+                    return value, -1
+                return value, max(0, int((expires_at - time.time()) * 1000))
+
+        async with self.client.pipeline(transaction=False) as pipe:
+            key = f"market:{symbol}"
+            pipe.get(key)
+            pipe.pttl(key)
+            raw, ttl = await pipe.execute()
+        if raw is None:
+            return None, ttl
+        value = json.loads(raw)
+        self._remember_market_data(symbol, value, ttl)
+        return value, ttl
+
+    async def get_market_data_many(self, symbols: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Get parsed market data for several symbols; misses share one GET+PTTL pipeline."""
+        values: List[Optional[Dict[str, Any]]] = []
+        missing: List[int] = []
+        for i, symbol in enumerate(symbols):
+            entry = self.market_cache.get(symbol)
+            values.append(entry[0] if entry is not None else None)
+            if entry is None:
+                missing.append(i)
+        if not missing:
+            return values
+
+        async with self.client.pipeline(transaction=False) as pipe:
+            for i in missing:
+                key = f"market:{symbols[i]}"
+                pipe.get(key)
+                pipe.pttl(key)
+            results = await pipe.execute()
+        for n, i in enumerate(missing):
+            raw, ttl = results[2 * n], results[2 * n + 1]
+            if raw is not None:
+                values[i] = json.loads(raw)
+                self._remember_market_data(symbols[i], values[i], ttl)
+        return values
+
+    async def cache_market_data_many(self, data: Dict[str, str], ttl: int = 60) -> None:
+        """Cache market data for several symbols in one pipelined round trip."""
+        if not data:
+            return
+        async with self.client.pipeline(transaction=False) as pipe:
+            for symbol, value in data.items():
+                pipe.set(f"market:{symbol}", value, ex=ttl)
+            await pipe.execute()
+        for symbol in data:
+            self.market_cache.pop(symbol)
+
+    def invalidate_market_data(self, symbol: str) -> None:
+        """Drop a symbol from the in-process cache (it changed elsewhere)."""
+        self.market_cache.pop(symbol)
+
+    def _remember_market_data(self, symbol: str, value: Dict[str, Any], ttl_ms: int) -> None:
+        # The Redis expiry travels with the entry so readers get a real TTL
+        expires_at = time.time() + ttl_ms / 1000 if ttl_ms >= 0 else float("inf")
+        self.market_cache.set(symbol, (value, expires_at), expires_at=expires_at)
+
+    # Locks
+    async def acquire_lock(self, key: str, ttl_ms: int) -> Optional[str]:
+        """Take a short-lived lock; returns its token, or None if it is held."""
+        token = secrets.token_hex(8)
+        if await self.client.set(key, token, nx=True, px=ttl_ms):
+            return token
+        return None
+
+    async def release_lock(self, key: str, token: str) -> None:
+        """Release a lock if it is still ours (it may have expired and been retaken)."""
+        await self.client.eval(_RELEASE_LOCK, 1, key, token)
 
     # Pub/Sub for real-time updates
     async def publish(self, channel: str, message: str) -> None:
@@ -1,16 +1,21 @@
 """Security utilities for authentication and authorization."""
 
+import hashlib
 from datetime import datetime, timedelta, timezone
 from typing import Any, Optional
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
+from core.cache import LRUCache
 from core.config import settings
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# SHA-256 of a verified token -> its claims, until the token expires
+token_cache: LRUCache[bytes, dict[str, Any]] = LRUCache(settings.auth_token_cache_size)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against a hashed password."""
@@ -69,13 +74,28 @@ def create_refresh_token(
 
 
 def decode_token(token: str) -> Optional[dict[str, Any]]:
-    """Decode and validate a JWT token."""
+    """
+    Decode and validate a JWT token.
+
+    Tokens that verified before are looked up by digest instead of being
+    verified again, until their ``exp``. Tokens without ``exp`` and
+    rejected tokens are never cached.
+    """
+    digest = hashlib.sha256(token.encode()).digest()
+    claims = token_cache.get(digest)
+    if claims is not None:
+        return dict(claims)
+
     try:
         payload = jwt.decode(
             token,
             settings.jwt_secret_key,
             algorithms=[settings.jwt_algorithm],
         )
-        return payload
     except JWTError:
         return None
+
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        token_cache.set(digest, dict(payload), expires_at=exp)
+    return payload
@@ -0,0 +1 @@
+# Local stand-ins for third-party APIs - run with python -m fixtures.<name>
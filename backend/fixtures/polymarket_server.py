@@ -0,0 +1,94 @@
+"""
+Local stand-in for the Polymarket Gamma API.
+
+Serves ``GET /markets`` (limit/offset pagination) from a JSON fixture, so the
+arbitrage scanner can run without network access. With ``--drift`` every
+request moves each price by a small random step, giving the scanner price
+changes to react to. ``--mirror-kalshi N`` adds a copy of the first N open
+Kalshi markets (same title and expiry, shifted price) so matches exist
+against live Kalshi data.
+
+Usage:
+    python -m fixtures.polymarket_server --port 8100 --drift 0.01
+    POLYMARKET_API_URL=http://localhost:8100 python -m workers.arbitrage_scanner
+"""
+
+import argparse
+import asyncio
+import json
+import random
+from pathlib import Path
+from typing import Any, Dict, List
+
+import uvicorn
+from fastapi import FastAPI, Query
+
+FIXTURE = Path(__file__).with_name("polymarket_markets.json")
+
+
+def _walk(market: Dict[str, Any], step: float) -> None:
+    """Move a Yes/No market's price by up to ``step``"""
+    outcomes = json.loads(market["outcomes"])
+    if [o.lower() for o in outcomes] != ["yes", "no"]:
+        return
+    yes = float(json.loads(market["outcomePrices"])[0])
+    yes = min(0.99, max(0.01, yes + random.uniform(-step, step)))
+    market["outcomePrices"] = json.dumps([f"{yes:.3f}", f"{1 - yes:.3f}"])
+
+
+def create_app(markets: List[Dict[str, Any]], drift: float = 0.0) -> FastAPI:
+    """App serving ``markets`` as the Gamma API would"""
+    app = FastAPI(title="Polymarket fixture")
+
+    @app.get("/markets")
+    async def list_markets(
+        limit: int = Query(500, ge=1),
+        offset: int = Query(0, ge=0),
+        active: bool = True,
+        closed: bool = False,
+    ) -> List[Dict[str, Any]]:
+        if drift:
+            for market in markets:
+                _walk(market, drift)
+        return markets[offset:offset + limit]
+
+    return app
+
+
+async def _mirror_kalshi(count: int) -> List[Dict[str, Any]]:
+    """Polymarket-shaped copies of open Kalshi markets, a few points off"""
+    from services.kalshi_service import kalshi_client
+
+    mirrored = []
+    for market in await kalshi_client.get_markets(limit=count):
+        formatted = kalshi_client.format_market_for_arb(market)
+        yes = min(0.99, max(0.01, formatted["kalshi"]["yes"] + random.uniform(-0.06, 0.06)))
+        mirrored.append({
+            "id": f"mirror-{formatted['id']}",
+            "question": formatted["event"],
+            "endDate": formatted["expiry"],
+            "outcomes": json.dumps(["Yes", "No"]),
+            "outcomePrices": json.dumps([f"{yes:.3f}", f"{1 - yes:.3f}"]),
+            "volume": str(random.randint(10_000, 2_000_000)),
+        })
+    await kalshi_client.close()
+    return mirrored
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--fixture", type=Path, default=FIXTURE)
+    parser.add_argument("--drift", type=float, default=0.0, help="max price step per request")
+    parser.add_argument("--mirror-kalshi", type=int, default=0, metavar="N")
+    args = parser.parse_args()
+
+    markets = json.loads(args.fixture.read_text())
+    if args.mirror_kalshi:
+        markets += asyncio.run(_mirror_kalshi(args.mirror_kalshi))
+    print(f"✅ Serving {len(markets)} Polymarket fixture markets on port {args.port}")
+    uvicorn.run(create_app(markets, args.drift), host="127.0.0.1", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,13 +3,20 @@
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
-from api import auth, chat, market, notifications, social, users, websocket, kalshi, news, webhooks
+from api import auth, chat, market, notifications, public, social, users, websocket, kalshi, news, webhooks
 from core.config import settings
 from core.database import close_db, init_db
+from core.pubsub import pubsub_hub
 from core.redis import redis_client
+from services.alpaca_service import AlpacaAPIError, alpaca_service
+from services.kalshi_service import kalshi_client
+from services.kalshi_snapshot import kalshi_snapshot
+from services.password_hasher import password_hasher
+from services.stock_snapshot import stock_snapshot
 
 
 @asynccontextmanager
@@ -29,9 +36,20 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     try:
         await redis_client.connect()
         print("✅ Redis connected")
+        await pubsub_hub.start()
+        if settings.ws_cluster_mode:
+            await websocket.start_cluster_mode()
     except Exception as e:
         print(f"⚠️ Redis not available (optional): {e}")
     
+    # Keep Kalshi markets in memory so the Kalshi routes never wait upstream
+    if kalshi_client.api_key:
+        await kalshi_snapshot.start()
+
+    # Likewise the stock universe behind the screener
+    if settings.alpaca_api_key:
+        await stock_snapshot.start()
+    
     print("✅ Stratify Backend ready!")
     
     yield
@@ -43,9 +61,17 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     except:
         pass
     try:
+        if settings.ws_cluster_mode:
+            await websocket.stop_cluster_mode()
+        await pubsub_hub.stop()
         await redis_client.disconnect()
     except:
         pass
+    await kalshi_snapshot.stop()
+    await stock_snapshot.stop()
+    await kalshi_client.close()
+    await alpaca_service.close()
+    password_hasher.shutdown()
     print("✅ Connections closed")
 
 
@@ -67,8 +93,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.exception_handler(AlpacaAPIError)
+async def alpaca_error_handler(request: Request, exc: AlpacaAPIError) -> JSONResponse:
+    """Upstream market data failures: 504 on timeout, 502 otherwise."""
+    return JSONResponse(status_code=exc.status_code, content={"detail": str(exc)})
+
+
 # Include routers
-from backend.api import public
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["Authentication"])
 app.include_router(users.router, prefix="/api/v1/users", tags=["Users"])
 app.include_router(market.router, prefix="/api/v1/market", tags=["Market Data"])
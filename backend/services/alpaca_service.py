@@ -1,135 +1,213 @@
 """Alpaca API service for market data."""
 
+import asyncio
 from datetime import datetime
 from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
 
-from alpaca.data import StockHistoricalDataClient, StockLatestQuoteRequest
-from alpaca.data.requests import StockBarsRequest
-from alpaca.data.timeframe import TimeFrame
+import httpx
 
 from core.config import settings
 
+# Symbols per multi-quote request, keeping the query string well within
+# upstream URL limits
+QUOTE_BATCH_SIZE = 200
+# Largest bars page Alpaca serves
+BARS_PAGE_SIZE = 10000
+
+
+class AlpacaAPIError(Exception):
+    """Raised when Alpaca cannot be reached or answers with an error."""
+
+    def __init__(self, message: str, status_code: int = 502) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class AlpacaTimeoutError(AlpacaAPIError):
+    """Raised when an Alpaca request exceeds ``alpaca_timeout``."""
+
+    def __init__(self, message: str) -> None:
+        super().__init__(message, status_code=504)
+
+
+def _parse_timestamp(value: str) -> datetime:
+    """Parse Alpaca's RFC 3339 timestamps (nanosecond precision, "Z")."""
+    value = value.replace("Z", "+00:00")
+    main, dot, rest = value.partition(".")
+    if dot:
+        # datetime only takes microseconds
+        digits = len(rest) - len(rest.lstrip("0123456789"))
+        value = f"{main}.{rest[:min(digits, 6)]}{rest[digits:]}"
+    return datetime.fromisoformat(value)
+
 
 class AlpacaService:
-    """Service for interacting with Alpaca Markets API."""
+    """
+    Service for interacting with Alpaca Markets API.
+
+    Requests go through one pooled async HTTP client, with at most
+    ``alpaca_max_concurrency_per_host`` in flight to each Alpaca host.
+    Timeouts and error responses raise AlpacaTimeoutError / AlpacaAPIError.
+    """
 
     def __init__(self) -> None:
-        self._client: Optional[StockHistoricalDataClient] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
 
-    def _get_client(self) -> StockHistoricalDataClient:
-        """Get or create Alpaca client."""
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared HTTP client, created on first use."""
         if self._client is None:
-            self._client = StockHistoricalDataClient(
-                api_key=settings.alpaca_api_key,
-                secret_key=settings.alpaca_secret_key,
+            self._client = httpx.AsyncClient(
+                headers={
+                    "APCA-API-KEY-ID": settings.alpaca_api_key,
+                    "APCA-API-SECRET-KEY": settings.alpaca_secret_key,
+                    "Accept": "application/json",
+                },
+                timeout=settings.alpaca_timeout,
+                limits=httpx.Limits(
+                    max_connections=settings.alpaca_max_connections,
+                    max_keepalive_connections=settings.alpaca_max_connections,
+                    keepalive_expiry=60,
+                ),
             )
         return self._client
 
-    def _parse_timeframe(self, timeframe: str) -> TimeFrame:
-        """Convert string timeframe to Alpaca TimeFrame."""
-        mapping = {
-            "1Min": TimeFrame.Minute,
-            "5Min": TimeFrame.Minute,
-            "15Min": TimeFrame.Minute,
-            "1H": TimeFrame.Hour,
-            "1D": TimeFrame.Day,
-        }
-        return mapping.get(timeframe, TimeFrame.Day)
+    async def close(self) -> None:
+        """Close the connection pool."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
-    async def get_quote(self, symbol: str) -> Dict[str, Any]:
-        """Get real-time quote for a symbol."""
-        client = self._get_client()
-        
-        request = StockLatestQuoteRequest(symbol_or_symbols=symbol.upper())
-        quote = client.get_stock_latest_quote(request)
-        
-        quote_data = quote.get(symbol.upper())
-        if not quote_data:
-            return {}
-        
+    async def _get(self, url: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """GET a JSON document, limited per host."""
+        host = urlsplit(url).netloc
+        limit = self._host_limits.get(host)
+        if limit is None:
+            limit = self._host_limits[host] = asyncio.Semaphore(
+                settings.alpaca_max_concurrency_per_host
+            )
+
+        async with limit:
+            try:
+                response = await self.client.get(url, params=params)
+            except httpx.TimeoutException as e:
+                raise AlpacaTimeoutError(f"Alpaca request timed out: {url}") from e
+            except httpx.HTTPError as e:
+                raise AlpacaAPIError(f"Alpaca request failed: {e}") from e
+
+        if response.status_code == 404:
+            raise AlpacaAPIError(response.text[:200] or "Not found", status_code=404)
+        if response.status_code >= 400:
+            raise AlpacaAPIError(f"Alpaca API error: {response.status_code} - {response.text[:200]}")
+        return response.json()
+
+    def _format_quote(self, symbol: str, quote_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert an Alpaca quote object to our quote shape."""
         return {
-            "symbol": symbol.upper(),
-            "price": float(quote_data.ask_price),
-            "bid": float(quote_data.bid_price),
-            "ask": float(quote_data.ask_price),
+            "symbol": symbol,
+            "price": float(quote_data["ap"]),
+            "bid": float(quote_data["bp"]),
+            "ask": float(quote_data["ap"]),
+            "bid_size": quote_data.get("bs", 0),
+            "ask_size": quote_data.get("as", 0),
             "volume": 0,  # Would need separate call for volume
             "change": 0.0,  # Calculate from previous close
             "change_percent": 0.0,
-            "timestamp": quote_data.timestamp.isoformat(),
+            "timestamp": _parse_timestamp(quote_data["t"]).isoformat(),
         }
 
-    async def get_bars(
+    async def get_quote(self, symbol: str) -> Dict[str, Any]:
+        """Get real-time quote for a symbol."""
+        symbol = symbol.upper()
+        data = await self._get(f"{settings.alpaca_data_url}/v2/stocks/{symbol}/quotes/latest")
+
+        quote_data = data.get("quote")
+        if not quote_data:
+            return {}
+        return self._format_quote(symbol, quote_data)
+
+    async def fetch_quotes(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get latest quotes for many symbols from Alpaca, bypassing the cache.
+
+        Sends one request per QUOTE_BATCH_SIZE symbols, concurrently.
+        Unknown symbols are left out of the result.
+        """
+        chunks = [symbols[i:i + QUOTE_BATCH_SIZE] for i in range(0, len(symbols), QUOTE_BATCH_SIZE)]
+        responses = await asyncio.gather(*(
+            self._get(
+                f"{settings.alpaca_data_url}/v2/stocks/quotes/latest",
+                params={"symbols": ",".join(chunk)},
+            )
+            for chunk in chunks
+        ))
+
+        quotes = {}
+        for data in responses:
+            for symbol, quote_data in (data.get("quotes") or {}).items():
+                quotes[symbol] = self._format_quote(symbol, quote_data)
+        return quotes
+
+    async def fetch_bars(
         self,
         symbol: str,
-        timeframe: str = "1D",
-        limit: int = 100,
+        timeframe: str,
+        start: datetime,
+        end: datetime,
     ) -> List[Dict[str, Any]]:
-        """Get historical bars/candles for a symbol."""
-        client = self._get_client()
-        
-        from datetime import timedelta
-        end = datetime.now()
-        
-        # Calculate start time based on timeframe and limit
-        if "Min" in timeframe:
-            start = end - timedelta(days=5)
-        elif timeframe == "1H":
-            start = end - timedelta(days=30)
-        else:
-            start = end - timedelta(days=365)
-        
-        request = StockBarsRequest(
-            symbol_or_symbols=symbol.upper(),
-            timeframe=self._parse_timeframe(timeframe),
-            start=start,
-            end=end,
-            limit=limit,
+        """
+        Get raw Alpaca bars (t/o/h/l/c/v) for a time range, oldest first.
+
+        ``timeframe`` is an Alpaca timeframe such as "1Min" or "1Day".
+        Follows page tokens until the range is exhausted. For cached bars
+        use services.bar_store instead.
+        """
+        bars: List[Dict[str, Any]] = []
+        params: Dict[str, Any] = {
+            "timeframe": timeframe,
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "limit": BARS_PAGE_SIZE,
+        }
+        while True:
+            data = await self._get(
+                f"{settings.alpaca_data_url}/v2/stocks/{symbol.upper()}/bars",
+                params=params,
+            )
+            bars.extend(data.get("bars") or [])
+            token = data.get("next_page_token")
+            if not token:
+                return bars
+            params["page_token"] = token
+
+    async def get_assets(self) -> List[Dict[str, Any]]:
+        """Every active US equity asset (symbol, name, exchange, tradable, ...)."""
+        return await self._get(
+            f"{settings.alpaca_base_url}/v2/assets",
+            params={"status": "active", "asset_class": "us_equity"},
         )
-        
-        bars = client.get_stock_bars(request)
-        symbol_bars = bars.get(symbol.upper(), [])
-        
-        return [
-            {
-                "symbol": symbol.upper(),
-                "open": float(bar.open),
-                "high": float(bar.high),
-                "low": float(bar.low),
-                "close": float(bar.close),
-                "volume": int(bar.volume),
-                "timestamp": bar.timestamp.isoformat(),
-            }
-            for bar in symbol_bars
-        ]
-
-    async def screen_stocks(
-        self,
-        min_price: Optional[float] = None,
-        max_price: Optional[float] = None,
-        min_volume: Optional[int] = None,
-        min_change_percent: Optional[float] = None,
-        max_change_percent: Optional[float] = None,
-        sector: Optional[str] = None,
-        limit: int = 50,
-    ) -> List[Dict[str, Any]]:
+
+    async def fetch_snapshots(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
         """
-        Screen stocks based on criteria.
-        
-        Note: Alpaca doesn't have a native screener API.
-        This would need to:
-        1. Get a list of tradeable assets
-        2. Fetch quotes for each
-        3. Filter based on criteria
-        
-        For production, consider using a dedicated screener API.
+        Get raw Alpaca snapshots (latestTrade, dailyBar, prevDailyBar, ...)
+        for many symbols, QUOTE_BATCH_SIZE per request, concurrently.
+        Symbols without data are left out of the result.
         """
-        # Placeholder - would need real implementation
-        # Could integrate with providers like:
-        # - Financial Modeling Prep
-        # - Polygon.io
-        # - Alpha Vantage
-        
-        return []
+        chunks = [symbols[i:i + QUOTE_BATCH_SIZE] for i in range(0, len(symbols), QUOTE_BATCH_SIZE)]
+        responses = await asyncio.gather(*(
+            self._get(
+                f"{settings.alpaca_data_url}/v2/stocks/snapshots",
+                params={"symbols": ",".join(chunk)},
+            )
+            for chunk in chunks
+        ))
+
+        snapshots = {}
+        for data in responses:
+            snapshots.update({symbol: snap for symbol, snap in data.items() if snap})
+        return snapshots
 
     async def get_account(self) -> Dict[str, Any]:
         """Get Alpaca account information."""
@@ -0,0 +1,309 @@
+"""
+Arbitrage Engine
+Matches equivalent Kalshi and Polymarket contracts and tracks their spreads
+"""
+import re
+from datetime import date, datetime
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from services.arbitrage_table import TIER_LABELS, MarketTable, confidence_tiers
+
+# Words that carry no meaning for matching "Will X happen by Y?" titles
+_STOPWORDS = frozenset({
+    "a", "an", "the", "will", "be", "by", "in", "on", "of", "at", "to", "for",
+    "is", "are", "than", "or", "and", "end", "before", "after", "this",
+})
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Redis key holding the current opportunities, widest spread first
+OPPORTUNITIES_KEY = "arbitrage:opportunities"
+
+
+def title_tokens(title: str) -> FrozenSet[str]:
+    """Normalized, order-insensitive words of a market title"""
+    return frozenset(t for t in _TOKEN.findall(title.lower()) if t not in _STOPWORDS)
+
+
+def expiry_day(expiry: Optional[str]) -> Optional[date]:
+    """Calendar day (UTC) of an ISO-8601 expiry, or None if unparseable"""
+    if not expiry:
+        return None
+    try:
+        return datetime.fromisoformat(expiry.replace("Z", "+00:00")).date()
+    except ValueError:
+        return None
+
+
+def expiry_ts(expiry: Optional[str]) -> float:
+    """Epoch seconds of an ISO-8601 expiry (NaN if unparseable)"""
+    if not expiry:
+        return float("nan")
+    try:
+        return datetime.fromisoformat(expiry.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return float("nan")
+
+
+class MatchIndex:
+    """
+    Polymarket contracts indexed by expiry day and title word, so a Kalshi
+    market is only compared against contracts that expire within
+    ``expiry_tolerance_days`` and share at least one word with it.
+
+    Two contracts match when the Jaccard similarity of their title words
+    is at least ``min_similarity``.
+    """
+
+    def __init__(self, min_similarity: float = 0.6, expiry_tolerance_days: int = 1):
+        self.min_similarity = min_similarity
+        self.expiry_tolerance_days = expiry_tolerance_days
+        self._tokens: Dict[str, FrozenSet[str]] = {}
+        # (expiry day ordinal, word) -> contract ids
+        self._postings: Dict[Tuple[int, str], Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+    def build(self, contracts: Iterable[Dict[str, Any]]) -> None:
+        """Replace the index with these contracts"""
+        self._tokens = {}
+        self._postings = {}
+        for contract in contracts:
+            day = expiry_day(contract.get("expiry"))
+            if day is None:
+                continue
+            tokens = title_tokens(contract.get("title", ""))
+            self._tokens[contract["id"]] = tokens
+            for token in tokens:
+                self._postings.setdefault((day.toordinal(), token), set()).add(contract["id"])
+
+    def match(self, title: str, expiry: Optional[str]) -> Optional[str]:
+        """Id of the best matching contract, if any is similar enough"""
+        day = expiry_day(expiry)
+        if day is None:
+            return None
+        tokens = title_tokens(title)
+
+        candidates: Set[str] = set()
+        ordinal = day.toordinal()
+        for offset in range(-self.expiry_tolerance_days, self.expiry_tolerance_days + 1):
+            for token in tokens:
+                candidates |= self._postings.get((ordinal + offset, token), set())
+
+        best, best_score = None, self.min_similarity
+        for contract_id in candidates:
+            other = self._tokens[contract_id]
+            score = len(tokens & other) / len(tokens | other)
+            if score >= best_score:
+                best, best_score = contract_id, score
+        return best
+
+
+class ArbitrageEngine:
+    """
+    Books for both venues plus the matched pairs' prices in a MarketTable.
+
+    Kalshi markets are matched to Polymarket contracts once, when they are
+    first seen (or when the Polymarket listing changes). After that a price
+    change only writes the affected rows, and spreads and edges are
+    computed for just those rows in one vectorized pass.
+
+    ``update_kalshi`` and ``update_polymarket`` return the opportunities
+    worth announcing: pairs whose fee-adjusted edge just rose above
+    ``min_edge``, or grew by ``republish_delta`` points since they were last
+    announced. A wide spread that fees eat is never announced.
+    """
+
+    def __init__(
+        self,
+        min_edge: float = 0.0,
+        republish_delta: float = 1.0,
+        index: Optional[MatchIndex] = None,
+        kalshi_fee_rate: float = 0.07,
+        poly_fee_rate: float = 0.0,
+    ):
+        self.min_edge = min_edge
+        self.republish_delta = republish_delta
+        self.index = index or MatchIndex()
+        self.kalshi_fee_rate = kalshi_fee_rate
+        self.poly_fee_rate = poly_fee_rate
+
+        self.kalshi: Dict[str, Dict[str, Any]] = {}
+        self.polymarket: Dict[str, Dict[str, Any]] = {}
+        # Kalshi ticker -> Polymarket id, and the reverse
+        self.pairs: Dict[str, str] = {}
+        self._paired: Dict[str, Set[str]] = {}
+        # One row per pair, keyed by Kalshi ticker
+        self.table = MarketTable()
+
+    def update_kalshi(self, markets: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Apply formatted Kalshi markets (see KalshiClient.format_market_for_arb)"""
+        changed = []
+        for market in markets:
+            ticker = market.get("id")
+            if not ticker:
+                continue
+            previous = self.kalshi.get(ticker)
+            self.kalshi[ticker] = market
+            if previous is None:
+                self._pair(ticker)
+            elif ticker in self.pairs and previous.get("kalshi") != market.get("kalshi"):
+                self._set_kalshi(self.table.rows[ticker], market)
+            else:
+                continue
+            if ticker in self.table.rows:
+                changed.append(self.table.rows[ticker])
+        return self._announce(changed)
+
+    def update_polymarket(
+        self, contracts: Iterable[Dict[str, Any]], complete: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Apply the Polymarket listing, normalized (see PolymarketClient.normalize)
+
+        When the listing is ``complete``, contracts missing from it were
+        delisted and are dropped, along with their pairs. A truncated
+        listing only adds and updates contracts.
+        """
+        changed: Set[int] = set()
+        listed = False
+        seen: Set[str] = set()
+        for contract in contracts:
+            seen.add(contract["id"])
+            previous = self.polymarket.get(contract["id"])
+            self.polymarket[contract["id"]] = contract
+            if previous is None:
+                listed = True
+                continue
+            if previous["yes"] == contract["yes"] and previous["no"] == contract["no"]:
+                continue
+            for ticker in self._paired.get(contract["id"], ()):
+                row = self.table.rows[ticker]
+                self._set_poly(row, contract)
+                changed.add(row)
+
+        delisted = self.polymarket.keys() - seen if complete else set()
+        for contract_id in delisted:
+            del self.polymarket[contract_id]
+
+        if listed or delisted:
+            # New contracts can be better matches for any Kalshi market, and
+            # markets paired with a delisted one may match another
+            announced = dict(zip(self.table.keys, self.table["announced"]))
+            self.index.build(self.polymarket.values())
+            self.pairs = {}
+            self._paired = {}
+            self.table.clear()
+            for ticker in self.kalshi:
+                self._pair(ticker)
+                if ticker in self.table.rows and ticker in announced:
+                    self.table.set(self.table.rows[ticker], announced=announced[ticker])
+            changed = set(range(len(self.table)))
+        return self._announce(sorted(changed))
+
+    def remove_kalshi(self, tickers: Iterable[str]) -> None:
+        """Drop markets that closed"""
+        for ticker in tickers:
+            self.kalshi.pop(ticker, None)
+            self.table.remove(ticker)
+            contract_id = self.pairs.pop(ticker, None)
+            if contract_id is not None:
+                self._paired.get(contract_id, set()).discard(ticker)
+
+    def top(self, limit: int) -> List[Dict[str, Any]]:
+        """Current opportunities with an edge above ``min_edge``, largest edge first"""
+        edge = self._edge()
+        rows = self.table.rank(edge, self.min_edge, limit)
+        return self._opportunities(rows, self.table.spread(rows), edge[rows])
+
+    def _pair(self, ticker: str) -> None:
+        market = self.kalshi[ticker]
+        contract_id = self.index.match(market.get("event") or "", market.get("expiry"))
+        if contract_id is None:
+            return
+        self.pairs[ticker] = contract_id
+        self._paired.setdefault(contract_id, set()).add(ticker)
+        row = self.table.row(ticker)
+        self._set_kalshi(row, market)
+        self._set_poly(row, self.polymarket[contract_id])
+
+    def _set_kalshi(self, row: int, market: Dict[str, Any]) -> None:
+        prices = market.get("kalshi", {})
+        yes = prices.get("yes", 0.5)
+        no = prices.get("no", 1 - yes)
+        self.table.set(
+            row,
+            kalshi_yes_ask=yes,
+            kalshi_no_ask=no,
+            kalshi_yes_bid=prices.get("yes_bid", yes),
+            kalshi_no_bid=prices.get("no_bid", no),
+            kalshi_volume=prices.get("volume", 0),
+            expiry=expiry_ts(market.get("expiry")),
+        )
+
+    def _set_poly(self, row: int, contract: Dict[str, Any]) -> None:
+        self.table.set(
+            row,
+            poly_yes_ask=contract["yes"],
+            poly_no_ask=contract["no"],
+            poly_yes_bid=contract.get("yes_bid", contract["yes"]),
+            poly_no_bid=contract.get("no_bid", contract["no"]),
+            poly_volume=contract["volume"],
+        )
+
+    def _announce(self, rows: List[int]) -> List[Dict[str, Any]]:
+        """Re-evaluate ``rows``, returning the ones to announce"""
+        if not rows:
+            return []
+        rows = np.asarray(rows, dtype=np.intp)
+        edge = self._edge(rows)
+        last = self.table.columns["announced"][rows]
+
+        live = edge > self.min_edge
+        announce = live & (np.isnan(last) | (edge - last >= self.republish_delta))
+        # Pairs that fall below the threshold are announced again if they return
+        last = np.where(live, last, np.nan)
+        last[announce] = edge[announce]
+        self.table.columns["announced"][rows] = last
+
+        rows = rows[announce]
+        return self._opportunities(rows, self.table.spread(rows), edge[announce])
+
+    def _edge(self, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        return self.table.edge(rows, self.kalshi_fee_rate, self.poly_fee_rate)
+
+    def _opportunities(self, rows: np.ndarray, spread: np.ndarray, edge: np.ndarray) -> List[Dict[str, Any]]:
+        """API/alert dicts for ``rows``, whose spreads and edges are already known"""
+        if not len(rows):
+            return []
+        tiers = TIER_LABELS[confidence_tiers(edge)]
+        kalshi_yes = self.table.columns["kalshi_yes_ask"][rows]
+        poly_yes = self.table.columns["poly_yes_ask"][rows]
+
+        opportunities = []
+        for i, row in enumerate(rows.tolist()):
+            ticker = self.table.keys[row]
+            market = self.kalshi[ticker]
+            contract = self.polymarket[self.pairs[ticker]]
+            opportunities.append({
+                "id": ticker,
+                "event": market.get("event"),
+                "category": market.get("category"),
+                "kalshi": {
+                    "yes": round(float(kalshi_yes[i]), 2),
+                    "volume": market.get("kalshi", {}).get("volume", 0),
+                },
+                "polymarket": {
+                    "id": contract["id"],
+                    "yes": round(float(poly_yes[i]), 2),
+                    "volume": contract["volume"],
+                },
+                "spread": float(spread[i]),
+                "edge": float(edge[i]),
+                "profit": f"${int(spread[i] * 10)} per $1000",
+                "confidence": str(tiers[i]),
+                "expiry": market.get("expiry"),
+            })
+        return opportunities
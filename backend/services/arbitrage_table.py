@@ -0,0 +1,147 @@
+"""
+Columnar table of matched Kalshi/Polymarket contract pairs
+Spreads, fee-adjusted edges and ranking are computed as NumPy array passes
+"""
+from typing import Dict, Hashable, List, Optional
+
+import numpy as np
+
+# Prices are dollars per contract paying $1 (0-1)
+COLUMNS = (
+    "kalshi_yes_ask",
+    "kalshi_no_ask",
+    "kalshi_yes_bid",
+    "kalshi_no_bid",
+    "kalshi_volume",
+    "poly_yes_ask",
+    "poly_no_ask",
+    "poly_yes_bid",
+    "poly_no_bid",
+    "poly_volume",
+    "expiry",
+    # Edge last announced for the pair (NaN if none)
+    "announced",
+)
+
+TIER_LABELS = np.array(["Low", "Medium", "High"])
+
+
+def trading_fee(rate: float, price: np.ndarray) -> np.ndarray:
+    """
+    Per-contract taker fee, ``rate * P * (1 - P)`` rounded up to the cent
+    (Kalshi's fee schedule; Polymarket's fee-enabled markets use the same shape)
+    """
+    return np.ceil(np.round(rate * price * (1 - price) * 100, 6)) / 100
+
+
+def confidence_tiers(edge: np.ndarray) -> np.ndarray:
+    """0 (Low), 1 (Medium) or 2 (High) for fee-adjusted edges in percentage points"""
+    return (edge >= 1).astype(np.int8) + (edge >= 2)
+
+
+class MarketTable:
+    """
+    One row per matched pair, one float64 array per column.
+
+    Rows are addressed by key (the Kalshi ticker). Removing a row moves the
+    last row into its slot, so the live rows are always ``[:len(table)]``.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._capacity = capacity
+        self.columns: Dict[str, np.ndarray] = {
+            name: np.full(capacity, np.nan) for name in COLUMNS
+        }
+        self.keys: List[Hashable] = []
+        self.rows: Dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        """Live slice of a column"""
+        return self.columns[name][:len(self.keys)]
+
+    def row(self, key: Hashable) -> int:
+        """Row of ``key``, appending an empty row if it has none"""
+        row = self.rows.get(key)
+        if row is not None:
+            return row
+        if len(self.keys) == self._capacity:
+            self._grow()
+        row = len(self.keys)
+        self.keys.append(key)
+        self.rows[key] = row
+        for column in self.columns.values():
+            column[row] = np.nan
+        return row
+
+    def set(self, row: int, **values: float) -> None:
+        """Write column values for one row"""
+        for name, value in values.items():
+            self.columns[name][row] = value
+
+    def remove(self, key: Hashable) -> None:
+        """Drop ``key``'s row, if it has one"""
+        row = self.rows.pop(key, None)
+        if row is None:
+            return
+        last = len(self.keys) - 1
+        last_key = self.keys.pop()
+        if row != last:
+            for column in self.columns.values():
+                column[row] = column[last]
+            self.keys[row] = last_key
+            self.rows[last_key] = row
+
+    def clear(self) -> None:
+        self.keys = []
+        self.rows = {}
+
+    def _grow(self) -> None:
+        self._capacity *= 2
+        for name, column in self.columns.items():
+            grown = np.full(self._capacity, np.nan)
+            grown[:len(column)] = column
+            self.columns[name] = grown
+
+    def spread(self, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Difference between the venues' YES asks, in percentage points"""
+        kalshi_yes, poly_yes = self._take(rows, "kalshi_yes_ask", "poly_yes_ask")
+        return np.round(np.abs(kalshi_yes - poly_yes) * 100, 1)
+
+    def edge(
+        self,
+        rows: Optional[np.ndarray] = None,
+        kalshi_fee_rate: float = 0.07,
+        poly_fee_rate: float = 0.0,
+    ) -> np.ndarray:
+        """
+        Guaranteed profit in percentage points of the $1 payout from buying
+        YES on one venue and NO on the other, after taker fees, taking the
+        better of the two directions. Negative when there is no true arbitrage.
+        """
+        k_yes, k_no, p_yes, p_no = self._take(
+            rows, "kalshi_yes_ask", "kalshi_no_ask", "poly_yes_ask", "poly_no_ask"
+        )
+        yes_on_kalshi = (
+            k_yes + p_no + trading_fee(kalshi_fee_rate, k_yes) + trading_fee(poly_fee_rate, p_no)
+        )
+        yes_on_poly = (
+            p_yes + k_no + trading_fee(poly_fee_rate, p_yes) + trading_fee(kalshi_fee_rate, k_no)
+        )
+        return np.round((1 - np.minimum(yes_on_kalshi, yes_on_poly)) * 100, 2)
+
+    def rank(self, key: np.ndarray, floor: float, limit: int) -> np.ndarray:
+        """Rows with ``key > floor``, largest key first, at most ``limit``"""
+        candidates = np.flatnonzero(key > floor)
+        if len(candidates) > limit:
+            # Partial selection first: only the top `limit` need a full sort
+            top = np.argpartition(-key[candidates], limit - 1)[:limit]
+            candidates = candidates[top]
+        return candidates[np.argsort(-key[candidates], kind="stable")]
+
+    def _take(self, rows: Optional[np.ndarray], *names: str) -> List[np.ndarray]:
+        if rows is None:
+            return [self[name] for name in names]
+        return [self.columns[name][rows] for name in names]
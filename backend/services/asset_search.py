@@ -0,0 +1,220 @@
+"""
+Asset Search
+Typeahead over the tradable US equity universe, served from in-memory indexes
+"""
+import asyncio
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from services.stock_snapshot import StockSnapshot, stock_snapshot
+
+# Name n-grams indexed; shorter queries use the 1- and 2-gram tables
+NGRAM = 3
+
+
+class _TrieNode:
+    __slots__ = ("children", "ids")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, "_TrieNode"] = {}
+        # Assets under this node, best ranked first
+        self.ids: List[int] = []
+
+
+def _insert(root: _TrieNode, key: str, asset_id: int) -> None:
+    node = root
+    for char in key:
+        node = node.children.setdefault(char, _TrieNode())
+        node.ids.append(asset_id)
+
+
+def _find(root: _TrieNode, key: str) -> Optional[_TrieNode]:
+    node = root
+    for char in key:
+        node = node.children.get(char)
+        if node is None:
+            return None
+    return node
+
+
+def _sort_ids(root: _TrieNode, rank: List[Any]) -> None:
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        node.ids = sorted(set(node.ids), key=rank.__getitem__)
+        stack.extend(node.children.values())
+
+
+class AssetIndex:
+    """
+    Search indexes over one asset list.
+
+    Matches rank as the original endpoint did: exact symbol, symbol prefix,
+    symbol substring, name prefix, then name substring; ties go to the
+    shorter symbol (or name), then alphabetically.
+
+    Symbols live in a prefix trie and a suffix trie (a substring is a prefix
+    of some suffix), each node listing its assets in rank order. Names have
+    an n-gram index whose posting lists are sorted by name rank, so the
+    candidates for a query come out of an intersection already ordered.
+    """
+
+    def __init__(self, assets: List[Dict[str, Any]]):
+        # Asset ids follow name rank: shorter names first, then by symbol
+        self.assets = sorted(assets, key=lambda a: (len(a.get("name") or ""), a["symbol"].upper()))
+        self.symbols = [a["symbol"].upper() for a in self.assets]
+        self.names = [(a.get("name") or "").upper() for a in self.assets]
+        symbol_rank = [(len(s), s) for s in self.symbols]
+
+        self.by_symbol = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.prefixes = _TrieNode()
+        self.substrings = _TrieNode()
+        for i, symbol in enumerate(self.symbols):
+            _insert(self.prefixes, symbol, i)
+            for start in range(len(symbol)):
+                _insert(self.substrings, symbol[start:], i)
+        _sort_ids(self.prefixes, symbol_rank)
+        _sort_ids(self.substrings, symbol_rank)
+
+        postings: Dict[str, List[int]] = defaultdict(list)
+        for i, name in enumerate(self.names):
+            for gram in {name[j:j + n] for n in range(1, NGRAM + 1) for j in range(len(name) - n + 1)}:
+                postings[gram].append(i)
+        # Ids were appended in increasing order, so every list is sorted
+        self.postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+    def __len__(self) -> int:
+        return len(self.assets)
+
+    def _name_candidates(self, query: str) -> np.ndarray:
+        """Ids whose name contains every n-gram of the query, in name rank order"""
+        n = min(len(query), NGRAM)
+        grams = {query[j:j + n] for j in range(len(query) - n + 1)}
+        lists = []
+        for gram in grams:
+            ids = self.postings.get(gram)
+            if ids is None:
+                return np.empty(0, dtype=np.int32)
+            lists.append(ids)
+        lists.sort(key=len)
+        candidates = lists[0]
+        for ids in lists[1:]:
+            candidates = np.intersect1d(candidates, ids, assume_unique=True)
+            if not len(candidates):
+                break
+        return candidates
+
+    def search(self, query: str, limit: int = 15) -> List[Dict[str, Any]]:
+        """Best ``limit`` tradable assets for a typed query"""
+        query = query.strip().upper()
+        if not query:
+            return []
+
+        ranked: List[int] = []
+        exact = self.by_symbol.get(query)
+        if exact is not None:
+            ranked.append(exact)
+
+        node = _find(self.prefixes, query)
+        prefixed = node.ids if node is not None else []
+        for i in prefixed:
+            if len(ranked) >= limit:
+                break
+            if i != exact:
+                ranked.append(i)
+
+        if len(ranked) < limit:
+            node = _find(self.substrings, query)
+            for i in node.ids if node is not None else []:
+                if len(ranked) >= limit:
+                    break
+                if not self.symbols[i].startswith(query):
+                    ranked.append(i)
+
+        if len(ranked) < limit:
+            # Ids are in name rank order; n-gram hits only need checking
+            # when the query is longer than one n-gram
+            verify = len(query) > NGRAM
+            starts: List[int] = []
+            contains: List[int] = []
+            for i in self._name_candidates(query).tolist():
+                if query in self.symbols[i]:
+                    continue  # already ranked on its symbol
+                name = self.names[i]
+                if name.startswith(query):
+                    starts.append(i)
+                    if len(ranked) + len(starts) >= limit:
+                        break
+                elif (not verify or query in name) and len(ranked) + len(contains) < limit:
+                    contains.append(i)
+            ranked.extend(starts)
+            ranked.extend(contains)
+
+        return [self.assets[i] for i in ranked[:limit]]
+
+
+class AssetSearch:
+    """
+    Serves searches from an AssetIndex rebuilt whenever the stock snapshot
+    refreshes its asset list, so searching never calls upstream; only a
+    search before the first load waits, and only for the asset list and the
+    index build, not for the price snapshots fetched after them.
+
+    Indexes are built in a worker thread (about a second for the full US
+    equity list) and swapped in when complete.
+    """
+
+    def __init__(self, snapshot: StockSnapshot):
+        self.snapshot = snapshot
+        self._index: Optional[AssetIndex] = None
+        self._build_task: Optional[asyncio.Task] = None
+        self._listed = asyncio.Event()
+        snapshot.add_listener(self.load)
+
+    def load(self, assets: List[Dict[str, Any]]) -> None:
+        """Start indexing a new asset list"""
+        self._build_task = asyncio.ensure_future(self._build(assets))
+        self._listed.set()
+
+    async def _build(self, assets: List[Dict[str, Any]]) -> None:
+        try:
+            self._index = await asyncio.to_thread(AssetIndex, assets)
+        except Exception as e:
+            print(f"⚠️ Asset search index build failed: {e}")
+
+    async def search(self, query: str, limit: int = 15) -> List[Dict[str, Any]]:
+        """Best ``limit`` tradable assets for a typed query"""
+        if self._index is None:
+            if self._build_task is None:
+                await self._wait_for_assets()
+            if self._build_task is not None:
+                await asyncio.shield(self._build_task)
+        if self._index is None:
+            return []
+        return self._index.search(query, limit)
+
+    async def _wait_for_assets(self) -> None:
+        """Until the snapshot lists assets (starting the build) or its refresh ends"""
+        refresh = self.snapshot.revalidate()
+        if refresh is None:
+            return
+        listed = asyncio.ensure_future(self._listed.wait())
+        try:
+            # Neither is cancelled if the search is: the refresh carries on
+            await asyncio.wait({refresh, listed}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            listed.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        """Indexed asset and n-gram counts"""
+        index = self._index
+        return {
+            "assets": len(index) if index else 0,
+            "ngrams": len(index.postings) if index else 0,
+        }
+
+
+# Singleton instance
+asset_search = AssetSearch(stock_snapshot)
@@ -0,0 +1,96 @@
+"""Live candles for chart WebSockets, built from relayed price ticks."""
+
+import json
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from fastapi import WebSocket
+
+from services.bar_store import BarStore, bars_to_records
+
+# send(websocket, message, conflation_key) -> queued
+Send = Callable[[WebSocket, Dict[str, Any], str], bool]
+
+
+class BarFeed:
+    """
+    Pushes the in-progress bar to every chart open on a symbol.
+
+    Each ``prices:{symbol}`` tick relayed to this node (fed from the
+    line-movements topic) is folded into the bar store's in-progress bars,
+    and each chart gets its timeframe's current bar from BarStore.latest(),
+    the same bars /bars ends with.
+    """
+
+    def __init__(self, store: BarStore, send: Send) -> None:
+        self.store = store
+        self.send = send
+        # symbol -> websocket -> timeframes charted
+        self.charts: Dict[str, Dict[WebSocket, Set[str]]] = {}
+        # websocket -> (symbol, timeframe) charted, so drop() only touches
+        # that socket's charts
+        self.by_socket: Dict[WebSocket, Set[Tuple[str, str]]] = {}
+
+    def add(self, websocket: WebSocket, symbol: str, timeframe: str) -> None:
+        """Start pushing a symbol's ``timeframe`` bars to a socket."""
+        self.charts.setdefault(symbol, {}).setdefault(websocket, set()).add(timeframe)
+        self.by_socket.setdefault(websocket, set()).add((symbol, timeframe))
+
+    def remove(self, websocket: WebSocket, symbol: str, timeframe: Optional[str] = None) -> None:
+        """Stop pushing one timeframe (or every timeframe) of a symbol."""
+        sockets = self.charts.get(symbol)
+        if sockets is None or websocket not in sockets:
+            return
+        timeframes = sockets[websocket]
+        removed = {timeframe} if timeframe is not None else set(timeframes)
+        timeframes -= removed
+        if not timeframes:
+            del sockets[websocket]
+        if not sockets:
+            del self.charts[symbol]
+
+        keys = self.by_socket[websocket]
+        keys -= {(symbol, t) for t in removed}
+        if not keys:
+            del self.by_socket[websocket]
+
+    def charted(self, websocket: WebSocket, symbol: str) -> bool:
+        """Whether a socket has any timeframe of ``symbol`` open."""
+        return websocket in self.charts.get(symbol, {})
+
+    def drop(self, websocket: WebSocket) -> None:
+        """Remove every chart a socket holds."""
+        for symbol in {symbol for symbol, _ in self.by_socket.get(websocket, ())}:
+            self.remove(websocket, symbol)
+
+    def on_tick(self, symbol: str, data: str) -> None:
+        """Handle one relayed ``price_update`` message."""
+        sockets = self.charts.get(symbol)
+        if not sockets:
+            return
+
+        tick = json.loads(data).get("data") or {}
+        price = tick.get("new_price")
+        if price is None:
+            return
+        timestamp = tick.get("timestamp")
+        if timestamp:
+            t = int(datetime.fromisoformat(timestamp.replace("Z", "+00:00")).timestamp())
+        else:
+            t = int(time.time())
+        self.store.ingest(symbol, t, float(price), float(tick.get("volume") or 0))
+
+        latest: Dict[str, Optional[Dict[str, Any]]] = {}
+        for websocket, timeframes in list(sockets.items()):
+            for timeframe in timeframes:
+                if timeframe not in latest:
+                    bars = self.store.latest(symbol, timeframe)
+                    latest[timeframe] = bars_to_records(symbol, bars)[0] if bars is not None else None
+                bar = latest[timeframe]
+                if bar is not None:
+                    self.send(
+                        websocket,
+                        {"type": "bar", "symbol": symbol, "timeframe": timeframe, "data": bar},
+                        f"bar:{symbol}:{timeframe}",
+                    )
@@ -0,0 +1,121 @@
+"""Vectorized OHLCV resampling over column arrays."""
+
+from datetime import datetime
+from typing import Dict
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+# Bars are dicts of equal-length columns; "t" is the bar's start in epoch seconds
+Bars = Dict[str, np.ndarray]
+
+BAR_COLUMNS = ("t", "open", "high", "low", "close", "volume")
+
+# US equity sessions: New York wall clock, regular session opening at 09:30
+SESSION_TZ = ZoneInfo("America/New_York")
+SESSION_OPEN = 9 * 3600 + 30 * 60
+DAY = 86400
+
+
+def empty_bars() -> Bars:
+    """Bars with no rows."""
+    return {
+        name: np.empty(0, dtype=np.int64 if name == "t" else np.float64)
+        for name in BAR_COLUMNS
+    }
+
+
+def resample(bars: Bars, seconds: int, origin: int = 0) -> Bars:
+    """
+    Aggregate time-sorted bars into ``seconds``-long bars.
+
+    Buckets start at ``origin + k * seconds``. Each output bar takes the
+    first open, highest high, lowest low, last close and summed volume of
+    the input bars whose start falls in its bucket; empty buckets produce
+    no bar.
+    """
+    t = bars["t"]
+    if not len(t):
+        return empty_bars()
+    return _aggregate(bars, (t - origin) // seconds * seconds + origin)
+
+
+def utc_offsets(t: np.ndarray, tz: ZoneInfo = SESSION_TZ) -> np.ndarray:
+    """Seconds from UTC to ``tz`` wall-clock time at each epoch time."""
+    # Offsets only change on the hour, so look up each distinct hour once
+    hours, inverse = np.unique(t // 3600, return_inverse=True)
+    offsets = np.array(
+        [datetime.fromtimestamp(int(h) * 3600, tz).utcoffset().total_seconds() for h in hours],
+        dtype=np.int64,
+    )
+    return offsets[inverse]
+
+
+def session_buckets(t: np.ndarray, seconds: int) -> np.ndarray:
+    """
+    Start of the ``seconds``-long session bar holding each epoch time.
+
+    Daily bars start at New York midnight, as Alpaca's do; shorter bars are
+    aligned to the 09:30 open, so hourly bars run 09:30-10:30 rather than on
+    the clock hour. ``seconds`` must be at most a day.
+    """
+    offsets = utc_offsets(t)
+    local = t + offsets
+    if seconds >= DAY:
+        starts = local // DAY * DAY
+    else:
+        starts = (local - SESSION_OPEN) // seconds * seconds + SESSION_OPEN
+    return starts - offsets
+
+
+def bucket_start(t: int, seconds: int) -> int:
+    """session_buckets() for one epoch time."""
+    return int(session_buckets(np.array([t], dtype=np.int64), seconds)[0])
+
+
+def session_resample(bars: Bars, seconds: int) -> Bars:
+    """Aggregate time-sorted bars into session-aligned bars (see session_buckets)."""
+    t = bars["t"]
+    if not len(t):
+        return empty_bars()
+    return _aggregate(bars, session_buckets(t, seconds))
+
+
+def update_bars(bars: Bars, t: int, price: float, volume: float, seconds: int) -> Bars:
+    """
+    Fold one trade into time-sorted session bars.
+
+    The trade extends the last bar when it falls in that bar's bucket and
+    starts a new bar when it falls in a later one; trades for earlier
+    buckets are ignored. Returns new arrays, leaving ``bars`` unchanged.
+    """
+    start = bucket_start(t, seconds)
+    n = len(bars["t"])
+    if n and start < bars["t"][-1]:
+        return bars
+    if n and start == bars["t"][-1]:
+        bars = {name: bars[name].copy() for name in BAR_COLUMNS}
+        bars["high"][-1] = max(bars["high"][-1], price)
+        bars["low"][-1] = min(bars["low"][-1], price)
+        bars["close"][-1] = price
+        bars["volume"][-1] += volume
+        return bars
+    row = {"t": start, "open": price, "high": price, "low": price, "close": price, "volume": volume}
+    return {name: np.append(bars[name], np.array([row[name]], dtype=bars[name].dtype)) for name in BAR_COLUMNS}
+
+
+def _aggregate(bars: Bars, buckets: np.ndarray) -> Bars:
+    """Merge runs of bars sharing a bucket start."""
+    t = bars["t"]
+    # Index of the first bar in each bucket
+    starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+    ends = np.concatenate((starts[1:], [len(t)])) - 1
+
+    return {
+        "t": buckets[starts],
+        "open": bars["open"][starts],
+        "high": np.maximum.reduceat(bars["high"], starts),
+        "low": np.minimum.reduceat(bars["low"], starts),
+        "close": bars["close"][ends],
+        "volume": np.add.reduceat(bars["volume"], starts),
+    }
@@ -0,0 +1,436 @@
+"""Local store of historical bars, fetched from Alpaca only where missing."""
+
+import asyncio
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from core.cache import LRUCache
+from core.config import settings
+from services.alpaca_service import AlpacaAPIError, alpaca_service
+from services.bar_resampler import (
+    BAR_COLUMNS,
+    Bars,
+    bucket_start,
+    empty_bars,
+    session_resample,
+    update_bars,
+)
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process development only
+    fcntl = None
+
+TIMEFRAME_SECONDS = {"1Min": 60, "5Min": 300, "15Min": 900, "1H": 3600, "1D": 86400}
+# Timeframes kept on disk, with their Alpaca names; the others are
+# resampled from 1Min
+STORED_TIMEFRAMES = {"1Min": "1Min", "1D": "1Day"}
+# Longest period resampled from 1Min, so how far back an in-progress
+# resampled bar can reach into the stored minutes
+RESAMPLED_SPAN = max(s for tf, s in TIMEFRAME_SECONDS.items() if tf not in STORED_TIMEFRAMES)
+# Seconds after a bar's period ends before it is treated as final
+SETTLE_SECONDS = 30
+# Tickers as Alpaca lists them (AAPL, BRK.B); nothing else becomes a path
+SYMBOL_PATTERN = re.compile(r"[A-Z][A-Z0-9]{0,9}(?:\.[A-Z0-9]{1,4})?")
+
+
+def _concat(*parts: Bars) -> Bars:
+    return {name: np.concatenate([part[name] for part in parts]) for name in BAR_COLUMNS}
+
+
+def _take(bars: Bars, index: Any) -> Bars:
+    return {name: bars[name][index] for name in BAR_COLUMNS}
+
+
+def bars_from_alpaca(raw: List[Dict[str, Any]]) -> Bars:
+    """Columns from raw Alpaca bars (t/o/h/l/c/v)."""
+    if not raw:
+        return empty_bars()
+    # "2026-01-02T14:30:00Z" -> epoch seconds
+    t = np.array([bar["t"][:19] for bar in raw], dtype="datetime64[s]").astype(np.int64)
+    return {
+        "t": t,
+        "open": np.array([bar["o"] for bar in raw], dtype=np.float64),
+        "high": np.array([bar["h"] for bar in raw], dtype=np.float64),
+        "low": np.array([bar["l"] for bar in raw], dtype=np.float64),
+        "close": np.array([bar["c"] for bar in raw], dtype=np.float64),
+        "volume": np.array([bar["v"] for bar in raw], dtype=np.float64),
+    }
+
+
+def bars_to_records(symbol: str, bars: Bars) -> List[Dict[str, Any]]:
+    """Bar dicts in the /bars response shape."""
+    timestamps = np.datetime_as_string(bars["t"].astype("datetime64[s]"), timezone="UTC")
+    return [
+        {
+            "symbol": symbol,
+            "open": float(o),
+            "high": float(h),
+            "low": float(l),
+            "close": float(c),
+            "volume": int(v),
+            "timestamp": ts[:-1] + "+00:00",
+        }
+        for ts, o, h, l, c, v in zip(
+            timestamps, bars["open"], bars["high"], bars["low"], bars["close"], bars["volume"]
+        )
+    ]
+
+
+class InvalidSymbolError(AlpacaAPIError):
+    """Raised for a symbol that cannot be a ticker, before it reaches the disk."""
+
+    def __init__(self, symbol: str) -> None:
+        super().__init__(f"Invalid symbol: {symbol[:32]!r}", status_code=400)
+
+
+class BarSeries:
+    """
+    One (symbol, timeframe) on disk: a directory holding meta.json and one
+    generation directory (``g<n>``) with a raw little-endian file per column.
+
+    meta.json names the current generation, how many of its rows are
+    committed and the time range fetched so far (which can be wider than
+    the bars, e.g. over weekends). An append writes every column file, then
+    commits the new row count; a rewrite fills the next generation, then
+    commits it. Both commit by replacing meta.json, a single rename, so a
+    crash at any point leaves the last committed rows, aligned across
+    columns.
+
+    Reads memory-map the committed rows read-only, so range slices are views
+    rather than copies. Writers take an exclusive file lock and re-read
+    meta.json under it, so several API workers can share a store. Nothing
+    is created on disk before the first write.
+
+    Methods that load or write block on the disk and the file lock; call
+    them off the event loop.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.start: Optional[int] = None
+        self.end: Optional[int] = None
+        self.generation = 0
+        self.rows = 0
+        # Time of the last stored bar, for callers on the event loop
+        self.last_t: Optional[int] = None
+        # When this process last checked upstream for newer bars (monotonic)
+        self.synced_at = float("-inf")
+        self._maps: Optional[Bars] = None
+        # Guards the committed state against a writer thread while another
+        # thread maps it
+        self._state_lock = threading.Lock()
+        if (path / "meta.json").exists():
+            with self._locked():
+                self._load()
+
+    def _column_path(self, name: str, generation: Optional[int] = None) -> Path:
+        generation = self.generation if generation is None else generation
+        return self.path / f"g{generation}" / f"{name}.bin"
+
+    def _load(self) -> None:
+        """Read meta.json and cut columns back to the committed rows."""
+        meta_path = self.path / "meta.json"
+        if not meta_path.exists():
+            return
+        meta = json.loads(meta_path.read_text())
+        if "generation" not in meta:
+            return  # Older layout: refetched and rewritten as if empty
+
+        # A crash mid-append leaves bytes past the committed rows
+        rows = meta["rows"]
+        for name in BAR_COLUMNS:
+            path = self._column_path(name, meta["generation"])
+            if path.stat().st_size > rows * 8:
+                os.truncate(path, rows * 8)
+
+        last_t = None
+        if rows:
+            with open(self._column_path("t", meta["generation"]), "rb") as f:
+                f.seek((rows - 1) * 8)
+                last_t = int(np.frombuffer(f.read(8), dtype="<i8")[0])
+        self._set_state(meta["generation"], rows, meta["start"], meta["end"], last_t)
+
+    def _set_state(
+        self, generation: int, rows: int, start: int, end: int, last_t: Optional[int]
+    ) -> None:
+        with self._state_lock:
+            self.generation, self.rows = generation, rows
+            self.start, self.end = start, end
+            self.last_t = last_t
+            self._maps = None
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        self.path.mkdir(parents=True, exist_ok=True)
+        if fcntl is None:
+            yield
+            return
+        with open(self.path / ".lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def bars(self) -> Bars:
+        """Every committed bar, as read-only memory maps."""
+        with self._state_lock:
+            if self._maps is None:
+                if not self.rows:
+                    return empty_bars()
+                self._maps = {
+                    name: np.memmap(
+                        self._column_path(name),
+                        dtype=np.int64 if name == "t" else np.float64,
+                        mode="r",
+                        shape=(self.rows,),
+                    )
+                    for name in BAR_COLUMNS
+                }
+            return self._maps
+
+    def slice(self, start: int, end: int) -> Bars:
+        """Stored bars starting in [start, end), without copying."""
+        bars = self.bars()
+        t = bars["t"]
+        i = int(np.searchsorted(t, start, side="left"))
+        j = int(np.searchsorted(t, end, side="left"))
+        return _take(bars, slice(i, j))
+
+    def copy(self, start: int, end: int) -> Bars:
+        """Stored bars starting in [start, end), read into memory."""
+        return {name: np.array(column) for name, column in self.slice(start, end).items()}
+
+    def append(self, bars: Bars, end: int) -> None:
+        """Add bars after the stored ones and extend the fetched range."""
+        with self._locked():
+            # Another worker may have written since we last looked
+            self._load()
+            if self.last_t is not None:
+                bars = _take(bars, bars["t"] > self.last_t)
+            added = len(bars["t"])
+            for name in BAR_COLUMNS:
+                with open(self._column_path(name), "ab") as f:
+                    f.write(bars[name].astype("<f8" if name != "t" else "<i8").tobytes())
+            last_t = int(bars["t"][-1]) if added else self.last_t
+            self._commit(self.generation, self.rows + added, self.start, max(end, self.end), last_t)
+
+    def prepend(self, bars: Bars, start: int) -> None:
+        """Add bars before the stored ones and extend the fetched range back to ``start``."""
+        with self._locked():
+            self._load()
+            stored = self.bars()
+            if len(stored["t"]):
+                bars = _take(bars, bars["t"] < stored["t"][0])
+            self._rewrite(_concat(bars, stored), min(start, self.start), self.end)
+
+    def rewrite(self, bars: Bars, start: int, end: int) -> None:
+        """Replace the stored bars and fetched range."""
+        with self._locked():
+            self._load()
+            self._rewrite(bars, start, end)
+
+    def _rewrite(self, bars: Bars, start: int, end: int) -> None:
+        generation = self.generation + 1
+        directory = self.path / f"g{generation}"
+        # Left over from a rewrite that crashed before committing
+        shutil.rmtree(directory, ignore_errors=True)
+        directory.mkdir()
+        for name in BAR_COLUMNS:
+            self._column_path(name, generation).write_bytes(
+                bars[name].astype("<f8" if name != "t" else "<i8").tobytes()
+            )
+        last_t = int(bars["t"][-1]) if len(bars["t"]) else None
+        self._commit(generation, len(bars["t"]), start, end, last_t)
+        # Maps of older generations stay readable after their files are unlinked
+        for old in self.path.glob("g*"):
+            if old != directory:
+                shutil.rmtree(old, ignore_errors=True)
+
+    def _commit(
+        self, generation: int, rows: int, start: int, end: int, last_t: Optional[int]
+    ) -> None:
+        tmp = self.path / "meta.json.tmp"
+        tmp.write_text(json.dumps(
+            {"generation": generation, "rows": rows, "start": start, "end": end}
+        ))
+        os.replace(tmp, self.path / "meta.json")
+        self._set_state(generation, rows, start, end, last_t)
+
+
+class BarStore:
+    """
+    Historical bars served from local column files.
+
+    1Min and 1D bars are stored per symbol; 5Min, 15Min and 1H bars are
+    resampled from 1Min, aligned to the trading session. A request fetches
+    from Alpaca only what the store lacks: the range before the first
+    stored bar, if the request reaches back further, and the tail since the
+    last sync (at most once per ``refresh_interval``). Only final bars are
+    written; the bar still in progress is kept in memory and served on top
+    of the stored ones, and ingest() moves it along with live trades
+    between fetches.
+
+    Symbols must look like tickers, and a series gets a directory only once
+    Alpaca has returned bars for it. Disk work runs in worker threads.
+    """
+
+    def __init__(self, root: str, refresh_interval: float, max_open_series: int = 512) -> None:
+        self.root = Path(root)
+        self.refresh_interval = refresh_interval
+        self._series: LRUCache[Tuple[str, str], BarSeries] = LRUCache(max_open_series)
+        self._locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+        # Bars not final yet, from the last sync
+        self._live: Dict[Tuple[str, str], Bars] = {}
+        # The stored 1Min bars an in-progress resampled bar can span, copied
+        # at each sync so latest() never touches the disk
+        self._tail: Dict[Tuple[str, str], Bars] = {}
+
+    async def _open(self, key: Tuple[str, str]) -> BarSeries:
+        series = self._series.get(key)
+        if series is None:
+            symbol, timeframe = key
+            series = await asyncio.to_thread(BarSeries, self.root / timeframe / symbol)
+            self._series.set(key, series)
+        return series
+
+    @staticmethod
+    def _lookback(timeframe: str, limit: int) -> int:
+        """Calendar seconds that comfortably hold ``limit`` bars."""
+        if timeframe == "1D":
+            return (limit * 7 // 5 + 10) * 86400
+        minutes = limit * TIMEFRAME_SECONDS[timeframe] // 60
+        # 390 regular-session minutes per trading day, 5 trading days a week
+        trading_days = minutes // 390 + 1
+        return (trading_days * 7 // 5 + 4) * 86400
+
+    async def get_bars(self, symbol: str, timeframe: str = "1D", limit: int = 100) -> Bars:
+        """The latest ``limit`` bars, oldest first."""
+        if timeframe not in TIMEFRAME_SECONDS:
+            timeframe = "1D"
+        symbol = symbol.upper()
+        if not SYMBOL_PATTERN.fullmatch(symbol):
+            raise InvalidSymbolError(symbol)
+        base = timeframe if timeframe in STORED_TIMEFRAMES else "1Min"
+        key = (symbol, base)
+        now = int(time.time())
+        start = now - self._lookback(timeframe, limit)
+
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            series = await self._open(key)
+            await self._sync(key, series, start, now)
+            stored = await asyncio.to_thread(series.slice, start, now + 1)
+            live = self._live.get(key, empty_bars())
+
+        last = slice(-limit, None)
+        if base != timeframe:
+            return _take(session_resample(_concat(stored, live), TIMEFRAME_SECONDS[timeframe]), last)
+        if not len(live["t"]):
+            # Views of the column files
+            return _take(stored, last)
+        return _take(_concat(_take(stored, last), live), last)
+
+    def ingest(self, symbol: str, t: int, price: float, volume: float = 0.0) -> None:
+        """
+        Fold a live trade into the in-progress bars.
+
+        Only series already read in this process are updated; the next tail
+        fetch replaces these bars with Alpaca's.
+        """
+        symbol = symbol.upper()
+        for base in STORED_TIMEFRAMES:
+            key = (symbol, base)
+            live = self._live.get(key)
+            if live is None:
+                continue
+            series = self._series.get(key)
+            last_t = series.last_t if series is not None else None
+            seconds = TIMEFRAME_SECONDS[base]
+            if last_t is not None and bucket_start(t, seconds) <= last_t:
+                continue
+            self._live[key] = update_bars(live, t, price, volume, seconds)
+
+    def latest(self, symbol: str, timeframe: str) -> Optional[Bars]:
+        """
+        The in-progress bar, as get_bars() would end with it, from memory
+        only (it runs on the event loop for every tick). None when the
+        series has not been read yet.
+        """
+        symbol = symbol.upper()
+        base = timeframe if timeframe in STORED_TIMEFRAMES else "1Min"
+        key = (symbol, base)
+        live = self._live.get(key)
+        if live is None or not len(live["t"]):
+            return None
+        if base == timeframe:
+            return _take(live, slice(-1, None))
+
+        seconds = TIMEFRAME_SECONDS[timeframe]
+        start = bucket_start(int(live["t"][-1]), seconds)
+        tail = self._tail.get(key, empty_bars())
+        stored = _take(tail, (tail["t"] >= start) & (tail["t"] < live["t"][0]))
+        bars = _concat(stored, _take(live, live["t"] >= start))
+        return _take(session_resample(bars, seconds), slice(-1, None))
+
+    async def _sync(self, key: Tuple[str, str], series: BarSeries, start: int, now: int) -> None:
+        symbol, base = key
+        # Bars starting before this are final
+        closed_until = bucket_start(now - SETTLE_SECONDS, TIMEFRAME_SECONDS[base])
+
+        if series.start is None:
+            # Symbols with no bars upstream are retried at the refresh interval
+            if time.monotonic() - series.synced_at < self.refresh_interval:
+                return
+            fetched = await self._fetch(symbol, base, start, now)
+            final = fetched["t"] < closed_until
+            if len(fetched["t"]):
+                await asyncio.to_thread(series.rewrite, _take(fetched, final), start, closed_until)
+                await self._keep_tail(key, series, closed_until)
+            self._live[key] = _take(fetched, ~final)
+            series.synced_at = time.monotonic()
+            return
+
+        if start < series.start:
+            head = await self._fetch(symbol, base, start, series.start - 1)
+            await asyncio.to_thread(series.prepend, head, start)
+
+        if time.monotonic() - series.synced_at < self.refresh_interval:
+            return
+        fetched = await self._fetch(symbol, base, series.end, now)
+        final = fetched["t"] < closed_until
+        await asyncio.to_thread(series.append, _take(fetched, final), closed_until)
+        await self._keep_tail(key, series, closed_until)
+        self._live[key] = _take(fetched, ~final)
+        series.synced_at = time.monotonic()
+
+    async def _keep_tail(self, key: Tuple[str, str], series: BarSeries, until: int) -> None:
+        if key[1] == "1Min":
+            self._tail[key] = await asyncio.to_thread(series.copy, until - RESAMPLED_SPAN, until)
+
+    async def _fetch(self, symbol: str, base: str, start: int, end: int) -> Bars:
+        raw = await alpaca_service.fetch_bars(
+            symbol,
+            STORED_TIMEFRAMES[base],
+            datetime.fromtimestamp(start, timezone.utc),
+            datetime.fromtimestamp(end, timezone.utc),
+        )
+        return bars_from_alpaca(raw)
+
+
+# Global bar store instance
+bar_store = BarStore(
+    settings.bar_store_path,
+    refresh_interval=settings.bar_store_refresh_seconds,
+    max_open_series=settings.bar_store_open_series,
+)
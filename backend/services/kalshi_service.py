@@ -5,23 +5,80 @@ Fetches live prediction market data from Kalshi
 import os
 import time
 import base64
+import asyncio
 import hashlib
 import httpx
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
+from urllib.parse import quote
 from cryptography.hazmat.primitives import hashes, serialization
 from cryptography.hazmat.primitives.asymmetric import padding
 from cryptography.hazmat.backends import default_backend
 
+from core.metrics import LatencyTracker
+
+
+class KalshiAPIError(Exception):
+    """Raised when Kalshi answers with an error status"""
+
 
 class KalshiClient:
-    """Client for interacting with Kalshi API"""
+    """
+    Async client for interacting with Kalshi API
+
+    Requests share one long-lived HTTP/2 connection pool, and at most
+    ``max_concurrency`` are in flight at once.
+
+    RSA signing runs on a dedicated worker thread. With signature reuse
+    on (KALSHI_SIGNATURE_REUSE), concurrent requests for the same method
+    and path in the same millisecond share one signature, since the signed
+    message would be identical.
+    """
     
     def __init__(self):
         self.api_key = os.getenv("KALSHI_API_KEY")
         self.private_key_path = os.getenv("KALSHI_PRIVATE_KEY_PATH", "./kalshi_private_key.pem")
         self.base_url = os.getenv("KALSHI_API_URL", "https://api.elections.kalshi.com/trade-api/v2")
+        self.timeout = float(os.getenv("KALSHI_TIMEOUT", "10"))
+        self.max_connections = int(os.getenv("KALSHI_MAX_CONNECTIONS", "10"))
+        self.max_concurrency = int(os.getenv("KALSHI_MAX_CONCURRENCY", "20"))
+        self.signature_reuse = os.getenv("KALSHI_SIGNATURE_REUSE", "false").lower() == "true"
         self.private_key = self._load_private_key()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        self._signer: Optional[ThreadPoolExecutor] = None
+        # (timestamp, method, path) -> signature, for the current millisecond
+        self._signatures: Dict[Tuple[str, str, str], asyncio.Future] = {}
+        self._signatures_ts = ""
+        self.signing_latency = LatencyTracker()
+        self.signatures_reused = 0
+        self._signing_seconds = 0.0
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared HTTP client, created on first use"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=True,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                    keepalive_expiry=60,
+                ),
+            )
+        return self._client
+    
+    async def close(self) -> None:
+        """Close the connection pool and the signing thread"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self._signer is not None:
+            self._signer.shutdown(wait=False)
+            self._signer = None
         
     def _load_private_key(self):
         """Load RSA private key from file"""
@@ -49,10 +106,58 @@ class KalshiClient:
         )
         return base64.b64encode(signature).decode('utf-8')
     
-    def _get_headers(self, method: str, path: str) -> Dict[str, str]:
+    def _timed_sign(self, timestamp: str, method: str, path: str) -> Tuple[str, float]:
+        start = time.perf_counter()
+        signature = self._sign_request(timestamp, method, path)
+        return signature, time.perf_counter() - start
+    
+    async def _sign(self, timestamp: str, method: str, path: str) -> str:
+        """Sign a request on the signing thread, sharing signatures if enabled"""
+        if not self.private_key:
+            return ""
+        if not self.signature_reuse:
+            return await self._sign_in_worker(timestamp, method, path)
+        
+        if timestamp != self._signatures_ts:
+            # Signatures from earlier milliseconds can never be reused
+            self._signatures = {}
+            self._signatures_ts = timestamp
+        key = (timestamp, method, path)
+        future = self._signatures.get(key)
+        if future is not None:
+            self.signatures_reused += 1
+            return await asyncio.shield(future)
+        
+        future = asyncio.ensure_future(self._sign_in_worker(timestamp, method, path))
+        self._signatures[key] = future
+        return await asyncio.shield(future)
+    
+    async def _sign_in_worker(self, timestamp: str, method: str, path: str) -> str:
+        if self._signer is None:
+            self._signer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="kalshi-signer")
+        signature, seconds = await asyncio.get_running_loop().run_in_executor(
+            self._signer, self._timed_sign, timestamp, method, path
+        )
+        self.signing_latency.record(seconds)
+        self._signing_seconds += seconds
+        return signature
+    
+    def signing_stats(self) -> Dict[str, Any]:
+        """Signatures computed and reused, signing time and throughput"""
+        signed = self.signing_latency.total
+        return {
+            "signed": signed,
+            "reused": self.signatures_reused,
+            "signatures_per_second": (
+                round(signed / self._signing_seconds, 1) if self._signing_seconds else None
+            ),
+            "latency": self.signing_latency.snapshot(),
+        }
+    
+    async def _get_headers(self, method: str, path: str) -> Dict[str, str]:
         """Generate authenticated headers for API request"""
         timestamp = str(int(time.time() * 1000))
-        signature = self._sign_request(timestamp, method, path)
+        signature = await self._sign(timestamp, method, path)
         
         return {
             "KALSHI-ACCESS-KEY": self.api_key,
@@ -62,15 +167,19 @@ class KalshiClient:
             "Accept": "application/json"
         }
     
-    def get_markets(self, limit: int = 100, status: str = "open") -> List[Dict[str, Any]]:
+    async def _get(self, path: str) -> httpx.Response:
+        """Send a signed GET request through the shared pool"""
+        async with self._semaphore:
+            # Sign once a slot is free so the timestamp is fresh
+            headers = await self._get_headers("GET", path)
+            return await self.client.get(f"{self.base_url}{path}", headers=headers)
+    
+    async def get_markets(self, limit: int = 100, status: str = "open") -> List[Dict[str, Any]]:
         """Fetch active markets from Kalshi"""
         path = f"/markets?limit={limit}&status={status}"
-        url = f"{self.base_url}{path}"
         
         try:
-            headers = self._get_headers("GET", path)
-            with httpx.Client(timeout=10) as client:
-                response = client.get(url, headers=headers)
+            response = await self._get(path)
             
             if response.status_code == 200:
                 data = response.json()
@@ -82,15 +191,12 @@ class KalshiClient:
             print(f"Error fetching Kalshi markets: {e}")
             return []
     
-    def get_market(self, ticker: str) -> Optional[Dict[str, Any]]:
+    async def get_market(self, ticker: str) -> Optional[Dict[str, Any]]:
         """Fetch a specific market by ticker"""
         path = f"/markets/{ticker}"
-        url = f"{self.base_url}{path}"
         
         try:
-            headers = self._get_headers("GET", path)
-            with httpx.Client(timeout=10) as client:
-                response = client.get(url, headers=headers)
+            response = await self._get(path)
             
             if response.status_code == 200:
                 return response.json().get("market")
@@ -100,15 +206,12 @@ class KalshiClient:
             print(f"Error fetching Kalshi market {ticker}: {e}")
             return None
     
-    def get_events(self, limit: int = 50, status: str = "open") -> List[Dict[str, Any]]:
+    async def get_events(self, limit: int = 50, status: str = "open") -> List[Dict[str, Any]]:
         """Fetch events (categories of markets)"""
         path = f"/events?limit={limit}&status={status}"
-        url = f"{self.base_url}{path}"
         
         try:
-            headers = self._get_headers("GET", path)
-            with httpx.Client(timeout=10) as client:
-                response = client.get(url, headers=headers)
+            response = await self._get(path)
             
             if response.status_code == 200:
                 data = response.json()
@@ -120,11 +223,51 @@ class KalshiClient:
             print(f"Error fetching Kalshi events: {e}")
             return []
     
+    async def get_markets_page(
+        self,
+        limit: int = 1000,
+        status: str = "open",
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Fetch one page of markets
+        
+        Returns the markets and the cursor for the next page (None on the
+        last page). Raises KalshiAPIError or httpx errors on failure.
+        """
+        return await self._get_page("markets", limit, status, cursor)
+    
+    async def get_events_page(
+        self,
+        limit: int = 200,
+        status: str = "open",
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Fetch one page of events (see get_markets_page)"""
+        return await self._get_page("events", limit, status, cursor)
+    
+    async def _get_page(
+        self,
+        resource: str,
+        limit: int,
+        status: str,
+        cursor: Optional[str],
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        path = f"/{resource}?limit={limit}&status={status}"
+        if cursor:
+            path += f"&cursor={quote(cursor, safe='')}"
+        
+        response = await self._get(path)
+        if response.status_code != 200:
+            raise KalshiAPIError(f"{response.status_code} - {response.text[:200]}")
+        data = response.json()
+        return data.get(resource, []), data.get("cursor") or None
+    
     def format_market_for_arb(self, market: Dict[str, Any]) -> Dict[str, Any]:
         """Format a Kalshi market for the arbitrage panel"""
         # Extract prices (Kalshi uses cents, 0-100)
         yes_price = market.get("yes_ask", market.get("last_price", 50)) / 100
-        no_price = market.get("no_ask", 1 - yes_price)
+        no_price = market["no_ask"] / 100 if "no_ask" in market else 1 - yes_price
         
         return {
             "id": market.get("ticker"),
@@ -133,6 +276,8 @@ class KalshiClient:
             "kalshi": {
                 "yes": yes_price,
                 "no": no_price,
+                "yes_bid": market.get("yes_bid", yes_price * 100) / 100,
+                "no_bid": market.get("no_bid", no_price * 100) / 100,
                 "volume": market.get("volume", 0),
                 "open_interest": market.get("open_interest", 0)
             },
@@ -145,12 +290,12 @@ class KalshiClient:
 kalshi_client = KalshiClient()
 
 
-def get_kalshi_markets(limit: int = 50) -> List[Dict[str, Any]]:
+async def get_kalshi_markets(limit: int = 50) -> List[Dict[str, Any]]:
     """Get formatted Kalshi markets for the arbitrage panel"""
-    markets = kalshi_client.get_markets(limit=limit)
+    markets = await kalshi_client.get_markets(limit=limit)
     return [kalshi_client.format_market_for_arb(m) for m in markets]
 
 
-def get_kalshi_events(limit: int = 30) -> List[Dict[str, Any]]:
+async def get_kalshi_events(limit: int = 30) -> List[Dict[str, Any]]:
     """Get Kalshi events"""
-    return kalshi_client.get_events(limit=limit)
+    return await kalshi_client.get_events(limit=limit)
@@ -0,0 +1,146 @@
+"""
+Kalshi Market Snapshot
+In-memory copy of every open Kalshi market and event, refreshed in the background
+"""
+import bisect
+import os
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from services.kalshi_service import KalshiClient, kalshi_client
+from services.snapshot import BackgroundSnapshot
+
+
+def _expiry_ts(market: Dict[str, Any]) -> float:
+    """Epoch seconds of a formatted market's expiry (inf if unknown)"""
+    expiry = market.get("expiry")
+    if not expiry:
+        return float("inf")
+    try:
+        return datetime.fromisoformat(expiry.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return float("inf")
+
+
+class _Index:
+    """Formatted markets with lookups by ticker, category and expiry"""
+
+    def __init__(self, markets: List[Dict[str, Any]], events: List[Dict[str, Any]]):
+        self.markets = markets
+        self.events = events
+        self.by_ticker: Dict[str, Dict[str, Any]] = {}
+        self.by_category: Dict[str, List[Dict[str, Any]]] = {}
+        for market in markets:
+            self.by_ticker[market["id"]] = market
+            category = (market.get("category") or "").lower()
+            self.by_category.setdefault(category, []).append(market)
+
+        # Sorted by expiry, for range queries
+        ordered = sorted(markets, key=_expiry_ts)
+        self.expiries = [_expiry_ts(m) for m in ordered]
+        self.by_expiry = ordered
+
+
+class KalshiSnapshot(BackgroundSnapshot[_Index]):
+    """
+    Keeps every open market and event in memory, paginated through the
+    Kalshi cursor API, and serves reads from it (see BackgroundSnapshot
+    for how it is refreshed).
+    """
+
+    label = "Kalshi snapshot"
+
+    def __init__(
+        self,
+        client: KalshiClient,
+        refresh_interval: float = 30.0,
+        page_size: int = 1000,
+        max_pages: int = 100,
+        retry_interval: float = 5.0,
+    ):
+        super().__init__(refresh_interval, retry_interval)
+        self.client = client
+        self.page_size = page_size
+        self.max_pages = max_pages
+
+    def add_listener(self, callback: Callable[[List[Dict[str, Any]]], None]) -> None:
+        """Call ``callback`` with every open market after each successful refresh"""
+        super().add_listener(callback)
+
+    async def _fetch(self) -> _Index:
+        markets = await self._fetch_all(self.client.get_markets_page, self.page_size)
+        events = await self._fetch_all(self.client.get_events_page, 200)
+
+        # Markets carry no category of their own; it lives on their event
+        categories = {e.get("event_ticker"): e.get("category") for e in events}
+        for market in markets:
+            if "category" not in market and categories.get(market.get("event_ticker")):
+                market["category"] = categories[market["event_ticker"]]
+
+        formatted = [self.client.format_market_for_arb(m) for m in markets]
+        return _Index(formatted, events)
+
+    def _loaded(self, index: _Index) -> None:
+        self._notify(index.markets)
+
+    async def _fetch_all(self, fetch_page, page_size: int) -> List[Dict[str, Any]]:
+        items: List[Dict[str, Any]] = []
+        cursor = None
+        for _ in range(self.max_pages):
+            page, cursor = await fetch_page(limit=page_size, cursor=cursor)
+            items.extend(page)
+            if not cursor:
+                break
+        return items
+
+    async def markets(
+        self,
+        limit: int,
+        category: Optional[str] = None,
+        expires_before: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """Formatted markets, optionally of one category or expiring before a time"""
+        index = await self._current()
+        if index is None:
+            return []
+
+        if expires_before is not None:
+            end = bisect.bisect_left(index.expiries, expires_before)
+            markets = index.by_expiry[:end]
+            if category:
+                markets = [m for m in markets if (m.get("category") or "").lower() == category.lower()]
+            return markets[:limit]
+
+        if category:
+            return index.by_category.get(category.lower(), [])[:limit]
+        return index.markets[:limit]
+
+    async def market(self, ticker: str) -> Optional[Dict[str, Any]]:
+        """A formatted market by ticker, if it is in the snapshot"""
+        index = await self._current()
+        return index.by_ticker.get(ticker) if index is not None else None
+
+    async def events(self, limit: int) -> List[Dict[str, Any]]:
+        """Open events"""
+        index = await self._current()
+        return index.events[:limit] if index is not None else []
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot size, age and last refresh error"""
+        index = self._data
+        return {
+            "markets": len(index.markets) if index else 0,
+            "events": len(index.events) if index else 0,
+            "categories": len(index.by_category) if index else 0,
+            "age_seconds": round(self.age, 1) if self.age is not None else None,
+            "last_error": self.last_error,
+        }
+
+
+# Singleton instance
+kalshi_snapshot = KalshiSnapshot(
+    kalshi_client,
+    refresh_interval=float(os.getenv("KALSHI_SNAPSHOT_INTERVAL", "30")),
+    max_pages=int(os.getenv("KALSHI_SNAPSHOT_MAX_PAGES", "100")),
+    retry_interval=float(os.getenv("KALSHI_SNAPSHOT_RETRY_SECONDS", "5")),
+)
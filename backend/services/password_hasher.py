@@ -0,0 +1,116 @@
+"""Password hashing off the event loop, in a bounded worker pool."""
+
+import asyncio
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional, Tuple
+
+from core.config import settings
+from core.metrics import LatencyTracker
+from core.security import get_password_hash, verify_password
+
+
+class HasherBusyError(Exception):
+    """Raised when too many hash/verify calls are already waiting."""
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt hash/verify in a dedicated thread pool.
+
+    A bcrypt round takes tens of milliseconds; run inline it stalls every
+    request and WebSocket on the worker. bcrypt releases the GIL, so the
+    pool hashes in parallel while the event loop keeps serving.
+
+    At most ``max_pending`` calls may be queued or running; beyond that new
+    calls fail fast with HasherBusyError instead of queueing without bound.
+    """
+
+    def __init__(self, workers: int, max_pending: int) -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        # Time a call waits for a free worker
+        self.queue_wait = LatencyTracker()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    async def hash(self, password: str) -> str:
+        """Hash a password."""
+        return await self._run(get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a plain password against a hashed password."""
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HasherBusyError("Password hashing queue is full")
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="password-hasher",
+            )
+
+        loop = asyncio.get_running_loop()
+        queued_at = time.perf_counter()
+
+        def call() -> Tuple[float, Any]:
+            return time.perf_counter(), fn(*args)
+
+        future = self._executor.submit(call)
+        self.pending += 1
+        # A cancelled caller does not stop a call already running, so the
+        # slot is only released once the worker is done with it
+        future.add_done_callback(lambda f: self._call_soon(loop, self._finished, f))
+
+        started_at, result = await asyncio.wrap_future(future)
+        # Recorded on the loop thread; the tracker is not thread-safe
+        self.queue_wait.record(started_at - queued_at)
+        return result
+
+    @staticmethod
+    def _call_soon(loop: asyncio.AbstractEventLoop, callback: Callable[..., None], *args: Any) -> None:
+        try:
+            loop.call_soon_threadsafe(callback, *args)
+        except RuntimeError:
+            pass  # The loop has closed
+
+    def _finished(self, future: "Future[Any]") -> None:
+        self.pending -= 1
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            self.failed += 1
+        else:
+            self.completed += 1
+
+    def stats(self) -> dict:
+        """Queue depth, admission counters and queue wait percentiles."""
+        return {
+            "workers": self.workers,
+            "pending": self.pending,
+            "queued": max(self.pending - self.workers, 0),
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "queue_wait": self.queue_wait.snapshot(),
+        }
+
+    def shutdown(self) -> None:
+        """Stop the worker threads."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Global password hasher instance
+password_hasher = PasswordHasher(
+    workers=settings.auth_hash_workers,
+    max_pending=settings.auth_hash_max_pending,
+)
@@ -0,0 +1,106 @@
+"""
+Polymarket API Service
+Fetches prediction market prices from the Polymarket Gamma API
+"""
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+
+class PolymarketClient:
+    """Async client for Polymarket's public market listing"""
+
+    def __init__(self):
+        # Point at fixtures/polymarket_server.py for local development
+        self.base_url = os.getenv("POLYMARKET_API_URL", "https://gamma-api.polymarket.com")
+        self.timeout = float(os.getenv("POLYMARKET_TIMEOUT", "10"))
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared HTTP client, created on first use"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(http2=True, timeout=self.timeout)
+        return self._client
+
+    async def close(self) -> None:
+        """Close the connection pool"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def get_markets_page(self, limit: int = 500, offset: int = 0) -> List[Dict[str, Any]]:
+        """Fetch one page of active markets (raw Gamma API objects)"""
+        response = await self.client.get(
+            f"{self.base_url}/markets",
+            params={"active": "true", "closed": "false", "limit": limit, "offset": offset},
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def get_contracts(
+        self, page_size: int = 500, max_pages: int = 40
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Fetch every active binary market, normalized (see normalize)
+
+        Returns the contracts and whether the listing was read to the end
+        (False when it stopped at ``max_pages``).
+        """
+        contracts = []
+        for page in range(max_pages):
+            markets = await self.get_markets_page(limit=page_size, offset=page * page_size)
+            for market in markets:
+                contract = self.normalize(market)
+                if contract is not None:
+                    contracts.append(contract)
+            if len(markets) < page_size:
+                return contracts, True
+        return contracts, False
+
+    @staticmethod
+    def normalize(market: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Reduce a Gamma API market to the fields the arbitrage engine uses
+        ("yes"/"no" are ask prices)
+
+        Returns None for markets that are not a plain Yes/No contract.
+        """
+        try:
+            outcomes = market.get("outcomes")
+            prices = market.get("outcomePrices")
+            # The Gamma API sends these as JSON-encoded strings
+            if isinstance(outcomes, str):
+                outcomes = json.loads(outcomes)
+            if isinstance(prices, str):
+                prices = json.loads(prices)
+            if [o.lower() for o in outcomes] != ["yes", "no"]:
+                return None
+            yes, no = (float(p) for p in prices)
+        except (TypeError, ValueError):
+            return None
+
+        # Top of the YES book, when the listing carries it; the NO book
+        # mirrors it (buying NO at 1 - best bid)
+        try:
+            best_bid = float(market["bestBid"]) if market.get("bestBid") else None
+            best_ask = float(market["bestAsk"]) if market.get("bestAsk") else None
+        except (TypeError, ValueError):
+            best_bid = best_ask = None
+
+        return {
+            "id": str(market.get("id") or market.get("conditionId")),
+            "title": market.get("question", ""),
+            "expiry": market.get("endDate"),
+            "yes": best_ask if best_ask is not None else yes,
+            "no": round(1 - best_bid, 4) if best_bid is not None else no,
+            "yes_bid": best_bid if best_bid is not None else yes,
+            "no_bid": round(1 - best_ask, 4) if best_ask is not None else no,
+            "volume": float(market.get("volume") or 0),
+        }
+
+
+# Singleton instance
+polymarket_client = PolymarketClient()
@@ -0,0 +1,199 @@
+"""Cluster-wide WebSocket presence and targeted cross-node routing."""
+
+import asyncio
+import os
+import socket
+import time
+import uuid
+from typing import Awaitable, Callable, List, Optional, Set, Tuple
+
+from core.pubsub import PubSubHub
+from core.redis import RedisClient
+
+# deliver(user_id, payload) -> number of local sockets reached
+LocalDelivery = Callable[[int, str], Awaitable[int]]
+
+
+class PresenceService:
+    """
+    Registers which node holds which users and symbols, so a message for a
+    user is published only to the nodes that hold that user's sockets.
+
+    Presence lives in Redis sorted sets whose members are node ids scored by
+    expiry time:
+
+        presence:user:{user_id}  -> {node_id: expires_at}
+        presence:symbol:{symbol} -> {node_id: expires_at}
+        presence:nodes           -> {node_id: expires_at}
+
+    Changes are written as they happen and every entry is refreshed by a
+    heartbeat, so a node that dies drops out once its TTL lapses. Each node
+    listens on its own ``node:{node_id}`` channel for routed messages.
+    """
+
+    def __init__(
+        self,
+        redis: RedisClient,
+        hub: PubSubHub,
+        deliver: LocalDelivery,
+        ttl: int = 30,
+        heartbeat_interval: int = 10,
+    ) -> None:
+        self.redis = redis
+        self.hub = hub
+        self.deliver = deliver
+        self.ttl = ttl
+        self.heartbeat_interval = heartbeat_interval
+        self.node_id = (
+            f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        )
+
+        # Local presence
+        self.users: Set[int] = set()
+        self.symbols: Set[str] = set()
+        # Changes not yet written to Redis: (key, add?)
+        self._changes: List[Tuple[str, bool]] = []
+        self._dirty = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def inbox(self) -> str:
+        """Channel this node receives routed messages on."""
+        return f"node:{self.node_id}"
+
+    @staticmethod
+    def user_key(user_id: int) -> str:
+        return f"presence:user:{user_id}"
+
+    @staticmethod
+    def symbol_key(symbol: str) -> str:
+        return f"presence:symbol:{symbol}"
+
+    # Local presence changes (called by the connection manager)
+    def user_added(self, user_id: int) -> None:
+        self.users.add(user_id)
+        self._record(self.user_key(user_id), True)
+
+    def user_removed(self, user_id: int) -> None:
+        self.users.discard(user_id)
+        self._record(self.user_key(user_id), False)
+
+    def symbol_added(self, symbol: str) -> None:
+        self.symbols.add(symbol)
+        self._record(self.symbol_key(symbol), True)
+
+    def symbol_removed(self, symbol: str) -> None:
+        self.symbols.discard(symbol)
+        self._record(self.symbol_key(symbol), False)
+
+    def _record(self, key: str, present: bool) -> None:
+        if self._task is None:
+            return
+        self._changes.append((key, present))
+        self._dirty.set()
+
+    async def start(self) -> None:
+        """Join the cluster: listen on our inbox and start heartbeats."""
+        if self._task is not None:
+            return
+        self.hub.add(self.inbox, self._on_inbox)
+        self.hub.subscribe(self.inbox)
+        self._changes = [(self.user_key(u), True) for u in self.users]
+        self._changes += [(self.symbol_key(s), True) for s in self.symbols]
+        self._task = asyncio.create_task(self._run())
+        self._dirty.set()
+        print(f"✅ Cluster presence started as {self.node_id}")
+
+    async def stop(self) -> None:
+        """Leave the cluster, removing our presence entries."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self.hub.unsubscribe(self.inbox)
+        self.hub.remove(self.inbox, self._on_inbox)
+
+        pipe = self.redis.client.pipeline(transaction=False)
+        for user_id in self.users:
+            pipe.zrem(self.user_key(user_id), self.node_id)
+        for symbol in self.symbols:
+            pipe.zrem(self.symbol_key(symbol), self.node_id)
+        pipe.zrem("presence:nodes", self.node_id)
+        await pipe.execute()
+
+    async def nodes_for_user(self, user_id: int) -> List[str]:
+        """Live nodes holding at least one socket for a user."""
+        return await self.redis.client.zrangebyscore(
+            self.user_key(user_id), time.time(), "+inf"
+        )
+
+    async def route(self, user_id: int, payload: str) -> int:
+        """
+        Publish a serialized message to the other nodes holding a user.
+
+        Returns:
+            Number of remote nodes it was published to
+        """
+        nodes = [n for n in await self.nodes_for_user(user_id) if n != self.node_id]
+        if not nodes:
+            return 0
+        envelope = f"{user_id}\n{payload}"
+        pipe = self.redis.client.pipeline(transaction=False)
+        for node in nodes:
+            pipe.publish(f"node:{node}", envelope)
+        await pipe.execute()
+        return len(nodes)
+
+    async def _on_inbox(self, channel: str, data: str) -> None:
+        user_id, _, payload = data.partition("\n")
+        await self.deliver(int(user_id), payload)
+
+    async def _run(self) -> None:
+        """Write presence changes as they happen and heartbeat everything."""
+        last_heartbeat = 0.0
+        while True:
+            try:
+                await asyncio.wait_for(
+                    self._dirty.wait(), timeout=self.heartbeat_interval
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._dirty.clear()
+
+            try:
+                if self._changes:
+                    changes, self._changes = self._changes, []
+                    await self._apply(changes)
+                if time.monotonic() - last_heartbeat >= self.heartbeat_interval:
+                    await self._heartbeat()
+                    last_heartbeat = time.monotonic()
+            except Exception as e:
+                print(f"⚠️ Presence update failed: {e}")
+
+    async def _apply(self, changes: List[Tuple[str, bool]]) -> None:
+        expires_at = time.time() + self.ttl
+        pipe = self.redis.client.pipeline(transaction=False)
+        for key, present in changes:
+            if present:
+                pipe.zadd(key, {self.node_id: expires_at})
+                pipe.expire(key, self.ttl)
+            else:
+                pipe.zrem(key, self.node_id)
+        await pipe.execute()
+
+    async def _heartbeat(self) -> None:
+        now = time.time()
+        keys = [self.user_key(u) for u in self.users]
+        keys += [self.symbol_key(s) for s in self.symbols]
+        keys.append("presence:nodes")
+        pipe = self.redis.client.pipeline(transaction=False)
+        for key in keys:
+            pipe.zadd(key, {self.node_id: now + self.ttl})
+            # Prune nodes that stopped heartbeating, then keep the key alive
+            pipe.zremrangebyscore(key, "-inf", now)
+            pipe.expire(key, self.ttl)
+        await pipe.execute()
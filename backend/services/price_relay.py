@@ -0,0 +1,64 @@
+"""Relay Kafka-fed ``prices:{symbol}`` Redis channels into local WebSockets."""
+
+from typing import Awaitable, Callable, List, Set
+
+from core.pubsub import PubSubHub
+from core.redis import redis_client
+
+# broadcast(symbol, payload, conflation_key)
+Broadcast = Callable[[str, str, str], Awaitable[None]]
+# listener(symbol, payload)
+TickListener = Callable[[str, str], None]
+
+
+class PriceRelay:
+    """
+    Per-process bridge from Redis price channels to the broadcast engine.
+
+    The relay only subscribes to symbols that a local socket currently holds:
+    the connection manager calls watch() when a symbol gains its first
+    subscriber and unwatch() when it loses its last one, so each API node
+    pulls just the ticks it needs.
+    """
+
+    def __init__(self, hub: PubSubHub, broadcast: Broadcast) -> None:
+        self.hub = hub
+        self.broadcast = broadcast
+        self.symbols: Set[str] = set()
+        # Also called with every relayed tick (e.g. live candles)
+        self.listeners: List[TickListener] = []
+
+    @staticmethod
+    def channel(symbol: str) -> str:
+        """Redis channel carrying a symbol's price updates."""
+        return f"prices:{symbol}"
+
+    def watch(self, symbol: str) -> None:
+        """Start relaying a symbol."""
+        if symbol in self.symbols:
+            return
+        self.symbols.add(symbol)
+        channel = self.channel(symbol)
+        self.hub.add(channel, self._deliver)
+        self.hub.subscribe(channel)
+
+    def unwatch(self, symbol: str) -> None:
+        """Stop relaying a symbol."""
+        if symbol not in self.symbols:
+            return
+        self.symbols.discard(symbol)
+        channel = self.channel(symbol)
+        self.hub.remove(channel, self._deliver)
+        self.hub.unsubscribe(channel)
+
+    async def _deliver(self, channel: str, data: str) -> None:
+        symbol = channel.split(":", 1)[1]
+        # The publisher rewrote market:{symbol} just before this tick
+        redis_client.invalidate_market_data(symbol)
+        for listener in self.listeners:
+            try:
+                listener(symbol, data)
+            except Exception as e:
+                print(f"⚠️ Tick listener failed for {symbol}: {e}")
+        # The payload is forwarded as published, without a decode/encode pass
+        await self.broadcast(symbol, data, channel)
@@ -0,0 +1,199 @@
+"""Cached quotes with one upstream fetch per symbol at a time."""
+
+import asyncio
+import json
+from typing import Any, Dict, List, Optional
+
+from core.config import settings
+from core.redis import redis_client
+from services.alpaca_service import alpaca_service
+
+# How often a node that lost the refresh lock checks for the winner's result
+_LOCK_POLL_INTERVAL = 0.025
+
+
+class QuoteService:
+    """
+    Quotes served from the Redis ``market:{symbol}`` cache.
+
+    A cached quote is fresh for ``quote_cache_ttl`` seconds and may then be
+    served stale for ``quote_stale_ttl`` more while it is refreshed in the
+    background. Refreshes are single-flight: concurrent requests in this
+    process share one future, and across processes a short Redis lock lets
+    one node call Alpaca while the others wait for the quote it writes.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    @property
+    def _stale_after_ms(self) -> int:
+        """Remaining TTL below which a cached quote counts as stale"""
+        return settings.quote_stale_ttl * 1000
+
+    async def get_quote(self, symbol: str) -> Dict[str, Any]:
+        """Get a quote, from the cache when possible."""
+        symbol = symbol.upper()
+        try:
+            cached, ttl_ms = await redis_client.get_market_data_with_ttl(symbol)
+        except Exception:
+            cached, ttl_ms = None, 0
+
+        if cached:
+            if ttl_ms < 0 or ttl_ms > self._stale_after_ms:
+                return cached
+            # Stale: answer now, refresh behind it
+            self._refresh(symbol)
+            return cached
+
+        return await asyncio.shield(self._refresh(symbol))
+
+    async def get_quotes(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get quotes for many symbols, keyed by upper-cased symbol.
+
+        Cached quotes come from the in-process cache, then one pipelined
+        GET+PTTL round trip to Redis for the rest. Misses already being
+        refreshed join that refresh; the rest are fetched in one batch (see
+        AlpacaService.fetch_quotes) under the same Redis locks as get_quote,
+        and later requests for those symbols join it in turn. Unknown
+        symbols are left out.
+        """
+        symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols))
+        try:
+            cached = await redis_client.get_market_data_many(symbols)
+        except Exception:
+            cached = [None] * len(symbols)
+        quotes = {symbol: quote for symbol, quote in zip(symbols, cached) if quote}
+
+        misses = [symbol for symbol in symbols if symbol not in quotes]
+        new = [symbol for symbol in misses if symbol not in self._inflight]
+        if new:
+            batch = asyncio.ensure_future(self._fetch_many(new))
+            for symbol in new:
+                future = asyncio.ensure_future(self._pick(batch, symbol))
+                self._inflight[symbol] = future
+                future.add_done_callback(lambda f, symbol=symbol: self._refreshed(symbol, f))
+
+        fetched = await asyncio.gather(*(asyncio.shield(self._inflight[s]) for s in misses))
+        quotes.update({symbol: quote for symbol, quote in zip(misses, fetched) if quote})
+        return quotes
+
+    def _refresh(self, symbol: str) -> asyncio.Future:
+        """Start a refresh of ``symbol``, or join the one already running."""
+        future = self._inflight.get(symbol)
+        if future is None:
+            future = asyncio.ensure_future(self._fetch(symbol))
+            self._inflight[symbol] = future
+            future.add_done_callback(lambda f: self._refreshed(symbol, f))
+        return future
+
+    def _refreshed(self, symbol: str, future: asyncio.Future) -> None:
+        if self._inflight.get(symbol) is future:
+            del self._inflight[symbol]
+        if not future.cancelled() and future.exception() is not None:
+            # Also marks it retrieved when nobody waited (stale refreshes)
+            print(f"⚠️ Quote refresh failed for {symbol}: {future.exception()}")
+
+    async def _fetch(self, symbol: str) -> Dict[str, Any]:
+        lock_key = f"lock:market:{symbol}"
+        try:
+            token = await redis_client.acquire_lock(lock_key, settings.quote_lock_ttl_ms)
+        except Exception:
+            # No Redis: nothing to coordinate with
+            return await alpaca_service.get_quote(symbol)
+
+        if token is None:
+            quote = await self._wait_for_refresh(symbol)
+            if quote is not None:
+                return quote
+            # The lock holder gave up or died; fetch it ourselves
+
+        try:
+            quote = await alpaca_service.get_quote(symbol)
+            if quote:
+                await redis_client.cache_market_data(
+                    symbol,
+                    json.dumps(quote),
+                    ttl=settings.quote_cache_ttl + settings.quote_stale_ttl,
+                )
+            return quote
+        finally:
+            if token is not None:
+                try:
+                    await redis_client.release_lock(lock_key, token)
+                except Exception as e:
+                    # It expires on its own after quote_lock_ttl_ms
+                    print(f"⚠️ Failed to release {lock_key}: {e}")
+
+    async def _fetch_many(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch a batch under the same per-symbol Redis locks as _fetch: the
+        symbols this node locks are fetched in one request, the ones locked
+        elsewhere are waited for, and any the lock holder never writes are
+        fetched after all.
+        """
+        lock_keys = [f"lock:market:{symbol}" for symbol in symbols]
+        results = await asyncio.gather(
+            *(redis_client.acquire_lock(key, settings.quote_lock_ttl_ms) for key in lock_keys),
+            return_exceptions=True,
+        )
+        tokens = {key: token for key, token in zip(lock_keys, results) if isinstance(token, str)}
+        if any(isinstance(result, Exception) for result in results):
+            # No Redis: nothing to coordinate with
+            held: List[str] = []
+        else:
+            held = [symbol for symbol, token in zip(symbols, results) if token is None]
+
+        try:
+            owned = [symbol for symbol in symbols if symbol not in held]
+            quotes, *waited = await asyncio.gather(
+                self._fetch_batch(owned),
+                *(self._wait_for_refresh(symbol) for symbol in held),
+            )
+            quotes.update({symbol: quote for symbol, quote in zip(held, waited) if quote})
+            # The lock holders gave up or died; fetch those ourselves
+            quotes.update(await self._fetch_batch([s for s, q in zip(held, waited) if q is None]))
+            return quotes
+        finally:
+            released = await asyncio.gather(
+                *(redis_client.release_lock(key, token) for key, token in tokens.items()),
+                return_exceptions=True,
+            )
+            for key, result in zip(tokens, released):
+                if isinstance(result, Exception):
+                    # It expires on its own after quote_lock_ttl_ms
+                    print(f"⚠️ Failed to release {key}: {result}")
+
+    async def _fetch_batch(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        if not symbols:
+            return {}
+        quotes = await alpaca_service.fetch_quotes(symbols)
+        try:
+            await redis_client.cache_market_data_many(
+                {symbol: json.dumps(quote) for symbol, quote in quotes.items()},
+                ttl=settings.quote_cache_ttl + settings.quote_stale_ttl,
+            )
+        except Exception as e:
+            print(f"⚠️ Failed to cache quotes: {e}")
+        return quotes
+
+    @staticmethod
+    async def _pick(batch: asyncio.Future, symbol: str) -> Dict[str, Any]:
+        """One symbol's quote from a batch fetch ({} if it has none)"""
+        return (await asyncio.shield(batch)).get(symbol, {})
+
+    async def _wait_for_refresh(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Wait up to the lock TTL for another node to cache a fresh quote."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.quote_lock_ttl_ms / 1000
+        while loop.time() < deadline:
+            await asyncio.sleep(_LOCK_POLL_INTERVAL)
+            cached, ttl_ms = await redis_client.get_market_data_with_ttl(symbol, local=False)
+            if cached and (ttl_ms < 0 or ttl_ms > self._stale_after_ms):
+                return cached
+        return None
+
+
+# Global service instance
+quote_service = QuoteService()
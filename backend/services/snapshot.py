@@ -0,0 +1,129 @@
+"""
+Background Snapshot
+In-memory copy of upstream data, refreshed in the background and served
+stale-while-revalidate
+"""
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class BackgroundSnapshot(ABC, Generic[T]):
+    """
+    Holds the latest result of ``_fetch`` and serves reads from it.
+
+    Reads never wait on upstream once a snapshot exists: a snapshot older
+    than ``refresh_interval`` is still served while a single background
+    refresh replaces it (stale-while-revalidate). A failed refresh keeps
+    the previous snapshot. Only the first read waits for a fetch; after a
+    failure no read starts another refresh for ``retry_interval`` seconds,
+    so reads get the previous snapshot (or nothing) instead of waiting on
+    a failing upstream.
+
+    Subclasses implement ``_fetch`` and may override ``_loaded``; listeners
+    are called with whatever the subclass passes to ``_notify``.
+    """
+
+    # Names the snapshot in log messages
+    label = "Snapshot"
+
+    def __init__(self, refresh_interval: float, retry_interval: float = 5.0):
+        self.refresh_interval = refresh_interval
+        self.retry_interval = retry_interval
+
+        self._data: Optional[T] = None
+        self.refreshed_at = 0.0
+        self.last_error: Optional[str] = None
+        self.failed_at: Optional[float] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._loop_task: Optional[asyncio.Task] = None
+        self._listeners: List[Callable[[Any], None]] = []
+
+    def add_listener(self, callback: Callable[[Any], None]) -> None:
+        """Call ``callback`` with each update the snapshot announces"""
+        self._listeners.append(callback)
+
+    @property
+    def age(self) -> Optional[float]:
+        """Seconds since the snapshot was taken (None if there is none)"""
+        if self._data is None:
+            return None
+        return time.monotonic() - self.refreshed_at
+
+    async def start(self) -> None:
+        """Refresh the snapshot every ``refresh_interval`` seconds"""
+        if self._loop_task is None:
+            self._loop_task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop background refreshing"""
+        for task in (self._loop_task, self._refresh_task):
+            if task is None:
+                continue
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._loop_task = None
+        self._refresh_task = None
+
+    async def _run(self) -> None:
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.refresh_interval)
+
+    def refresh(self) -> "asyncio.Task":
+        """Start a refresh, or join the one already running"""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.ensure_future(self._refresh())
+        return self._refresh_task
+
+    def revalidate(self) -> Optional["asyncio.Task"]:
+        """Like refresh(), but None while backing off after a failed refresh"""
+        if self.failed_at is not None and time.monotonic() - self.failed_at < self.retry_interval:
+            return None
+        return self.refresh()
+
+    async def _refresh(self) -> None:
+        started = time.monotonic()
+        try:
+            data = await self._fetch()
+        except Exception as e:
+            self.last_error = str(e)
+            self.failed_at = time.monotonic()
+            print(f"⚠️ {self.label} refresh failed: {e}")
+            return
+
+        self._data = data
+        self.refreshed_at = started
+        self.last_error = None
+        self.failed_at = None
+        self._loaded(data)
+
+    @abstractmethod
+    async def _fetch(self) -> T:
+        """Fetch a new snapshot from upstream"""
+
+    def _loaded(self, data: T) -> None:
+        """Called after a new snapshot replaced the previous one"""
+
+    def _notify(self, update: Any) -> None:
+        for callback in self._listeners:
+            try:
+                callback(update)
+            except Exception as e:
+                print(f"⚠️ {self.label} listener failed: {e}")
+
+    async def _current(self) -> Optional[T]:
+        """The snapshot to serve, revalidating it in the background if stale"""
+        if self._data is None:
+            task = self.revalidate()
+            if task is not None:
+                await asyncio.shield(task)
+        elif time.monotonic() - self.refreshed_at >= self.refresh_interval:
+            self.revalidate()
+        return self._data
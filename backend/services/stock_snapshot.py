@@ -0,0 +1,288 @@
+"""
+Stock Snapshot
+In-memory columnar copy of the tradable US equity universe, refreshed in the
+background, that the screener filters with NumPy
+"""
+import csv
+import math
+import os
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from core.config import settings
+from services.alpaca_service import AlpacaService, alpaca_service
+from services.snapshot import BackgroundSnapshot
+
+# Columns a screen can bound from below and/or above
+RANGE_COLUMNS = ("price", "volume", "change_percent", "market_cap")
+
+# (min, max) per range column; None leaves that side open
+Ranges = Dict[str, Tuple[Optional[float], Optional[float]]]
+
+
+def _snapshot_values(snapshot: Dict[str, Any]) -> Tuple[float, float, float]:
+    """Price, daily volume and previous close from an Alpaca snapshot (nan if missing)"""
+    daily = snapshot.get("dailyBar") or {}
+    trade = snapshot.get("latestTrade") or {}
+    previous = snapshot.get("prevDailyBar") or {}
+    price = trade.get("p", daily.get("c", math.nan))
+    return float(price), float(daily.get("v", 0)), float(previous.get("c", math.nan))
+
+
+class StockTable:
+    """
+    One row per symbol and one NumPy array per field.
+
+    Each range column also has a sorted index (rows ordered by value, with
+    unknown values left out), so any range predicate is two binary searches.
+    screen() starts from the narrowest range and applies the remaining
+    predicates as boolean masks over just those rows.
+    """
+
+    def __init__(
+        self,
+        symbols: List[str],
+        names: List[str],
+        price: Iterable[float],
+        volume: Iterable[float],
+        previous_close: Iterable[float],
+        sectors: List[Optional[str]],
+        market_cap: Iterable[float],
+    ):
+        self.symbols = np.array(symbols, dtype=object)
+        self.names = np.array(names, dtype=object)
+        self.price = np.asarray(price, dtype=np.float64)
+        self.volume = np.asarray(volume, dtype=np.float64)
+        previous = np.asarray(previous_close, dtype=np.float64)
+        self.change = self.price - previous
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.change_percent = np.where(previous > 0, self.change / previous * 100, np.nan)
+        self.market_cap = np.asarray(market_cap, dtype=np.float64)
+
+        # Sectors as small integer codes (-1 when unknown)
+        self.sector_names = sorted({s for s in sectors if s})
+        codes = {name.lower(): code for code, name in enumerate(self.sector_names)}
+        self._sector_codes = codes
+        self.sector = np.array([codes[s.lower()] if s else -1 for s in sectors], dtype=np.int16)
+
+        self._order: Dict[str, np.ndarray] = {}
+        self._sorted: Dict[str, np.ndarray] = {}
+        for column in RANGE_COLUMNS:
+            values = getattr(self, column)
+            order = np.argsort(values, kind="stable")
+            # NaNs sort last; keep them out of the index
+            order = order[: np.count_nonzero(~np.isnan(values))]
+            self._order[column] = order
+            self._sorted[column] = values[order]
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def _span(self, column: str, low: Optional[float], high: Optional[float]) -> Tuple[int, int]:
+        """Positions in the sorted index holding values within [low, high]"""
+        values = self._sorted[column]
+        start = 0 if low is None else int(np.searchsorted(values, low, side="left"))
+        end = len(values) if high is None else int(np.searchsorted(values, high, side="right"))
+        return start, max(start, end)
+
+    def screen(self, ranges: Ranges, sector: Optional[str] = None, limit: int = 50) -> np.ndarray:
+        """Rows matching every range and the sector, most traded first"""
+        ranges = {c: r for c, r in ranges.items() if r[0] is not None or r[1] is not None}
+
+        code = None
+        if sector:
+            code = self._sector_codes.get(sector.lower())
+            if code is None:
+                return np.empty(0, dtype=np.intp)
+
+        if ranges:
+            spans = {column: self._span(column, *bounds) for column, bounds in ranges.items()}
+            narrowest = min(spans, key=lambda column: spans[column][1] - spans[column][0])
+            start, end = spans[narrowest]
+            rows = self._order[narrowest][start:end]
+            del ranges[narrowest]
+        else:
+            rows = np.arange(len(self))
+
+        mask = np.ones(len(rows), dtype=bool)
+        for column, (low, high) in ranges.items():
+            values = getattr(self, column)[rows]
+            if low is not None:
+                mask &= values >= low
+            if high is not None:
+                mask &= values <= high
+        if code is not None:
+            mask &= self.sector[rows] == code
+        rows = rows[mask]
+
+        volume = self.volume[rows]
+        if len(rows) > limit:
+            top = np.argpartition(-volume, limit - 1)[:limit]
+            rows, volume = rows[top], volume[top]
+        # Ties keep row order, so equal screens give equal pages
+        return rows[np.lexsort((rows, -volume))]
+
+    def record(self, row: int) -> Dict[str, Any]:
+        """A row in the StockScreener shape"""
+        market_cap = self.market_cap[row]
+        code = self.sector[row]
+        return {
+            "symbol": self.symbols[row],
+            "name": self.names[row],
+            "price": float(self.price[row]),
+            "change": float(self.change[row]) if not math.isnan(self.change[row]) else 0.0,
+            "change_percent": (
+                float(self.change_percent[row]) if not math.isnan(self.change_percent[row]) else 0.0
+            ),
+            "volume": int(self.volume[row]),
+            "market_cap": None if math.isnan(market_cap) else float(market_cap),
+            "sector": self.sector_names[code] if code >= 0 else None,
+        }
+
+
+def load_reference(path: str) -> Dict[str, Dict[str, str]]:
+    """
+    Sector and size data by symbol from a CSV with a ``symbol`` column and
+    any of ``sector``, ``market_cap`` and ``shares_outstanding``
+    """
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, newline="") as f:
+        return {row["symbol"].upper(): row for row in csv.DictReader(f) if row.get("symbol")}
+
+
+def _float(value: Optional[str]) -> float:
+    try:
+        return float(value) if value else math.nan
+    except ValueError:
+        return math.nan
+
+
+def build_table(
+    assets: List[Dict[str, Any]],
+    snapshots: Dict[str, Dict[str, Any]],
+    reference: Dict[str, Dict[str, str]],
+) -> StockTable:
+    """A StockTable of the assets that have a snapshot with a price"""
+    symbols, names, prices, volumes, previous, sectors, caps = [], [], [], [], [], [], []
+    for asset in assets:
+        symbol = asset["symbol"]
+        snapshot = snapshots.get(symbol)
+        if not snapshot:
+            continue
+        price, volume, previous_close = _snapshot_values(snapshot)
+        if math.isnan(price):
+            continue
+        info = reference.get(symbol, {})
+        shares = _float(info.get("shares_outstanding"))
+        symbols.append(symbol)
+        names.append(asset.get("name") or "")
+        prices.append(price)
+        volumes.append(volume)
+        previous.append(previous_close)
+        sectors.append(info.get("sector") or None)
+        # Shares outstanding track the price; a fixed market cap is the fallback
+        caps.append(price * shares if not math.isnan(shares) else _float(info.get("market_cap")))
+    return StockTable(symbols, names, prices, volumes, previous, sectors, caps)
+
+
+class StockSnapshot(BackgroundSnapshot[StockTable]):
+    """
+    Keeps a StockTable of every tradable US equity in memory and screens it.
+
+    The asset list is fetched every ``universe_refresh_interval`` seconds and
+    prices (Alpaca snapshots, in bulk) every ``refresh_interval``; see
+    BackgroundSnapshot for how the table is served while it refreshes.
+    """
+
+    label = "Stock snapshot"
+
+    def __init__(
+        self,
+        service: AlpacaService,
+        refresh_interval: float = 60.0,
+        universe_refresh_interval: float = 3600.0,
+        reference_path: str = "",
+        retry_interval: float = 5.0,
+    ):
+        super().__init__(refresh_interval, retry_interval)
+        self.service = service
+        self.universe_refresh_interval = universe_refresh_interval
+        self.reference_path = reference_path
+
+        self._assets: List[Dict[str, Any]] = []
+        self._reference: Optional[Tuple[Optional[float], Dict[str, Dict[str, str]]]] = None
+        self.assets_refreshed_at = 0.0
+
+    def add_listener(self, callback: Callable[[List[Dict[str, Any]]], None]) -> None:
+        """Call ``callback`` with the tradable assets after each asset list refresh"""
+        super().add_listener(callback)
+
+    async def _fetch(self) -> StockTable:
+        started = time.monotonic()
+        if not self._assets or started - self.assets_refreshed_at >= self.universe_refresh_interval:
+            assets = await self.service.get_assets()
+            self._assets = [a for a in assets if a.get("tradable")]
+            self.assets_refreshed_at = started
+            self._notify(self._assets)
+        snapshots = await self.service.fetch_snapshots([a["symbol"] for a in self._assets])
+        return build_table(self._assets, snapshots, self._load_reference())
+
+    def _load_reference(self) -> Dict[str, Dict[str, str]]:
+        """The reference CSV, re-read only when it changes"""
+        try:
+            mtime = os.path.getmtime(self.reference_path) if self.reference_path else None
+        except OSError:
+            mtime = None
+        if self._reference is None or self._reference[0] != mtime:
+            self._reference = (mtime, load_reference(self.reference_path))
+        return self._reference[1]
+
+    async def screen(
+        self,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        min_volume: Optional[int] = None,
+        min_change_percent: Optional[float] = None,
+        max_change_percent: Optional[float] = None,
+        min_market_cap: Optional[float] = None,
+        max_market_cap: Optional[float] = None,
+        sector: Optional[str] = None,
+        limit: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """Stocks matching every given bound, most traded first"""
+        table = await self._current()
+        if table is None:
+            return []
+        rows = table.screen(
+            {
+                "price": (min_price, max_price),
+                "volume": (min_volume, None),
+                "change_percent": (min_change_percent, max_change_percent),
+                "market_cap": (min_market_cap, max_market_cap),
+            },
+            sector=sector,
+            limit=limit,
+        )
+        return [table.record(row) for row in rows]
+
+    def stats(self) -> Dict[str, Any]:
+        """Table size, age and last refresh error"""
+        table = self._data
+        return {
+            "symbols": len(table) if table else 0,
+            "sectors": len(table.sector_names) if table else 0,
+            "age_seconds": round(self.age, 1) if self.age is not None else None,
+            "last_error": self.last_error,
+        }
+
+
+# Singleton instance
+stock_snapshot = StockSnapshot(
+    alpaca_service,
+    refresh_interval=settings.stock_snapshot_refresh_seconds,
+    universe_refresh_interval=settings.stock_universe_refresh_seconds,
+    reference_path=settings.stock_reference_path,
+)
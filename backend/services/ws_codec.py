@@ -0,0 +1,146 @@
+"""
+Compact binary encoding for market WebSocket ticks.
+
+Clients that connect to ``/api/v1/ws/market`` with ``encoding=binary`` get
+price ticks as binary frames instead of JSON. Control messages (e.g.
+``subscribed``) stay JSON text frames; the ``subscribed`` reply carries an
+``ids`` map assigning each new symbol a 16-bit id, sent once per symbol.
+
+Each binary frame holds one or more little-endian records. Prices are
+integers scaled by ``PRICE_SCALE`` (1e4), timestamps are epoch milliseconds.
+
+    FULL  (0x01): <B H q q q q>  kind, symbol_id, ts_ms, price, bid, ask
+    DELTA (0x02): <B H I i i i>  kind, symbol_id, d_ts_ms, d_price, d_bid, d_ask
+
+A DELTA is relative to the last record sent for that symbol on the same
+connection; the first record for a symbol, or one whose deltas overflow,
+is sent FULL. A connection has at most 65535 ids; symbols subscribed past
+that get none, and their ticks carry id 0 like any unknown symbol.
+"""
+
+import json
+import struct
+import time
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
+
+PRICE_SCALE = 10_000
+
+KIND_FULL = 0x01
+KIND_DELTA = 0x02
+
+FULL_RECORD = struct.Struct("<BHqqqq")
+DELTA_RECORD = struct.Struct("<BHIiii")
+
+_INT32_MIN = -(2**31)
+_INT32_MAX = 2**31 - 1
+_UINT32_MAX = 2**32 - 1
+# Ids are 16-bit; 0 marks a symbol without one
+MAX_SYMBOL_ID = 0xFFFF
+
+ENCODINGS = ("json", "binary")
+
+
+class Tick(NamedTuple):
+    """Price tick with integer-scaled prices."""
+
+    symbol: str
+    ts_ms: int
+    price: int
+    bid: int
+    ask: int
+
+
+def _scale(value: Any) -> int:
+    return int(round(float(value) * PRICE_SCALE))
+
+
+def _timestamp_ms(value: Any) -> int:
+    if isinstance(value, str):
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+            return int(parsed.timestamp() * 1000)
+        except ValueError:
+            pass
+    return int(time.time() * 1000)
+
+
+def extract_tick(symbol: str, message: Union[Dict[str, Any], str]) -> Optional[Tick]:
+    """
+    Pull a tick out of a quote or price_update message.
+
+    Returns None for messages that carry no price; those are sent as JSON.
+    """
+    if isinstance(message, str):
+        try:
+            message = json.loads(message)
+        except ValueError:
+            return None
+    if not isinstance(message, dict):
+        return None
+
+    data = message.get("data", message)
+    price = data.get("price", data.get("new_price"))
+    if price is None:
+        return None
+
+    try:
+        return Tick(
+            symbol=symbol,
+            ts_ms=_timestamp_ms(data.get("timestamp")),
+            price=_scale(price),
+            bid=_scale(data.get("bid") or price),
+            ask=_scale(data.get("ask") or price),
+        )
+    except (TypeError, ValueError):
+        return None
+
+
+class BinaryTickCodec:
+    """Per-connection symbol dictionary and delta state."""
+
+    __slots__ = ("symbol_ids", "_last")
+
+    def __init__(self) -> None:
+        self.symbol_ids: Dict[str, int] = {}
+        # symbol_id -> (ts_ms, price, bid, ask) last sent
+        self._last: Dict[int, Tuple[int, int, int, int]] = {}
+
+    def assign_ids(self, symbols: List[str]) -> Dict[str, int]:
+        """
+        Assign ids to symbols not seen before, returning only the new ones.
+
+        Once every id is taken, new symbols are left without one.
+        """
+        new: Dict[str, int] = {}
+        for symbol in symbols:
+            if len(self.symbol_ids) >= MAX_SYMBOL_ID:
+                break
+            if symbol not in self.symbol_ids:
+                symbol_id = len(self.symbol_ids) + 1
+                self.symbol_ids[symbol] = symbol_id
+                new[symbol] = symbol_id
+        return new
+
+    def encode(self, tick: Tick) -> bytes:
+        """Encode one tick as a FULL or DELTA record."""
+        symbol_id = self.symbol_ids.get(tick.symbol)
+        if symbol_id is None:
+            # Unknown symbols are sent with id 0 so clients can skip them
+            return FULL_RECORD.pack(
+                KIND_FULL, 0, tick.ts_ms, tick.price, tick.bid, tick.ask
+            )
+
+        current = (tick.ts_ms, tick.price, tick.bid, tick.ask)
+        last = self._last.get(symbol_id)
+        self._last[symbol_id] = current
+
+        if last is not None:
+            d_ts = current[0] - last[0]
+            deltas = (current[1] - last[1], current[2] - last[2], current[3] - last[3])
+            if 0 <= d_ts <= _UINT32_MAX and all(
+                _INT32_MIN <= d <= _INT32_MAX for d in deltas
+            ):
+                return DELTA_RECORD.pack(KIND_DELTA, symbol_id, d_ts, *deltas)
+
+        return FULL_RECORD.pack(KIND_FULL, symbol_id, *current)
@@ -0,0 +1,73 @@
+"""Concurrent WebSocket fan-out with send deadlines."""
+
+import asyncio
+import json
+import sys
+from typing import Any, Coroutine, Dict, Iterable, List, Optional, Tuple
+
+# asyncio.Task(eager_start=True) is new in 3.12
+EAGER_TASKS = sys.version_info >= (3, 12)
+
+
+def encode_message(message: Dict[str, Any]) -> str:
+    """Serialize a message once for every subscriber."""
+    return json.dumps(message, separators=(",", ":"))
+
+
+def start_eagerly(coro: Coroutine[Any, Any, Any]) -> Optional[asyncio.Future]:
+    """
+    Start a coroutine, running it up to its first suspension point at once
+    where asyncio supports eager tasks (Python 3.12+).
+
+    Most socket writes complete without suspending, so they never wait for
+    the next loop iteration. Returns None when the coroutine finished, or
+    the Task continuing it. Exceptions raised before the first suspension
+    propagate. Older Pythons get a plain Task.
+    """
+    if not EAGER_TASKS:
+        return asyncio.ensure_future(coro)
+    task = asyncio.Task(coro, loop=asyncio.get_running_loop(), eager_start=True)
+    if not task.done():
+        return task
+    task.result()
+    return None
+
+
+async def fanout(
+    websockets: Iterable[Any],
+    payload: str,
+    timeout: float,
+) -> Tuple[List[Any], List[Any]]:
+    """
+    Write one pre-serialized payload to many sockets concurrently.
+
+    Every write is started immediately; those that have to wait on the
+    transport continue as tasks sharing a single deadline measured from the
+    start of the fan-out, so one slow client can no longer hold up the rest.
+
+    Returns:
+        (failed, timed_out) sockets
+    """
+    failed: List[Any] = []
+    tasks: Dict[asyncio.Future, Any] = {}
+
+    for websocket in websockets:
+        try:
+            task = start_eagerly(websocket.send_text(payload))
+        except Exception:
+            failed.append(websocket)
+            continue
+        if task is not None:
+            tasks[task] = websocket
+
+    if not tasks:
+        return failed, []
+
+    done, pending = await asyncio.wait(tasks, timeout=timeout)
+
+    failed.extend(tasks[task] for task in done if task.exception() is not None)
+    timed_out = [tasks[task] for task in pending]
+    for task in pending:
+        task.cancel()
+
+    return failed, timed_out
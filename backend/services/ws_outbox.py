@@ -0,0 +1,246 @@
+"""Bounded, conflating per-connection send queues for WebSockets."""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Union
+
+from core.metrics import LatencyTracker
+from services.ws_codec import BinaryTickCodec, Tick
+from services.ws_fanout import start_eagerly
+
+# Conflation key of the single pending batch frame
+BATCH_KEY = "batch"
+
+
+class Outbox:
+    """
+    Outbound queue for a single socket, drained by its own writer task.
+
+    While the writer is idle, frames are written straight through; only once
+    a write has to wait on the transport do later frames start to queue.
+    Frames put with a conflation key (e.g. ``quote:AAPL``) replace any
+    undelivered frame with the same key, so a slow client only ever has the
+    latest value per symbol waiting. When the queue is full, new keyed frames
+    are dropped. Frames without a key (alerts, control replies) are never
+    dropped; if they pile up past the hard limit the client is considered
+    stalled and ``on_stall`` is called.
+
+    With a batch window set, keyed frames are held for up to that long and
+    sent as one frame carrying only the latest value per key: a JSON
+    ``{"type": "batch", "messages": [...]}`` text frame, or for binary
+    clients one binary frame of concatenated records.
+    """
+
+    def __init__(
+        self,
+        websocket: Any,
+        maxsize: int,
+        send_timeout: float,
+        on_stall: Callable[[Any], None],
+        latency: Optional[LatencyTracker] = None,
+        codec: Optional[BinaryTickCodec] = None,
+    ) -> None:
+        self.websocket = websocket
+        self.maxsize = maxsize
+        self.hard_limit = maxsize * 4
+        self.send_timeout = send_timeout
+        self.on_stall = on_stall
+        self.latency = latency
+        # Set for binary clients: Tick items are encoded at write time, so
+        # deltas are taken against what was actually sent after conflation
+        self.codec = codec
+
+        # Entries are [key, payload, enqueued_at]
+        self._queue: Deque[List[Any]] = deque()
+        self._pending: Dict[str, List[Any]] = {}
+        self._ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        # A write started directly by put() that had to suspend
+        self._inflight: Optional[asyncio.Future] = None
+        self._inflight_at = 0.0
+        # True from the moment work is handed to the writer until it drains
+        self._busy = False
+        self.closed = False
+
+        # Coalescing window (seconds); 0 sends every update as it comes
+        self.batch_window = 0.0
+        self._batch: Dict[str, Any] = {}
+        self._batch_started = 0.0
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+        self.conflated = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def start(self) -> None:
+        """Start the writer task."""
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    def close(self) -> None:
+        """Stop the writer and discard anything still queued."""
+        self.closed = True
+        self._queue.clear()
+        self._pending.clear()
+        self._batch.clear()
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._task is not None and self._task is not asyncio.current_task():
+            self._task.cancel()
+
+    def set_batch_window(self, seconds: float) -> None:
+        """Set the coalescing window; 0 turns batching off."""
+        self.batch_window = max(0.0, seconds)
+        if not self.batch_window:
+            self._flush()
+
+    def put(self, payload: Union[str, Tick], key: Optional[str] = None) -> bool:
+        """
+        Queue a pre-serialized frame, or a Tick for binary clients.
+
+        Returns:
+            False if the frame was dropped or the outbox is closed
+        """
+        if self.closed:
+            return False
+
+        now = time.perf_counter()
+        if key is not None and self.batch_window:
+            if key in self._batch:
+                self.conflated += 1
+            elif not self._batch:
+                self._batch_started = now
+                self._flush_handle = asyncio.get_running_loop().call_later(
+                    self.batch_window, self._flush
+                )
+            self._batch[key] = payload
+            return True
+
+        return self._enqueue(payload, key, now)
+
+    def _flush(self) -> None:
+        """Hand the current window's batch to the writer."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self.closed or not self._batch:
+            return
+
+        batch, self._batch = self._batch, {}
+        pending = self._pending.get(BATCH_KEY)
+        if pending is not None:
+            # The previous window has not gone out yet: merge into it
+            self.conflated += len(pending[1].keys() & batch.keys())
+            pending[1].update(batch)
+            return
+        self._enqueue(batch, BATCH_KEY, self._batch_started)
+
+    def _enqueue(self, payload: Any, key: Optional[str], now: float) -> bool:
+        if not self._busy:
+            # Idle writer and empty queue: write straight through
+            try:
+                task = start_eagerly(self._send(payload))
+            except Exception:
+                self._stall()
+                return False
+            if task is None:
+                if self.latency is not None:
+                    self.latency.record(time.perf_counter() - now)
+                return True
+            self._inflight = task
+            self._inflight_at = now
+            self._wake()
+            return True
+
+        if key is not None:
+            entry = self._pending.get(key)
+            if entry is not None:
+                entry[1] = payload
+                entry[2] = now
+                self.conflated += 1
+                return True
+            if len(self._queue) >= self.maxsize:
+                self.dropped += 1
+                return False
+            entry = [key, payload, now]
+            self._pending[key] = entry
+        else:
+            if len(self._queue) >= self.hard_limit:
+                self._stall()
+                return False
+            entry = [None, payload, now]
+
+        self._queue.append(entry)
+        self._wake()
+        return True
+
+    def _send(self, payload: Union[str, Tick, Dict[str, Any]]) -> Awaitable[None]:
+        if isinstance(payload, str):
+            return self.websocket.send_text(payload)
+        if isinstance(payload, dict):
+            return self._send_batch(payload)
+        return self.websocket.send_bytes(self.codec.encode(payload))
+
+    async def _send_batch(self, batch: Dict[str, Any]) -> None:
+        texts = [item for item in batch.values() if isinstance(item, str)]
+        if len(texts) < len(batch):
+            ticks = [item for item in batch.values() if not isinstance(item, str)]
+            await self.websocket.send_bytes(
+                b"".join(self.codec.encode(tick) for tick in ticks)
+            )
+        if texts:
+            # Items are already JSON, so the envelope is built by joining them
+            await self.websocket.send_text(
+                '{"type":"batch","messages":[' + ",".join(texts) + "]}"
+            )
+
+    def _wake(self) -> None:
+        self._busy = True
+        self._ready.set()
+
+    def _stall(self) -> None:
+        self.close()
+        self.on_stall(self.websocket)
+
+    async def _write(self, task: Optional[asyncio.Future], enqueued_at: float) -> bool:
+        """Wait out one started write; False if it failed or missed the deadline."""
+        try:
+            if task is not None:
+                await asyncio.wait_for(task, timeout=self.send_timeout)
+        except Exception:
+            self._stall()
+            return False
+
+        if self.latency is not None:
+            self.latency.record(time.perf_counter() - enqueued_at)
+        return True
+
+    async def _run(self) -> None:
+        """Writer loop: finish any in-flight write, then drain the queue."""
+        while not self.closed:
+            await self._ready.wait()
+            self._ready.clear()
+
+            if self._inflight is not None:
+                task, self._inflight = self._inflight, None
+                if not await self._write(task, self._inflight_at):
+                    return
+
+            while self._queue:
+                key, payload, enqueued_at = self._queue.popleft()
+                if key is not None:
+                    del self._pending[key]
+
+                try:
+                    task = start_eagerly(self._send(payload))
+                except Exception:
+                    self._stall()
+                    return
+                if not await self._write(task, enqueued_at):
+                    return
+
+            self._busy = False
@@ -0,0 +1,108 @@
+"""Connection registry for WebSocket symbol subscriptions."""
+
+from typing import Any, Dict, List, Optional, Set
+
+
+class ConnectionState:
+    """Per-socket bookkeeping held by the subscription index."""
+
+    __slots__ = ("websocket", "user_id", "symbols", "outbox")
+
+    def __init__(self, websocket: Any, user_id: Optional[int] = None) -> None:
+        self.websocket = websocket
+        self.user_id = user_id
+        self.symbols: Set[str] = set()
+        # Optional queued writer (services.ws_outbox.Outbox)
+        self.outbox: Optional[Any] = None
+
+
+class SubscriptionIndex:
+    """
+    Bidirectional socket <-> symbol index.
+
+    Every operation touches only the socket's own symbols, so a disconnect
+    costs O(subscriptions held by that socket) instead of a scan over every
+    symbol in the process.
+    """
+
+    def __init__(self) -> None:
+        # symbol -> set of websockets subscribed
+        self.by_symbol: Dict[str, Set[Any]] = {}
+        # websocket -> connection state
+        self.by_socket: Dict[Any, ConnectionState] = {}
+
+    def __len__(self) -> int:
+        return len(self.by_socket)
+
+    def register(self, websocket: Any, user_id: Optional[int] = None) -> ConnectionState:
+        """Track a socket, returning its (possibly existing) state."""
+        state = self.by_socket.get(websocket)
+        if state is None:
+            state = ConnectionState(websocket, user_id)
+            self.by_socket[websocket] = state
+        elif user_id is not None:
+            state.user_id = user_id
+        return state
+
+    def get(self, websocket: Any) -> Optional[ConnectionState]:
+        """Get the state for a socket, if tracked."""
+        return self.by_socket.get(websocket)
+
+    def subscribe(self, websocket: Any, symbol: str) -> bool:
+        """
+        Subscribe a socket to a symbol.
+
+        Returns:
+            True if this is the symbol's first subscriber
+        """
+        state = self.register(websocket)
+        state.symbols.add(symbol)
+
+        subscribers = self.by_symbol.get(symbol)
+        if subscribers is None:
+            self.by_symbol[symbol] = {websocket}
+            return True
+        subscribers.add(websocket)
+        return False
+
+    def unsubscribe(self, websocket: Any, symbol: str) -> bool:
+        """
+        Unsubscribe a socket from a symbol.
+
+        Returns:
+            True if the symbol no longer has any subscribers
+        """
+        state = self.by_socket.get(websocket)
+        if state is not None:
+            state.symbols.discard(symbol)
+        return self._drop(websocket, symbol)
+
+    def remove(self, websocket: Any) -> List[str]:
+        """
+        Forget a socket and all of its subscriptions.
+
+        Returns:
+            Symbols that lost their last subscriber
+        """
+        state = self.by_socket.pop(websocket, None)
+        if state is None:
+            return []
+
+        emptied = [symbol for symbol in state.symbols if self._drop(websocket, symbol)]
+        state.symbols.clear()
+        return emptied
+
+    def subscribers(self, symbol: str) -> Set[Any]:
+        """Get the sockets subscribed to a symbol."""
+        return self.by_symbol.get(symbol, set())
+
+    def _drop(self, websocket: Any, symbol: str) -> bool:
+        """Remove one symbol -> socket edge, pruning empty symbols."""
+        subscribers = self.by_symbol.get(symbol)
+        if subscribers is None:
+            return False
+        subscribers.discard(websocket)
+        if not subscribers:
+            del self.by_symbol[symbol]
+            return True
+        return False
@@ -0,0 +1,121 @@
+"""Sequence numbers and replay buffers for resumable WebSocket streams."""
+
+import json
+import uuid
+from collections import OrderedDict, deque
+from typing import Deque, List, Optional, Tuple
+
+
+def stamp(payload: str, seq: int) -> str:
+    """Add a ``seq`` field to a serialized JSON object without re-encoding it."""
+    body = payload.lstrip()
+    if not body.startswith("{"):
+        return payload
+    rest = body[1:].lstrip()
+    if rest.startswith("}"):
+        return f'{{"seq":{seq}{rest}'
+    return f'{{"seq":{seq},{rest}'
+
+
+def join_frames(kind: str, channel: str, seq: int, frames: List[str]) -> str:
+    """Wrap serialized frames in one ``replay`` or ``snapshot`` message."""
+    return (
+        f'{{"type":"{kind}","channel":{json.dumps(channel)},"seq":{seq},'
+        f'"messages":[{",".join(frames)}]}}'
+    )
+
+
+class _Ring:
+    """Most recent frames of one channel."""
+
+    __slots__ = ("last", "floor", "frames")
+
+    def __init__(self, floor: int, capacity: int) -> None:
+        # Sequence number of the latest frame on this channel
+        self.last = floor
+        # Every frame with a higher sequence number is held in ``frames``
+        self.floor = floor
+        self.frames: Deque[Tuple[int, str]] = deque(maxlen=capacity)
+
+
+class ReplayBuffer:
+    """
+    Stamps outgoing frames with a sequence number and keeps a bounded ring
+    of recent frames per channel, so a reconnecting client that presents
+    the last sequence number it saw can be sent just the frames it missed.
+
+    Sequence numbers come from one counter per process: they increase on
+    every channel but are not contiguous, and a channel whose ring was
+    dropped can never be mistaken for one that saw no traffic. ``epoch``
+    identifies the process; a resume point from another epoch (a restart,
+    or another node) cannot be replayed.
+
+    At most ``max_channels`` rings are kept, least recently written first
+    out.
+    """
+
+    def __init__(self, capacity: int, max_channels: int) -> None:
+        self.capacity = capacity
+        self.max_channels = max_channels
+        self.epoch = uuid.uuid4().hex[:12]
+        self._seq = 0
+        self._rings: "OrderedDict[str, _Ring]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._rings)
+
+    def record(self, channel: str, payload: str) -> str:
+        """Assign the next sequence number, store and return the stamped frame."""
+        ring = self._rings.get(channel)
+        if ring is None:
+            ring = self._rings[channel] = _Ring(self._seq, self.capacity)
+            if len(self._rings) > self.max_channels:
+                self._rings.popitem(last=False)
+        else:
+            self._rings.move_to_end(channel)
+
+        self._seq += 1
+        stamped = stamp(payload, self._seq)
+        if len(ring.frames) == self.capacity:
+            ring.floor = ring.frames[0][0]
+        ring.frames.append((self._seq, stamped))
+        ring.last = self._seq
+        return stamped
+
+    def last_seq(self, channel: str) -> int:
+        """Resume point for a client that has seen everything so far."""
+        ring = self._rings.get(channel)
+        return ring.last if ring is not None else 0
+
+    def since(self, epoch: Optional[str], channel: str, after: int) -> Optional[List[str]]:
+        """
+        Frames sent on a channel after a resume point.
+
+        Returns:
+            The missed frames (possibly none), or None if they cannot be
+            replayed: the gap is older than the ring, or the resume point
+            is from another epoch or was never issued on this channel
+        """
+        ring = self._rings.get(channel)
+        if ring is None or epoch != self.epoch:
+            return None
+        if after < ring.floor or after > ring.last:
+            return None
+        return [frame for seq, frame in ring.frames if seq > after]
+
+    def snapshot(self, channel: str) -> Tuple[int, List[str]]:
+        """Latest sequence number and every frame still held for a channel."""
+        ring = self._rings.get(channel)
+        if ring is None:
+            return 0, []
+        return ring.last, [frame for _, frame in ring.frames]
+
+    def forget(self, channel: str) -> None:
+        """
+        Drop a channel's ring, e.g. when this node stops listening to it and
+        can no longer vouch for what was sent in the meantime.
+        """
+        if self._rings.pop(channel, None) is not None:
+            # A ring recreated later must start past every resume point
+            # issued by this one
+            self._seq += 1
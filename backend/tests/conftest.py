@@ -16,6 +16,7 @@ from fastapi import FastAPI
 
 from api import auth
 from core.database import get_db
+from core.security import token_cache
 
 
 class FakeAsyncSession:
@@ -40,6 +41,13 @@ class FakeAsyncSession:
             setattr(instance, "is_premium", False)
 
 
+@pytest.fixture(autouse=True)
+def clear_auth_caches():
+    yield
+    token_cache.clear()
+    auth.user_cache.clear()
+
+
 @pytest.fixture
 def app_with_overrides():
     app = FastAPI()
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+
+from core.config import settings
+from services.alpaca_service import AlpacaService, AlpacaTimeoutError
+
+
+def quote_response(symbol: str) -> httpx.Response:
+    return httpx.Response(200, json={
+        "symbol": symbol,
+        "quote": {"ap": 190.1, "bp": 190.0, "t": "2026-01-02T20:59:59.123456789Z"},
+    })
+
+
+async def test_requests_run_concurrently_up_to_the_host_limit(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "alpaca_max_concurrency_per_host", 3)
+    in_flight = peak = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return quote_response(request.url.path.split("/")[3])
+
+    service = AlpacaService()
+    service._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    quotes = await asyncio.gather(*(service.get_quote(f"sym{i}") for i in range(10)))
+
+    assert peak == 3
+    assert quotes[0]["symbol"] == "SYM0"
+    assert quotes[0]["timestamp"] == "2026-01-02T20:59:59.123456+00:00"
+
+
+async def test_timeouts_raise_alpaca_timeout_error() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ReadTimeout("timed out", request=request)
+
+    service = AlpacaService()
+    service._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    with pytest.raises(AlpacaTimeoutError) as error:
+        await service.get_quote("AAPL")
+    assert error.value.status_code == 504
+
+
+async def test_fetch_quotes_sends_one_request_per_batch(monkeypatch) -> None:
+    from services import alpaca_service as module
+
+    monkeypatch.setattr(module, "QUOTE_BATCH_SIZE", 2)
+    requested = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        symbols = request.url.params["symbols"].split(",")
+        requested.append(symbols)
+        return httpx.Response(200, json={"quotes": {
+            symbol: {"ap": 2.0, "bp": 1.9, "t": "2026-01-02T20:59:59Z"}
+            for symbol in symbols if symbol != "NOPE"
+        }})
+
+    service = AlpacaService()
+    service._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    quotes = await service.fetch_quotes(["MSFT", "NVDA", "NOPE"])
+
+    assert requested == [["MSFT", "NVDA"], ["NOPE"]]
+    assert set(quotes) == {"MSFT", "NVDA"}
+    assert quotes["NVDA"]["price"] == 2.0
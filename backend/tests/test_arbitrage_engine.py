@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import numpy as np
+
+from services.arbitrage_engine import ArbitrageEngine, MatchIndex
+from services.arbitrage_table import MarketTable
+from services.polymarket_service import PolymarketClient
+from workers.arbitrage_scanner import ArbitrageScanner
+
+
+def kalshi_market(ticker: str, title: str, yes: float, expiry: str = "2026-12-16T19:00:00Z") -> dict:
+    return {
+        "id": ticker,
+        "event": title,
+        "category": "Economics",
+        "kalshi": {"yes": yes, "no": 1 - yes, "volume": 100, "open_interest": 10},
+        "expiry": expiry,
+        "status": "open",
+    }
+
+
+def poly_contract(contract_id: str, title: str, yes: float, expiry: str = "2026-12-16T23:00:00Z") -> dict:
+    return {"id": contract_id, "title": title, "expiry": expiry, "yes": yes, "no": 1 - yes, "volume": 5000.0}
+
+
+def test_match_index_uses_title_words_and_expiry() -> None:
+    index = MatchIndex()
+    index.build([
+        poly_contract("fed", "Will the Fed cut rates in December 2026?", 0.6),
+        poly_contract("fed-late", "Will the Fed cut rates in December 2026?", 0.6, "2027-01-30T00:00:00Z"),
+        poly_contract("btc", "Will Bitcoin be above $150,000 in December 2026?", 0.2),
+    ])
+
+    assert index.match("Will the Fed hike rates in 2027?", "2026-12-16T19:00:00Z") is None
+    assert index.match("Will the Fed cut rates in December 2026", "2026-12-17T12:00:00Z") == "fed"
+    assert index.match("Will the Fed cut rates in December 2026", "2026-11-01T00:00:00Z") is None
+
+
+def test_engine_reevaluates_only_on_price_changes() -> None:
+    engine = ArbitrageEngine(min_edge=0.0, republish_delta=1.0)
+    title = "Will the Fed cut rates in December 2026?"
+
+    assert engine.update_polymarket([poly_contract("fed", title, 0.60)]) == []
+    announced = engine.update_kalshi([kalshi_market("FED-26DEC", title, 0.55)])
+    assert [o["id"] for o in announced] == ["FED-26DEC"]
+    assert (announced[0]["spread"], announced[0]["edge"]) == (5.0, 3.0)
+    assert announced[0]["confidence"] == "High"
+    assert announced[0]["polymarket"]["id"] == "fed"
+
+    # Same prices again: nothing to re-evaluate or announce
+    assert engine.update_kalshi([kalshi_market("FED-26DEC", title, 0.55)]) == []
+    # Narrowing is tracked but not announced; widening past the delta is
+    assert engine.update_polymarket([poly_contract("fed", title, 0.58)]) == []
+    assert engine.top(10)[0]["edge"] == 1.0
+    assert [o["edge"] for o in engine.update_polymarket([poly_contract("fed", title, 0.62)])] == [5.0]
+
+    # Once fees eat the edge the opportunity disappears
+    engine.update_kalshi([kalshi_market("FED-26DEC", title, 0.61)])
+    assert engine.top(10) == []
+
+
+def test_spread_that_fees_eat_is_not_announced() -> None:
+    engine = ArbitrageEngine()
+    title = "Will the Fed cut rates in December 2026?"
+    engine.update_polymarket([{**poly_contract("fed", title, 0.58), "no": 0.44}])
+
+    # 3pt apart on YES, but either pair of legs costs $1.01 with fees
+    market = {**kalshi_market("FED-26DEC", title, 0.55), "kalshi": {"yes": 0.55, "no": 0.47, "volume": 100}}
+    assert engine.update_kalshi([market]) == []
+    assert engine.table.spread()[0] == 3.0
+    assert engine.table.edge()[0] < 0
+    assert engine.top(10) == []
+
+
+def test_normalize_polymarket_market() -> None:
+    contract = PolymarketClient.normalize({
+        "id": "12",
+        "question": "Will it snow?",
+        "endDate": "2026-12-25T00:00:00Z",
+        "outcomes": '["Yes", "No"]',
+        "outcomePrices": '["0.3", "0.7"]',
+        "volume": "1200.5",
+    })
+    assert contract == {
+        "id": "12",
+        "title": "Will it snow?",
+        "expiry": "2026-12-25T00:00:00Z",
+        "yes": 0.3,
+        "no": 0.7,
+        "yes_bid": 0.3,
+        "no_bid": 0.7,
+        "volume": 1200.5,
+    }
+    assert PolymarketClient.normalize({"outcomes": '["Red", "Blue"]', "outcomePrices": '["0.5", "0.5"]'}) is None
+
+
+async def test_contracts_report_whether_the_listing_was_read_to_the_end() -> None:
+    client = PolymarketClient()
+    listing = [
+        {"id": str(i), "question": "?", "outcomes": '["Yes", "No"]', "outcomePrices": '["0.5", "0.5"]'}
+        for i in range(5)
+    ]
+
+    async def page(limit: int, offset: int) -> list:
+        return listing[offset:offset + limit]
+
+    client.get_markets_page = page
+    contracts, complete = await client.get_contracts(page_size=2, max_pages=2)
+    assert (len(contracts), complete) == (4, False)
+    contracts, complete = await client.get_contracts(page_size=2, max_pages=3)
+    assert (len(contracts), complete) == (5, True)
+
+
+def test_table_edge_is_fee_adjusted_and_rank_skips_removed_rows() -> None:
+    table = MarketTable(capacity=2)
+    for key, k_yes, p_yes in (("a", 0.55, 0.62), ("b", 0.50, 0.51), ("c", 0.30, 0.40)):
+        table.set(
+            table.row(key),
+            kalshi_yes_ask=k_yes, kalshi_no_ask=1.02 - k_yes,
+            poly_yes_ask=p_yes, poly_no_ask=1.02 - p_yes,
+        )
+
+    # Buy YES on Kalshi at 0.55 and NO on Polymarket at 0.40, less a 2c Kalshi fee
+    assert table.edge(np.array([0]))[0] == 3.0
+    assert list(table.spread()) == [7.0, 1.0, 10.0]
+
+    table.remove("a")
+    spread = table.spread()
+    assert [table.keys[row] for row in table.rank(spread, 2.0, 10)] == ["c"]
+
+
+def test_top_ranks_by_fee_adjusted_edge() -> None:
+    engine = ArbitrageEngine()
+    fed = "Will the Fed cut rates in December 2026?"
+    btc = "Will Bitcoin be above $150,000 in December 2026?"
+    # A 7pt spread with a 5pt edge, and a 10pt spread whose NO legs cost too much
+    engine.update_polymarket([poly_contract("fed", fed, 0.62), {**poly_contract("btc", btc, 0.30), "no": 0.75}])
+    engine.update_kalshi([
+        kalshi_market("FED-26DEC", fed, 0.55),
+        {**kalshi_market("BTC-26DEC", btc, 0.40), "kalshi": {"yes": 0.40, "no": 0.75, "volume": 100}},
+    ])
+
+    assert [o["id"] for o in engine.top(10)] == ["FED-26DEC"]
+    assert engine.top(10)[0]["edge"] == 5.0
+
+
+def test_delisted_contracts_drop_their_pairs() -> None:
+    engine = ArbitrageEngine()
+    title = "Will the Fed cut rates in December 2026?"
+    listing = [poly_contract("fed", title, 0.60), poly_contract("fed-2", title, 0.65)]
+    engine.update_polymarket(listing)
+    engine.update_kalshi([kalshi_market("FED-26DEC", title, 0.55)])
+
+    # The paired contract disappears from the listing: the market re-pairs
+    [remaining] = [c for c in listing if c["id"] != engine.pairs["FED-26DEC"]]
+    engine.update_polymarket([remaining])
+    assert engine.pairs == {"FED-26DEC": remaining["id"]}
+    assert len(engine.index) == 1
+
+    # A listing cut off before the end says nothing about what was delisted
+    engine.update_polymarket([], complete=False)
+    assert engine.pairs == {"FED-26DEC": remaining["id"]}
+
+    engine.update_polymarket([])
+    assert engine.polymarket == {} and engine.pairs == {}
+    assert len(engine.table) == 0
+    assert engine.top(10) == []
+
+
+def test_alerts_report_the_fee_adjusted_edge() -> None:
+    engine = ArbitrageEngine()
+    title = "Will the Fed cut rates in December 2026?"
+    engine.update_polymarket([poly_contract("fed", title, 0.62)])
+    [opportunity] = engine.update_kalshi([kalshi_market("FED-26DEC", title, 0.55)])
+
+    alert = ArbitrageScanner.to_alert(opportunity)
+
+    assert opportunity["spread"] == 7.0
+    # 1 - (0.55 + 0.38) less the 2c Kalshi fee
+    assert alert["potential_profit"] == opportunity["edge"] == 5.0
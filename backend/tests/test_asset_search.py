@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import string
+
+from services.asset_search import AssetIndex, AssetSearch
+from services.stock_snapshot import StockSnapshot
+
+WORDS = ["Apple", "Micro", "Systems", "Holdings", "Inc.", "Corp", "Energy", "Bank", "Pharma", "AMC", "Ltd"]
+
+
+def random_assets(count: int) -> list:
+    rng = random.Random(5)
+    symbols = set()
+    while len(symbols) < count:
+        symbols.add("".join(rng.choice(string.ascii_uppercase) for _ in range(rng.randint(1, 5))))
+    return [
+        {"symbol": symbol, "name": " ".join(rng.sample(WORDS, rng.randint(1, 3))), "exchange": "NYSE", "tradable": True}
+        for symbol in sorted(symbols)
+    ]
+
+
+def scan(assets: list, q: str, limit: int = 15) -> list:
+    """The original endpoint: substring scan and sort"""
+    query = q.upper()
+    matches = [a for a in assets if query in a["symbol"].upper() or query in a["name"].upper()]
+
+    def sort_key(a):
+        symbol, name = a["symbol"].upper(), a["name"].upper()
+        if symbol == query:
+            return (0, len(symbol), symbol)
+        if symbol.startswith(query):
+            return (1, len(symbol), symbol)
+        if query in symbol:
+            return (2, len(symbol), symbol)
+        if name.startswith(query):
+            return (3, len(name), symbol)
+        return (4, len(name), symbol)
+
+    return [a["symbol"] for a in sorted(matches, key=sort_key)[:limit]]
+
+
+def test_search_ranks_like_the_original_scan() -> None:
+    assets = random_assets(3000)
+    index = AssetIndex(assets)
+    queries = ["a", "AB", "xyz", "q", "zz", "apple", "micro sys", "inc", "CORP B", "bank", "hold", "nothing here", "Ltd"]
+    queries += [a["symbol"] for a in assets[::300]]
+
+    for q in queries:
+        assert [a["symbol"] for a in index.search(q)] == scan(assets, q), q
+
+
+def test_name_matches_need_the_whole_query_in_order() -> None:
+    index = AssetIndex([
+        {"symbol": "ZZZ", "name": "Systems Micro"},
+        {"symbol": "YYY", "name": "Micro Systems"},
+    ])
+
+    assert [a["symbol"] for a in index.search("micro sys")] == ["YYY"]
+
+
+class FakeAlpaca:
+    """Lists one asset; price snapshots wait for ``gate``."""
+
+    def __init__(self) -> None:
+        self.asset_calls = 0
+        self.gate = asyncio.Event()
+
+    async def get_assets(self) -> list:
+        self.asset_calls += 1
+        return [{"symbol": "AAPL", "name": "Apple Inc.", "tradable": True}]
+
+    async def fetch_snapshots(self, symbols: list) -> dict:
+        await self.gate.wait()
+        return {}
+
+
+async def test_first_search_waits_for_the_asset_list_only() -> None:
+    alpaca = FakeAlpaca()
+    snapshot = StockSnapshot(alpaca)
+    search = AssetSearch(snapshot)
+
+    # Prices never arrive, yet the search is answered from the asset list
+    results = await asyncio.wait_for(search.search("aap"), timeout=1)
+    assert [a["symbol"] for a in results] == ["AAPL"]
+    assert not snapshot.refresh().done()
+
+    assert [a["symbol"] for a in await search.search("apple")] == ["AAPL"]
+    assert alpaca.asset_calls == 1
+    alpaca.gate.set()
+    await snapshot.refresh()
@@ -1,9 +1,19 @@
 from __future__ import annotations
 
+from datetime import timedelta
+
 import pytest
 
-from core.security import create_access_token, create_refresh_token, get_password_hash
+from api.auth import invalidate_user
+from core.security import (
+    create_access_token,
+    create_refresh_token,
+    decode_token,
+    get_password_hash,
+    token_cache,
+)
 from models.user import User
+from services.password_hasher import password_hasher
 
 
 @pytest.mark.asyncio
@@ -197,3 +207,93 @@ async def test_me_invalid_token(async_client):
 
     assert response.status_code == 401
     assert response.json()["detail"] == "Could not validate credentials"
+
+
+@pytest.mark.asyncio
+async def test_me_is_served_from_user_cache_until_invalidated(async_client, monkeypatch):
+    user = User(
+        id=1,
+        email="user@example.com",
+        username="user",
+        hashed_password=get_password_hash("password123"),
+        theme="dark",
+        is_verified=False,
+        is_premium=False,
+    )
+    lookups = []
+
+    async def fake_get_by_id(cls, db, user_id):
+        lookups.append(user_id)
+        return user
+
+    monkeypatch.setattr(User, "get_by_id", classmethod(fake_get_by_id))
+
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': '1'})}"}
+    hits = token_cache.hits
+    for _ in range(3):
+        response = await async_client.get("/api/v1/auth/me", headers=headers)
+        assert response.status_code == 200
+    assert lookups == [1]
+    assert token_cache.hits - hits == 2
+
+    await invalidate_user(1)
+    response = await async_client.get("/api/v1/auth/me", headers=headers)
+    assert response.status_code == 200
+    assert lookups == [1, 1]
+
+
+def test_decode_token_does_not_cache_expired_tokens():
+    token = create_access_token(data={"sub": "1"}, expires_delta=timedelta(seconds=-1))
+    assert decode_token(token) is None
+    assert len(token_cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_login_is_rejected_when_hashing_queue_is_full(async_client, monkeypatch):
+    user = User(
+        id=1,
+        email="user@example.com",
+        username="user",
+        hashed_password=get_password_hash("password123"),
+    )
+
+    async def fake_get_by_email(cls, db, email):
+        return user
+
+    monkeypatch.setattr(User, "get_by_email", classmethod(fake_get_by_email))
+    monkeypatch.setattr(password_hasher, "max_pending", 0)
+
+    response = await async_client.post(
+        "/api/v1/auth/login",
+        data={"username": "user@example.com", "password": "password123"},
+    )
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+
+@pytest.mark.asyncio
+async def test_watchlist_changes_are_committed_before_the_cache_is_invalidated(monkeypatch):
+    from api import market
+
+    events = []
+
+    class Session:
+        async def commit(self):
+            events.append("commit")
+
+    async def fake_invalidate(user_id):
+        events.append("invalidate")
+
+    async def fake_get_quote(symbol):
+        return {"symbol": symbol}
+
+    monkeypatch.setattr(market, "invalidate_user", fake_invalidate)
+    monkeypatch.setattr(market.alpaca_service, "get_quote", fake_get_quote)
+    user = User(id=1, email="user@example.com", username="user", hashed_password="x", watchlist=None)
+
+    await market.add_to_watchlist("aapl", user, Session())
+    assert user.watchlist == ["AAPL"]
+    await market.remove_from_watchlist("aapl", user, Session())
+    assert user.watchlist == []
+    assert events == ["commit", "invalidate", "commit", "invalidate"]
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import numpy as np
+
+from services.bar_resampler import (
+    bucket_start,
+    empty_bars,
+    session_buckets,
+    session_resample,
+    update_bars,
+)
+
+
+def epoch(text: str) -> int:
+    return int(datetime.fromisoformat(text).replace(tzinfo=timezone.utc).timestamp())
+
+
+def minute_bars(start: str, count: int) -> dict:
+    t = epoch(start) + np.arange(count, dtype=np.int64) * 60
+    price = np.arange(count, dtype=np.float64) + 100
+    return {"t": t, "open": price, "high": price + 1, "low": price - 1, "close": price + 0.5,
+            "volume": np.full(count, 10.0)}
+
+
+def test_hourly_bars_align_to_the_session_open_across_dst() -> None:
+    # 09:30 New York is 14:30 UTC in January and 13:30 UTC in July
+    winter = session_buckets(np.array([epoch("2026-01-05T14:45:00")]), 3600)
+    summer = session_buckets(np.array([epoch("2026-07-06T13:45:00")]), 3600)
+
+    assert winter[0] == epoch("2026-01-05T14:30:00")
+    assert summer[0] == epoch("2026-07-06T13:30:00")
+
+
+def test_daily_bars_start_at_new_york_midnight() -> None:
+    # 01:00 UTC on the 6th is still the 5th in New York
+    assert bucket_start(epoch("2026-01-06T01:00:00"), 86400) == epoch("2026-01-05T05:00:00")
+
+
+def test_session_resample_aggregates_ohlcv() -> None:
+    bars = minute_bars("2026-01-05T14:30:00", 120)
+
+    hourly = session_resample(bars, 3600)
+
+    assert list(hourly["t"]) == [epoch("2026-01-05T14:30:00"), epoch("2026-01-05T15:30:00")]
+    assert list(hourly["open"]) == [100.0, 160.0]
+    assert list(hourly["high"]) == [160.0, 220.0]
+    assert list(hourly["low"]) == [99.0, 159.0]
+    assert list(hourly["close"]) == [159.5, 219.5]
+    assert list(hourly["volume"]) == [600.0, 600.0]
+
+
+def test_trades_fold_into_the_same_bars_as_a_batch_resample() -> None:
+    start = epoch("2026-01-05T14:30:00")
+    trades = [(start + 7 * i, 100.0 + (i * 37) % 11, float(i % 3)) for i in range(200)]
+
+    live = empty_bars()
+    for t, price, volume in trades:
+        live = update_bars(live, t, price, volume, 300)
+    # A late trade for a closed bar changes nothing
+    assert update_bars(live, start, 0.0, 1.0, 300) is live
+
+    ticks = {
+        "t": np.array([t for t, _, _ in trades], dtype=np.int64),
+        "open": np.array([p for _, p, _ in trades]),
+        "high": np.array([p for _, p, _ in trades]),
+        "low": np.array([p for _, p, _ in trades]),
+        "close": np.array([p for _, p, _ in trades]),
+        "volume": np.array([v for _, _, v in trades]),
+    }
+    batch = session_resample(ticks, 300)
+    for name in batch:
+        assert np.array_equal(live[name], batch[name])
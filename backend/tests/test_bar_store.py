@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from services import bar_store as module
+from services.bar_feed import BarFeed
+from services.bar_resampler import session_resample
+from services.bar_store import BarSeries, BarStore, InvalidSymbolError
+
+
+class FakeAlpaca:
+    """Minute bars for every minute up to now, recording requested ranges."""
+
+    def __init__(self) -> None:
+        self.calls = []
+        self.unknown = set()
+
+    async def fetch_bars(self, symbol: str, timeframe: str, start: datetime, end: datetime) -> list:
+        self.calls.append((timeframe, int(start.timestamp()), int(end.timestamp())))
+        if symbol in self.unknown:
+            return []
+        first = -(-int(start.timestamp()) // 60) * 60
+        return [
+            {
+                "t": datetime.fromtimestamp(t, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "o": t % 97, "h": t % 97 + 1, "l": t % 97 - 1, "c": t % 97 + 0.5, "v": 10,
+            }
+            for t in range(first, int(end.timestamp()) + 1, 60)
+        ]
+
+
+@pytest.fixture
+def alpaca(monkeypatch):
+    fake = FakeAlpaca()
+    monkeypatch.setattr(module, "alpaca_service", fake)
+    return fake
+
+
+async def test_repeat_requests_fetch_only_the_new_tail(tmp_path, alpaca) -> None:
+    store = BarStore(str(tmp_path), refresh_interval=0)
+
+    first = await store.get_bars("aapl", "1Min", 100)
+    assert len(first["t"]) == 100
+    assert np.all(np.diff(first["t"]) == 60)
+    _, start, _ = alpaca.calls[0]
+
+    second = await store.get_bars("AAPL", "1Min", 100)
+    assert len(alpaca.calls) == 2
+    # The tail fetch starts where the final bars stored so far end
+    assert alpaca.calls[1][1] > start
+    assert alpaca.calls[1][1] == BarSeries(tmp_path / "1Min" / "AAPL").end
+    assert second["t"][-1] >= first["t"][-1]
+
+
+async def test_throttled_requests_are_served_from_disk(tmp_path, alpaca) -> None:
+    store = BarStore(str(tmp_path), refresh_interval=60)
+
+    await store.get_bars("AAPL", "1Min", 50)
+    bars = await store.get_bars("AAPL", "1Min", 50)
+
+    assert len(alpaca.calls) == 1
+    assert len(bars["t"]) == 50
+
+
+async def test_higher_timeframes_are_resampled_from_minutes(tmp_path, alpaca) -> None:
+    store = BarStore(str(tmp_path), refresh_interval=60)
+
+    minutes = await store.get_bars("AAPL", "1Min", 1000)
+    five = await store.get_bars("AAPL", "5Min", 100)
+
+    assert [call[0] for call in alpaca.calls] == ["1Min"]
+    assert len(five["t"]) == 100
+    expected = session_resample(minutes, 300)
+    assert np.array_equal(five["t"], expected["t"][-100:])
+    assert np.array_equal(five["high"], expected["high"][-100:])
+
+
+def minute_bars(count: int, offset: int = 0) -> dict:
+    t = (np.arange(count, dtype=np.int64) + offset) * 60
+    return {"t": t, **{name: t.astype(np.float64) for name in ("open", "high", "low", "close", "volume")}}
+
+
+def test_reopening_cuts_a_torn_append(tmp_path) -> None:
+    series = BarSeries(tmp_path)
+    series.rewrite(minute_bars(3), 0, 180)
+    # Columns written, row count never committed
+    for name in ("open", "close"):
+        with open(tmp_path / "g1" / f"{name}.bin", "ab") as f:
+            f.write(b"\0" * 12)
+
+    reopened = BarSeries(tmp_path)
+
+    assert len(reopened.bars()["t"]) == 3
+    assert (tmp_path / "g1" / "close.bin").stat().st_size == 24
+    assert (reopened.start, reopened.end, reopened.last_t) == (0, 180, 120)
+
+
+def test_uncommitted_rewrite_leaves_the_previous_generation(tmp_path) -> None:
+    series = BarSeries(tmp_path)
+    series.rewrite(minute_bars(3), 0, 180)
+    series.append(minute_bars(2, offset=3), 300)
+    # A rewrite that died after writing some of its columns
+    (tmp_path / "g2").mkdir()
+    (tmp_path / "g2" / "t.bin").write_bytes(np.arange(9, dtype="<i8").tobytes())
+
+    reopened = BarSeries(tmp_path)
+    bars = reopened.bars()
+
+    assert list(bars["t"]) == [0, 60, 120, 180, 240]
+    assert list(bars["close"]) == list(bars["t"].astype(float))
+    # The next rewrite replaces the leftover and drops the old generation
+    reopened.prepend(minute_bars(2, offset=-2), -120)
+    assert sorted(p.name for p in tmp_path.glob("g*")) == ["g2"]
+    assert list(BarSeries(tmp_path).bars()["t"]) == [-120, -60, 0, 60, 120, 180, 240]
+
+
+async def test_symbols_are_checked_before_touching_disk(tmp_path, alpaca) -> None:
+    store = BarStore(str(tmp_path / "bars"), refresh_interval=60)
+
+    for symbol in ("../../../x", "AAPL/../..", "", "A" * 40):
+        with pytest.raises(InvalidSymbolError):
+            await store.get_bars(symbol, "1Min", 10)
+
+    assert alpaca.calls == []
+    assert list(tmp_path.iterdir()) == []
+
+
+async def test_symbols_without_bars_leave_nothing_on_disk(tmp_path, alpaca) -> None:
+    alpaca.unknown.add("ZZZZ")
+    store = BarStore(str(tmp_path), refresh_interval=60)
+
+    assert len((await store.get_bars("ZZZZ", "1Min", 10))["t"]) == 0
+    assert len((await store.get_bars("ZZZZ", "1Min", 10))["t"]) == 0
+
+    assert len(alpaca.calls) == 1
+    assert list(tmp_path.iterdir()) == []
+    assert len((await store.get_bars("BRK.B", "1D", 10))["t"]) == 10
+
+
+async def test_live_trades_move_the_in_progress_bar(tmp_path, alpaca, monkeypatch) -> None:
+    store = BarStore(str(tmp_path), refresh_interval=60)
+    assert store.latest("AAPL", "5Min") is None
+
+    last = (await store.get_bars("AAPL", "5Min", 10))["t"][-1]
+
+    def no_disk(self):
+        raise AssertionError("latest() read the disk")
+
+    # latest() runs on the event loop for every tick
+    with monkeypatch.context() as patch:
+        patch.setattr(BarSeries, "bars", no_disk)
+        current = store.latest("AAPL", "5Min")
+        store.ingest("AAPL", int(current["t"][0]) + 299, 1000.0, 5)
+        moved = store.latest("AAPL", "5Min")
+
+    assert current["t"][0] == last
+    assert moved["t"][0] == current["t"][0]
+    assert moved["high"][0] == 1000.0
+    assert moved["close"][0] == 1000.0
+    assert moved["volume"][0] == current["volume"][0] + 5
+    bars = await store.get_bars("AAPL", "5Min", 10)
+    assert bars["close"][-1] == 1000.0
+    assert bars["volume"][-1] == moved["volume"][0]
+
+
+async def test_chart_sockets_get_the_bar_each_tick_moves(tmp_path, alpaca) -> None:
+    store = BarStore(str(tmp_path), refresh_interval=60)
+    await store.get_bars("AAPL", "1H", 10)
+    sent = []
+    feed = BarFeed(store, lambda ws, message, key: sent.append((ws, message, key)) or True)
+    feed.add("socket", "AAPL", "1H")
+
+    now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    tick = {"type": "price_update", "symbol": "AAPL", "data": {"new_price": 1000.0, "timestamp": now}}
+    feed.on_tick("AAPL", json.dumps(tick))
+    feed.on_tick("MSFT", json.dumps(tick))
+
+    [(socket, message, key)] = sent
+    assert (socket, key) == ("socket", "bar:AAPL:1H")
+    assert message["data"]["close"] == 1000.0
+
+    feed.add("socket", "MSFT", "1D")
+    feed.add("other", "AAPL", "5Min")
+    feed.remove("socket", "AAPL", "1H")
+    assert feed.by_socket == {"socket": {("MSFT", "1D")}, "other": {("AAPL", "5Min")}}
+
+    feed.drop("socket")
+    feed.drop("socket")
+    assert feed.charts == {"AAPL": {"other": {"5Min"}}}
+    assert feed.by_socket == {"other": {("AAPL", "5Min")}}
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+
+import httpx
+import pytest
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding, rsa
+
+from services import kalshi_service as module
+from services.kalshi_service import KalshiAPIError, KalshiClient
+
+
+@pytest.fixture
+def private_key(tmp_path, monkeypatch):
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    path = tmp_path / "kalshi.pem"
+    path.write_bytes(key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ))
+    monkeypatch.setenv("KALSHI_PRIVATE_KEY_PATH", str(path))
+    monkeypatch.setenv("KALSHI_API_KEY", "key-id")
+    monkeypatch.setenv("KALSHI_API_URL", "https://kalshi.test/trade-api/v2")
+    return key
+
+
+@pytest.fixture
+def transport(monkeypatch):
+    """Route every AsyncClient the service builds to a stub, recording both."""
+    requests = []
+    created = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        resource = request.url.path.rsplit("/", 1)[-1]
+        return httpx.Response(200, json={resource: [{"ticker": "T"}], "cursor": ""})
+
+    real = httpx.AsyncClient
+
+    def make_client(**kwargs):
+        created.append(kwargs)
+        return real(transport=httpx.MockTransport(handler), **kwargs)
+
+    monkeypatch.setattr(module.httpx, "AsyncClient", make_client)
+    return requests, created
+
+
+async def test_requests_share_one_pooled_client(private_key, transport) -> None:
+    requests, created = transport
+    client = KalshiClient()
+
+    await client.get_markets_page(limit=10)
+    await client.get_events_page(limit=10)
+    await asyncio.gather(*(client.get_market(f"T{i}") for i in range(5)))
+
+    assert len(created) == 1
+    assert created[0]["http2"] is True
+    assert len(requests) == 7
+
+    # The signature covers timestamp, method and path, and verifies
+    request = requests[0]
+    message = request.headers["KALSHI-ACCESS-TIMESTAMP"] + "GET" + "/markets?limit=10&status=open"
+    private_key.public_key().verify(
+        base64.b64decode(request.headers["KALSHI-ACCESS-SIGNATURE"]),
+        message.encode(),
+        padding.PKCS1v15(),
+        hashes.SHA256(),
+    )
+
+    await client.close()
+    await client.get_markets_page()
+    assert len(created) == 2
+    await client.close()
+
+
+async def test_error_status_raises_on_pages(private_key, monkeypatch) -> None:
+    client = KalshiClient()
+    client._client = httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda request: httpx.Response(503, text="down"))
+    )
+
+    with pytest.raises(KalshiAPIError):
+        await client.get_markets_page()
+    assert await client.get_markets() == []
+    await client.close()
+
+
+async def test_same_millisecond_and_path_share_one_signature(private_key, monkeypatch) -> None:
+    monkeypatch.setenv("KALSHI_SIGNATURE_REUSE", "true")
+    client = KalshiClient()
+
+    signatures = await asyncio.gather(*(client._sign("1000", "GET", "/markets") for _ in range(5)))
+    assert len(set(signatures)) == 1
+    assert client.signing_stats()["signed"] == 1
+    assert client.signing_stats()["reused"] == 4
+
+    other_path = await client._sign("1000", "GET", "/events")
+    next_ms = await client._sign("1001", "GET", "/markets")
+    stats = client.signing_stats()
+    assert (stats["signed"], stats["reused"]) == (3, 4)
+    assert len({signatures[0], other_path, next_ms}) == 3
+    await client.close()
+
+
+async def test_concurrent_requests_in_one_millisecond_sign_once(
+    private_key, transport, monkeypatch
+) -> None:
+    monkeypatch.setenv("KALSHI_SIGNATURE_REUSE", "true")
+    monkeypatch.setattr(module.time, "time", lambda: 1_700_000_000.0)
+    requests, _ = transport
+    client = KalshiClient()
+
+    await asyncio.gather(*(client.get_markets_page(limit=10) for _ in range(4)))
+
+    assert client.signing_stats()["signed"] == 1
+    assert client.signing_stats()["reused"] == 3
+    assert len({r.headers["KALSHI-ACCESS-SIGNATURE"] for r in requests}) == 1
+    await client.close()
+
+
+async def test_every_request_signs_without_reuse(private_key, monkeypatch) -> None:
+    client = KalshiClient()
+    assert client.signature_reuse is False
+
+    await asyncio.gather(*(client._sign("1000", "GET", "/markets") for _ in range(3)))
+
+    assert client.signing_stats()["signed"] == 3
+    assert client.signing_stats()["reused"] == 0
+    await client.close()
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from services.kalshi_service import KalshiAPIError, KalshiClient
+from services.kalshi_snapshot import KalshiSnapshot
+from services.snapshot import BackgroundSnapshot
+
+
+def market(ticker: str, event: str, close_time: str) -> dict:
+    return {"ticker": ticker, "event_ticker": event, "title": ticker, "yes_ask": 40, "close_time": close_time}
+
+
+class FakeKalshi:
+    """Cursor-paginated markets and events; fails while ``error`` is set."""
+
+    format_market_for_arb = KalshiClient.format_market_for_arb
+
+    def __init__(self, markets: list, events: list) -> None:
+        self.markets = markets
+        self.events = events
+        self.error = None
+        self.gate = None
+        self.calls = []
+
+    async def _page(self, items: list, limit: int, cursor):
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.error is not None:
+            raise self.error
+        start = int(cursor or 0)
+        end = start + limit
+        return items[start:end], str(end) if end < len(items) else None
+
+    async def get_markets_page(self, limit: int, cursor=None):
+        self.calls.append(("markets", cursor))
+        return await self._page(self.markets, limit, cursor)
+
+    async def get_events_page(self, limit: int, cursor=None):
+        self.calls.append(("events", cursor))
+        return await self._page(self.events, limit, cursor)
+
+
+def fake_kalshi() -> FakeKalshi:
+    return FakeKalshi(
+        markets=[
+            market("FED-1", "FED", "2030-01-01T00:00:00Z"),
+            market("FED-2", "FED", "2026-01-01T00:00:00Z"),
+            market("NBA-1", "NBA", "2028-01-01T00:00:00Z"),
+            market("ODD-1", "ODD", ""),
+        ],
+        events=[
+            {"event_ticker": "FED", "category": "Economics"},
+            {"event_ticker": "NBA", "category": "Sports"},
+        ],
+    )
+
+
+async def test_pages_through_the_cursor_and_indexes_markets() -> None:
+    client = fake_kalshi()
+    snapshot = KalshiSnapshot(client, page_size=3)
+
+    markets = await snapshot.markets(limit=10)
+
+    assert client.calls == [("markets", None), ("markets", "3"), ("events", None)]
+    assert [m["id"] for m in markets] == ["FED-1", "FED-2", "NBA-1", "ODD-1"]
+    assert (await snapshot.market("NBA-1"))["category"] == "Sports"
+    assert await snapshot.market("MISSING") is None
+    economics = await snapshot.markets(limit=10, category="economics")
+    assert [m["id"] for m in economics] == ["FED-1", "FED-2"]
+    # Expiry range queries come back soonest first; unknown expiries never match
+    expiring = await snapshot.markets(limit=10, expires_before=1893456000)  # 2030-01-01
+    assert [m["id"] for m in expiring] == ["FED-2", "NBA-1"]
+    assert len(await snapshot.events(limit=10)) == 2
+    assert snapshot.stats()["categories"] == 3
+
+
+async def test_stale_snapshot_is_served_while_one_refresh_runs() -> None:
+    client = fake_kalshi()
+    snapshot = KalshiSnapshot(client, refresh_interval=0)
+    await snapshot.markets(limit=10)
+    calls = len(client.calls)
+
+    client.gate = asyncio.Event()
+    client.markets = client.markets[:1]
+    stale = await asyncio.gather(*(snapshot.markets(limit=10) for _ in range(3)))
+
+    # Every read got the old snapshot without waiting, and shared one refresh
+    assert all(len(markets) == 4 for markets in stale)
+    await asyncio.sleep(0)
+    assert len(client.calls) == calls + 1
+
+    client.gate.set()
+    await snapshot.refresh()
+    assert [m["id"] for m in await snapshot.markets(limit=10)] == ["FED-1"]
+
+
+async def test_failed_refresh_backs_off_instead_of_blocking_every_read() -> None:
+    client = fake_kalshi()
+    client.error = KalshiAPIError("503 - down")
+    snapshot = KalshiSnapshot(client, retry_interval=60)
+
+    assert await snapshot.markets(limit=10) == []
+    assert len(client.calls) == 1
+    # Within the backoff, reads neither wait nor call upstream
+    for _ in range(5):
+        assert await snapshot.markets(limit=10) == []
+    assert len(client.calls) == 1
+    assert snapshot.stats()["last_error"] == "503 - down"
+
+    snapshot.retry_interval = 0
+    client.error = None
+    assert len(await snapshot.markets(limit=10)) == 4
+    assert snapshot.stats()["last_error"] is None
+
+
+async def test_failed_refresh_keeps_the_previous_snapshot() -> None:
+    client = fake_kalshi()
+    snapshot = KalshiSnapshot(client, refresh_interval=0, retry_interval=60)
+    await snapshot.markets(limit=10)
+
+    client.error = KalshiAPIError("503 - down")
+    await snapshot.refresh()
+    calls = len(client.calls)
+
+    assert len(await snapshot.markets(limit=10)) == 4
+    await asyncio.sleep(0)
+    assert len(client.calls) == calls
+
+
+def test_snapshots_must_implement_fetch() -> None:
+    class Incomplete(BackgroundSnapshot):
+        label = "Incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete(refresh_interval=1)
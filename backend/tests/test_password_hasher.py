@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import pytest
+
+from services.password_hasher import HasherBusyError, PasswordHasher
+
+
+async def settle(hasher: PasswordHasher) -> None:
+    for _ in range(100):
+        if not hasher.pending:
+            return
+        await asyncio.sleep(0.01)
+
+
+async def test_cancelled_caller_keeps_its_slot_until_the_worker_finishes() -> None:
+    hasher = PasswordHasher(workers=1, max_pending=1)
+    started, release = threading.Event(), threading.Event()
+
+    def slow() -> str:
+        started.set()
+        release.wait(5)
+        return "hashed"
+
+    caller = asyncio.ensure_future(hasher._run(slow))
+    await asyncio.to_thread(started.wait, 5)
+    caller.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await caller
+
+    # bcrypt is still running, so there is still no room
+    assert hasher.pending == 1
+    with pytest.raises(HasherBusyError):
+        await hasher._run(slow)
+
+    release.set()
+    await settle(hasher)
+    assert hasher.stats()["pending"] == 0
+    assert (hasher.completed, hasher.failed, hasher.rejected) == (1, 0, 1)
+    hasher.shutdown()
+
+
+async def test_failed_calls_are_not_counted_as_completed() -> None:
+    hasher = PasswordHasher(workers=1, max_pending=4)
+
+    def broken() -> str:
+        raise ValueError("malformed hash")
+
+    with pytest.raises(ValueError):
+        await hasher._run(broken)
+    assert await hasher._run(str.upper, "ok") == "OK"
+
+    await settle(hasher)
+    assert (hasher.pending, hasher.completed, hasher.failed) == (0, 1, 1)
+    hasher.shutdown()
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from api import public
+from core.config import settings
+
+
+class FakeQuotes:
+    def __init__(self) -> None:
+        self.requested = []
+
+    async def get_quotes(self, symbols: list) -> dict:
+        self.requested.append(symbols)
+        quotes = {s: {"symbol": s, "bid": 9.0, "ask": 11.0, "timestamp": "t"} for s in symbols}
+        if "TSLA" in quotes:
+            # One side of the book empty
+            quotes["TSLA"].update(bid=None, ask=0.0, price=250.0)
+        if "GME" in quotes:
+            quotes["GME"].update(bid=None, ask=None)
+        return quotes
+
+    async def get_quote(self, symbol: str) -> dict:
+        # Kafka price updates cache a price but no bid/ask
+        return {"price": 10.0, "timestamp": "t"} if symbol.upper() == "AAPL" else {}
+
+
+def client(monkeypatch) -> tuple:
+    quotes = FakeQuotes()
+    monkeypatch.setattr(public, "quote_service", quotes)
+    app = FastAPI()
+    app.include_router(public.router, prefix="/api/public")
+    return AsyncClient(transport=ASGITransport(app=app), base_url="http://test"), quotes
+
+
+async def test_quotes_are_deduplicated_and_capped(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "public_quotes_max_symbols", 3)
+    http, quotes = client(monkeypatch)
+
+    ok = await http.get("/api/public/quotes", params={"symbols": "aapl, MSFT,aapl,,nvda"})
+    too_many = await http.get("/api/public/quotes", params={"symbols": "A,B,C,D"})
+
+    assert ok.status_code == 200
+    assert quotes.requested == [["AAPL", "MSFT", "NVDA"]]
+    assert ok.json()["MSFT"] == {"bid": 9.0, "ask": 11.0, "price": 10.0, "timestamp": "t"}
+    assert too_many.status_code == 400
+
+
+async def test_quotes_with_a_missing_side_fall_back_to_the_last_price(monkeypatch) -> None:
+    http, _ = client(monkeypatch)
+
+    response = await http.get("/api/public/quotes", params={"symbols": "TSLA,GME"})
+
+    assert response.status_code == 200
+    assert response.json()["TSLA"] == {"bid": 250.0, "ask": 0.0, "price": 250.0, "timestamp": "t"}
+    assert response.json()["GME"]["price"] is None
+
+
+async def test_single_quote_falls_back_to_the_cached_price(monkeypatch) -> None:
+    http, _ = client(monkeypatch)
+
+    found = await http.get("/api/public/quote/aapl")
+    missing = await http.get("/api/public/quote/zzzz")
+
+    assert found.json()["bid"] == found.json()["ask"] == 10.0
+    assert missing.status_code == 404
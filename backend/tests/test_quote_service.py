@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+
+from core.config import settings
+from services import quote_service as module
+from services.quote_service import QuoteService
+
+
+class FakeRedis:
+    """The slice of RedisClient the quote service uses, with TTLs frozen."""
+
+    def __init__(self) -> None:
+        self.values = {}
+        self.locks = {}
+
+    async def get_market_data_with_ttl(self, symbol: str, local: bool = True):
+        return self.values.get(symbol, (None, -2))
+
+    async def cache_market_data(self, symbol: str, data: str, ttl: int = 60) -> None:
+        self.values[symbol] = (json.loads(data), ttl * 1000)
+
+    async def get_market_data_many(self, symbols: list) -> list:
+        return [self.values.get(symbol, (None, -2))[0] for symbol in symbols]
+
+    async def cache_market_data_many(self, data: dict, ttl: int = 60) -> None:
+        for symbol, value in data.items():
+            await self.cache_market_data(symbol, value, ttl)
+
+    async def acquire_lock(self, key: str, ttl_ms: int):
+        if key in self.locks:
+            return None
+        self.locks[key] = "token"
+        return "token"
+
+    async def release_lock(self, key: str, token: str) -> None:
+        if self.locks.get(key) == token:
+            del self.locks[key]
+
+
+class FakeAlpaca:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.batches = []
+
+    async def get_quote(self, symbol: str) -> dict:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return {"symbol": symbol, "price": 100.0 + self.calls}
+
+    async def fetch_quotes(self, symbols: list) -> dict:
+        self.batches.append(symbols)
+        await asyncio.sleep(0.01)
+        return {s: {"symbol": s, "price": 50.0} for s in symbols if s != "NOPE"}
+
+
+@pytest.fixture
+def fakes(monkeypatch):
+    redis, alpaca = FakeRedis(), FakeAlpaca()
+    monkeypatch.setattr(module, "redis_client", redis)
+    monkeypatch.setattr(module, "alpaca_service", alpaca)
+    return redis, alpaca
+
+
+async def test_concurrent_misses_share_one_fetch(fakes) -> None:
+    redis, alpaca = fakes
+    service = QuoteService()
+
+    quotes = await asyncio.gather(*(service.get_quote("aapl") for _ in range(20)))
+
+    assert alpaca.calls == 1
+    assert {q["price"] for q in quotes} == {101.0}
+    assert "AAPL" in redis.values
+    assert redis.locks == {}
+
+
+async def test_stale_quote_is_served_while_one_refresh_runs(fakes) -> None:
+    redis, alpaca = fakes
+    redis.values["AAPL"] = ({"symbol": "AAPL", "price": 1.0}, 500)
+    service = QuoteService()
+
+    quotes = await asyncio.gather(*(service.get_quote("AAPL") for _ in range(5)))
+    assert [q["price"] for q in quotes] == [1.0] * 5
+
+    await asyncio.sleep(0.05)
+    assert alpaca.calls == 1
+    assert redis.values["AAPL"][0]["price"] == 101.0
+
+
+async def test_lock_loser_waits_for_the_other_nodes_quote(fakes, monkeypatch) -> None:
+    redis, alpaca = fakes
+    monkeypatch.setattr(settings, "quote_lock_ttl_ms", 1000)
+    redis.locks["lock:market:AAPL"] = "other-node"
+    service = QuoteService()
+
+    async def other_node() -> None:
+        await asyncio.sleep(0.05)
+        await redis.cache_market_data("AAPL", json.dumps({"symbol": "AAPL", "price": 7.0}), ttl=45)
+
+    quote, _ = await asyncio.gather(service.get_quote("AAPL"), other_node())
+
+    assert quote["price"] == 7.0
+    assert alpaca.calls == 0
+
+
+async def test_batch_misses_are_fetched_once_and_shared(fakes) -> None:
+    redis, alpaca = fakes
+    redis.values["AAPL"] = ({"symbol": "AAPL", "price": 1.0}, 30000)
+    service = QuoteService()
+
+    first, second, single = await asyncio.gather(
+        service.get_quotes(["aapl", "msft", "nope"]),
+        service.get_quotes(["MSFT", "NVDA"]),
+        service.get_quote("nvda"),
+    )
+
+    assert alpaca.batches == [["MSFT", "NOPE"], ["NVDA"]]
+    assert alpaca.calls == 0
+    assert first == {"AAPL": {"symbol": "AAPL", "price": 1.0}, "MSFT": {"symbol": "MSFT", "price": 50.0}}
+    assert second["NVDA"] == single == {"symbol": "NVDA", "price": 50.0}
+    assert set(redis.values) == {"AAPL", "MSFT", "NVDA"}
+
+
+async def test_batch_waits_for_symbols_another_node_is_refreshing(fakes, monkeypatch) -> None:
+    redis, alpaca = fakes
+    monkeypatch.setattr(settings, "quote_lock_ttl_ms", 100)
+    redis.locks["lock:market:AAPL"] = "other-node"
+    redis.locks["lock:market:TSLA"] = "dead-node"
+    service = QuoteService()
+
+    async def other_node() -> None:
+        await asyncio.sleep(0.03)
+        await redis.cache_market_data("AAPL", json.dumps({"symbol": "AAPL", "price": 7.0}), ttl=45)
+
+    quotes, _ = await asyncio.gather(service.get_quotes(["AAPL", "MSFT", "TSLA"]), other_node())
+
+    # MSFT was ours, AAPL came from the other node, TSLA's holder never wrote it
+    assert alpaca.batches == [["MSFT"], ["TSLA"]]
+    assert quotes["AAPL"]["price"] == 7.0
+    assert quotes["TSLA"]["price"] == 50.0
+    assert redis.locks == {"lock:market:AAPL": "other-node", "lock:market:TSLA": "dead-node"}
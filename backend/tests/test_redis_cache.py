@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import json
+
+from core.redis import RedisClient
+
+
+class FakePipeline:
+    def __init__(self, conn: "FakeConnection") -> None:
+        self.conn = conn
+        self.commands = []
+
+    async def __aenter__(self) -> "FakePipeline":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        pass
+
+    def get(self, key: str) -> None:
+        self.commands.append(lambda: self.conn.data.get(key))
+
+    def pttl(self, key: str) -> None:
+        self.commands.append(lambda: 30_000 if key in self.conn.data else -2)
+
+    def set(self, key: str, value: str, ex: int = None) -> None:
+        self.commands.append(lambda: self.conn.data.__setitem__(key, value))
+
+    async def execute(self) -> list:
+        self.conn.round_trips += 1
+        return [command() for command in self.commands]
+
+
+class FakeConnection:
+    def __init__(self) -> None:
+        self.data = {}
+        self.round_trips = 0
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:
+        return FakePipeline(self)
+
+    async def set(self, key: str, value: str, ex: int = None) -> None:
+        self.round_trips += 1
+        self.data[key] = value
+
+
+async def test_market_data_is_served_from_the_local_cache_until_invalidated() -> None:
+    client = RedisClient()
+    conn = client._client = FakeConnection()
+    conn.data["market:AAPL"] = json.dumps({"symbol": "AAPL", "price": 1.0})
+
+    first = await client.get_market_data("AAPL")
+    value, ttl = await client.get_market_data_with_ttl("AAPL")
+    assert first == value == {"symbol": "AAPL", "price": 1.0}
+    assert 29_000 < ttl <= 30_000
+    assert conn.round_trips == 1
+
+    # Another process rewrote it and published on prices:AAPL
+    conn.data["market:AAPL"] = json.dumps({"symbol": "AAPL", "price": 2.0})
+    client.invalidate_market_data("AAPL")
+    assert (await client.get_market_data("AAPL"))["price"] == 2.0
+
+    # Writes through this client drop the local copy too
+    await client.cache_market_data("AAPL", json.dumps({"symbol": "AAPL", "price": 3.0}))
+    values = await client.get_market_data_many(["AAPL", "MSFT"])
+    assert values == [{"symbol": "AAPL", "price": 3.0}, None]
+    assert conn.round_trips == 4
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import math
+import random
+
+from services.stock_snapshot import StockSnapshot, StockTable, build_table
+
+SECTORS = ["Technology", "Energy", "Health Care", None]
+
+
+def random_table(count: int) -> StockTable:
+    rng = random.Random(3)
+    prices = [rng.uniform(1, 500) for _ in range(count)]
+    return StockTable(
+        symbols=[f"S{i}" for i in range(count)],
+        names=[f"Company {i}" for i in range(count)],
+        price=prices,
+        volume=[rng.randint(0, 10**7) for _ in range(count)],
+        previous_close=[p * rng.uniform(0.9, 1.1) for p in prices],
+        sectors=[rng.choice(SECTORS) for _ in range(count)],
+        market_cap=[rng.choice([math.nan, rng.uniform(1e8, 1e12)]) for _ in range(count)],
+    )
+
+
+def test_screen_matches_a_row_by_row_filter() -> None:
+    table = random_table(2000)
+    ranges = {
+        "price": (20.0, 300.0),
+        "volume": (10**6, None),
+        "change_percent": (-2.0, 5.0),
+        "market_cap": (1e9, None),
+    }
+
+    rows = table.screen(ranges, sector="technology", limit=2000)
+
+    expected = [
+        r for r in range(len(table))
+        if 20 <= table.price[r] <= 300
+        and table.volume[r] >= 10**6
+        and -2 <= table.change_percent[r] <= 5
+        and table.market_cap[r] >= 1e9
+        and table.sector[r] >= 0 and table.sector_names[table.sector[r]] == "Technology"
+    ]
+    expected.sort(key=lambda r: -table.volume[r])
+    assert list(rows) == expected
+    assert list(table.screen(ranges, sector="technology", limit=5)) == expected[:5]
+
+
+def test_unknown_sector_matches_nothing() -> None:
+    assert len(random_table(100).screen({}, sector="Utilities")) == 0
+
+
+def test_build_table_reads_alpaca_snapshots_and_reference_data() -> None:
+    assets = [{"symbol": "AAPL", "name": "Apple Inc."}, {"symbol": "ZZZZ", "name": "No data"}]
+    snapshots = {"AAPL": {
+        "latestTrade": {"p": 110.0},
+        "dailyBar": {"c": 109.0, "v": 5000},
+        "prevDailyBar": {"c": 100.0},
+    }}
+    reference = {"AAPL": {"symbol": "AAPL", "sector": "Technology", "shares_outstanding": "1000"}}
+
+    table = build_table(assets, snapshots, reference)
+
+    assert len(table) == 1
+    assert table.record(0) == {
+        "symbol": "AAPL",
+        "name": "Apple Inc.",
+        "price": 110.0,
+        "change": 10.0,
+        "change_percent": 10.0,
+        "volume": 5000,
+        "market_cap": 110000.0,
+        "sector": "Technology",
+    }
+
+
+class FakeAlpaca:
+    def __init__(self) -> None:
+        self.asset_calls = 0
+        self.snapshot_calls = 0
+
+    async def get_assets(self) -> list:
+        self.asset_calls += 1
+        return [
+            {"symbol": "AAPL", "name": "Apple Inc.", "tradable": True},
+            {"symbol": "OLD", "name": "Delisted", "tradable": False},
+        ]
+
+    async def fetch_snapshots(self, symbols: list) -> dict:
+        self.snapshot_calls += 1
+        assert symbols == ["AAPL"]
+        return {"AAPL": {"latestTrade": {"p": 5.0}, "dailyBar": {"v": 10}, "prevDailyBar": {"c": 4.0}}}
+
+
+async def test_snapshot_refreshes_prices_more_often_than_assets() -> None:
+    alpaca = FakeAlpaca()
+    snapshot = StockSnapshot(alpaca, refresh_interval=0, universe_refresh_interval=3600)
+
+    first = await snapshot.screen(min_price=1)
+    await snapshot.refresh()
+
+    assert [r["symbol"] for r in first] == ["AAPL"]
+    assert first[0]["change_percent"] == 25.0
+    assert (alpaca.asset_calls, alpaca.snapshot_calls) == (1, 2)
+    assert snapshot.stats()["symbols"] == 1
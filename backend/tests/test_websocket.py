@@ -0,0 +1,458 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+from fastapi import WebSocketDisconnect
+from fastapi.websockets import WebSocketState
+
+from api import websocket as websocket_api
+from api.websocket import ConnectionManager
+from core.config import settings
+from core.pubsub import pubsub_hub
+from core.security import create_access_token
+from services.bar_feed import BarFeed
+from services.bar_resampler import empty_bars
+from services.ws_codec import DELTA_RECORD, FULL_RECORD, BinaryTickCodec, Tick
+
+
+class FakeWebSocket:
+    def __init__(self, slow: bool = False) -> None:
+        self.accepted = False
+        self.slow = slow
+        self.gate = None
+        self.client_state = WebSocketState.CONNECTED
+        self.sent = []
+        self.close_code = None
+
+    async def accept(self) -> None:
+        self.accepted = True
+
+    async def send_text(self, data: str) -> None:
+        if self.slow:
+            await asyncio.sleep(10)
+        if self.gate is not None:
+            await self.gate.wait()
+        self.sent.append(data)
+
+    async def send_bytes(self, data: bytes) -> None:
+        self.sent.append(data)
+
+    async def close(self, code: int = 1000, reason: str = "") -> None:
+        self.close_code = code
+
+
+def test_subscribe_tracks_both_directions():
+    manager = ConnectionManager()
+    ws = FakeWebSocket()
+
+    manager.subscribe_symbol(ws, "AAPL")
+    manager.subscribe_symbol(ws, "SPY")
+
+    assert manager.symbol_subscriptions == {"AAPL": {ws}, "SPY": {ws}}
+    assert manager.subscriptions.get(ws).symbols == {"AAPL", "SPY"}
+
+
+def test_unsubscribe_prunes_empty_symbols():
+    manager = ConnectionManager()
+    ws = FakeWebSocket()
+
+    manager.subscribe_symbol(ws, "AAPL")
+    manager.unsubscribe_symbol(ws, "AAPL")
+
+    assert "AAPL" not in manager.symbol_subscriptions
+    assert manager.subscriptions.get(ws).symbols == set()
+
+
+async def test_disconnect_only_removes_own_subscriptions():
+    manager = ConnectionManager()
+    first, second = FakeWebSocket(), FakeWebSocket()
+    await manager.connect(first, 1)
+    await manager.connect(second, 2)
+
+    manager.subscribe_symbol(first, "AAPL")
+    manager.subscribe_symbol(first, "TSLA")
+    manager.subscribe_symbol(second, "AAPL")
+
+    manager.disconnect(first, 1)
+
+    assert manager.symbol_subscriptions == {"AAPL": {second}}
+    assert manager.subscriptions.get(first) is None
+    assert 1 not in manager.active_connections
+    assert manager.active_connections == {2: {second}}
+
+
+async def test_broadcast_evicts_sockets_past_deadline(monkeypatch):
+    monkeypatch.setattr(settings, "ws_send_timeout", 0.01)
+    manager = ConnectionManager()
+    fast, slow = FakeWebSocket(), FakeWebSocket(slow=True)
+    await manager.connect(fast, 1)
+    await manager.connect(slow, 2)
+    manager.subscribe_symbol(fast, "SPY")
+    manager.subscribe_symbol(slow, "SPY")
+
+    await manager.broadcast_to_symbol("SPY", {"type": "quote", "symbol": "SPY"})
+    await asyncio.sleep(0)
+
+    assert [json.loads(frame) for frame in fast.sent] == [
+        {"seq": 1, "type": "quote", "symbol": "SPY"}
+    ]
+    assert manager.symbol_subscriptions == {"SPY": {fast}}
+    assert 2 not in manager.active_connections
+    assert slow.close_code == 1013
+    assert manager.broadcast_latency.snapshot()["count"] == 1
+
+
+async def test_outbox_conflates_quotes_and_keeps_alerts():
+    manager = ConnectionManager()
+    ws = FakeWebSocket()
+    ws.gate = asyncio.Event()
+    await manager.connect(ws, 1)
+    outbox = manager.open_outbox(ws)
+    outbox.maxsize = 2
+    manager.subscribe_symbol(ws, "AAPL")
+    manager.subscribe_symbol(ws, "TSLA")
+    manager.subscribe_symbol(ws, "SPY")
+
+    # The first write blocks on the gate, so everything after it queues
+    for price in (1, 2, 3):
+        await manager.broadcast_to_symbol("AAPL", {"type": "quote", "price": price})
+    await manager.broadcast_to_symbol("TSLA", {"type": "quote", "price": 10})
+    await manager.broadcast_to_symbol("SPY", {"type": "quote", "price": 20})
+    for n in range(3):
+        manager.queue_message(ws, {"type": "price_alert", "n": n})
+
+    assert len(outbox) == 5
+    assert (outbox.conflated, outbox.dropped) == (1, 1)
+
+    ws.gate.set()
+    await asyncio.sleep(0.01)
+    assert [json.loads(frame) for frame in ws.sent] == [
+        {"seq": 1, "type": "quote", "price": 1},
+        {"seq": 3, "type": "quote", "price": 3},
+        {"seq": 4, "type": "quote", "price": 10},
+        {"type": "price_alert", "n": 0},
+        {"type": "price_alert", "n": 1},
+        {"type": "price_alert", "n": 2},
+    ]
+    manager.disconnect(ws, 1)
+
+
+async def test_outbox_stall_evicts_socket(monkeypatch):
+    monkeypatch.setattr(settings, "ws_send_timeout", 0.01)
+    manager = ConnectionManager()
+    ws = FakeWebSocket(slow=True)
+    await manager.connect(ws, 1)
+    manager.open_outbox(ws)
+    manager.subscribe_symbol(ws, "SPY")
+
+    await manager.broadcast_to_symbol("SPY", {"type": "quote", "price": 1})
+    await asyncio.sleep(0.05)
+
+    assert manager.symbol_subscriptions == {}
+    assert manager.active_connections == {}
+    assert ws.close_code == 1013
+
+
+async def settle() -> None:
+    """Let started writes finish (eager on Python 3.12+, tasks before that)."""
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+class BrokenWebSocket(FakeWebSocket):
+    async def send_text(self, data: str) -> None:
+        raise RuntimeError("connection reset")
+
+
+async def test_failed_send_evicts_only_that_socket_mid_broadcast():
+    manager = ConnectionManager()
+    sockets = [FakeWebSocket(), BrokenWebSocket(), FakeWebSocket()]
+    for user_id, ws in enumerate(sockets):
+        await manager.connect(ws, 1 if user_id < 2 else 2)
+        manager.open_outbox(ws)
+        manager.subscribe_symbol(ws, "SPY")
+    healthy = [sockets[0], sockets[2]]
+
+    await manager.broadcast_to_symbol("SPY", {"type": "quote", "price": 1})
+    await settle()
+
+    assert manager.symbol_subscriptions == {"SPY": set(healthy)}
+    assert sockets[1].close_code == 1013
+    for ws in healthy:
+        assert [json.loads(frame) for frame in ws.sent] == [
+            {"seq": 1, "type": "quote", "price": 1}
+        ]
+
+    broken = BrokenWebSocket()
+    await manager.connect(broken, 2)
+    manager.open_outbox(broken)
+    assert await manager.deliver_to_user(2, '{"type":"price_alert"}') == 2
+    await settle()
+    assert manager.active_connections[2] == {sockets[2]}
+    assert json.loads(sockets[2].sent[-1]) == {"type": "price_alert"}
+
+
+async def test_pubsub_hub_routes_alerts_and_relayed_prices():
+    manager = websocket_api.manager
+    alerts, market = FakeWebSocket(), FakeWebSocket()
+    await manager.connect(alerts, 7)
+    await manager.connect(market, 8)
+    outbox = manager.open_outbox(alerts)
+
+    def deliver(channel, data):
+        outbox.put(data)
+
+    pubsub_hub.add("alerts:user:7", deliver)
+    manager.subscribe_symbol(market, "AAPL")
+
+    await pubsub_hub.dispatch({
+        "type": "pmessage",
+        "pattern": "alerts:user:*",
+        "channel": "alerts:user:7",
+        "data": '{"type":"arbitrage"}',
+    })
+    await pubsub_hub.dispatch({
+        "type": "message",
+        "channel": "prices:AAPL",
+        "data": '{"type":"price_update","symbol":"AAPL"}',
+    })
+
+    assert alerts.sent == ['{"type":"arbitrage"}']
+    [frame] = market.sent
+    assert frame.startswith('{"seq":')
+    assert frame.endswith(',"type":"price_update","symbol":"AAPL"}')
+
+    pubsub_hub.remove("alerts:user:7", deliver)
+    manager.disconnect(alerts, 7)
+    manager.disconnect(market, 8)
+
+
+async def test_price_relay_follows_symbol_refcount():
+    manager = websocket_api.manager
+    first, second = FakeWebSocket(), FakeWebSocket()
+    await manager.connect(first, 1)
+    await manager.connect(second, 2)
+
+    manager.subscribe_symbol(first, "NVDA")
+    manager.subscribe_symbol(second, "NVDA")
+    assert "prices:NVDA" in pubsub_hub.channels
+
+    manager.unsubscribe_symbol(first, "NVDA")
+    assert "prices:NVDA" in pubsub_hub.channels
+
+    manager.disconnect(second, 2)
+    assert "prices:NVDA" not in pubsub_hub.channels
+    manager.disconnect(first, 1)
+
+
+async def test_binary_clients_get_full_then_delta_records():
+    manager = ConnectionManager()
+    binary, text = FakeWebSocket(), FakeWebSocket()
+    await manager.connect(binary, 1)
+    await manager.connect(text, 2)
+    codec = BinaryTickCodec()
+    manager.open_outbox(binary, codec=codec)
+    manager.open_outbox(text)
+    assert codec.assign_ids(["SPY"]) == {"SPY": 1}
+    manager.subscribe_symbol(binary, "SPY")
+    manager.subscribe_symbol(text, "SPY")
+
+    for price, ts in ((512.25, "2026-01-25T10:00:00Z"), (512.5, "2026-01-25T10:00:01Z")):
+        await manager.broadcast_to_symbol("SPY", {
+            "type": "quote",
+            "symbol": "SPY",
+            "data": {"price": price, "bid": price - 0.01, "ask": price, "timestamp": ts},
+        })
+    await settle()
+
+    first, second = binary.sent
+    assert FULL_RECORD.unpack(first)[:2] == (0x01, 1)
+    assert FULL_RECORD.unpack(first)[3] == 5_122_500
+    assert DELTA_RECORD.unpack(second) == (0x02, 1, 1000, 2500, 2500, 2500)
+    assert [json.loads(frame)["data"]["price"] for frame in text.sent] == [512.25, 512.5]
+
+    manager.disconnect(binary, 1)
+    manager.disconnect(text, 2)
+
+
+def test_symbols_past_the_16_bit_id_space_are_sent_with_id_zero():
+    codec = BinaryTickCodec()
+    codec.assign_ids([f"S{n}" for n in range(0xFFFE)])
+
+    assert codec.assign_ids(["S1", "LAST", "EXTRA"]) == {"LAST": 0xFFFF}
+    tick = Tick(symbol="EXTRA", ts_ms=1, price=2, bid=2, ask=2)
+    assert FULL_RECORD.unpack(codec.encode(tick))[:2] == (0x01, 0)
+    assert FULL_RECORD.unpack(codec.encode(tick._replace(symbol="LAST")))[:2] == (0x01, 0xFFFF)
+
+
+async def test_batch_window_coalesces_updates_into_one_frame():
+    manager = ConnectionManager()
+    ws = FakeWebSocket()
+    await manager.connect(ws, 1)
+    outbox = manager.open_outbox(ws)
+    outbox.set_batch_window(0.02)
+    manager.subscribe_symbol(ws, "AAPL")
+    manager.subscribe_symbol(ws, "TSLA")
+
+    for price in (1, 2, 3):
+        await manager.broadcast_to_symbol("AAPL", {"type": "quote", "price": price})
+    await manager.broadcast_to_symbol("TSLA", {"type": "quote", "price": 10})
+    assert ws.sent == []
+
+    await asyncio.sleep(0.05)
+    assert [json.loads(frame) for frame in ws.sent] == [
+        {
+            "type": "batch",
+            "messages": [
+                {"seq": 3, "type": "quote", "price": 3},
+                {"seq": 4, "type": "quote", "price": 10},
+            ],
+        }
+    ]
+    manager.disconnect(ws, 1)
+
+
+def test_batch_ms_is_clamped_and_non_numbers_rejected(monkeypatch):
+    monkeypatch.setattr(settings, "ws_max_batch_ms", 1000)
+
+    assert websocket_api.batch_window(50) == 0.05
+    assert websocket_api.batch_window("250") == 0.25
+    assert websocket_api.batch_window(-10) == 0
+    assert websocket_api.batch_window(10**12) == 1.0
+    for value in ("fast", None, [50], True, float("inf"), float("nan")):
+        assert websocket_api.batch_window(value) is None
+
+
+def test_last_seq_must_map_symbols_to_whole_numbers():
+    wanted = {"AAPL", "MSFT"}
+
+    assert websocket_api.resume_points(None, wanted) == {}
+    assert websocket_api.resume_points({"aapl": 41, "MSFT": "7", "TSLA": "x"}, wanted) == {"AAPL": 41, "MSFT": 7}
+    for value in ([41], "41", {"AAPL": None}, {"AAPL": "next"}, {"AAPL": -1}, {"AAPL": True}):
+        assert websocket_api.resume_points(value, wanted) is None
+
+
+class ScriptedWebSocket(FakeWebSocket):
+    """Receives ``frames`` in order, then disconnects."""
+
+    def __init__(self, frames: list) -> None:
+        super().__init__()
+        self.frames = list(frames)
+
+    async def receive_json(self):
+        await asyncio.sleep(0.01)
+        if not self.frames:
+            raise WebSocketDisconnect()
+        return self.frames.pop(0)
+
+
+class FakeBarStore:
+    async def get_bars(self, symbol, timeframe, limit):
+        return empty_bars()
+
+
+async def run_market_socket(monkeypatch, frames: list):
+    manager = ConnectionManager()
+    feed = BarFeed(FakeBarStore(), manager.queue_message)
+    monkeypatch.setattr(websocket_api, "manager", manager)
+    monkeypatch.setattr(websocket_api, "bar_feed", feed)
+    monkeypatch.setattr(websocket_api, "bar_store", FakeBarStore())
+    ws = ScriptedWebSocket(frames)
+    # (symbol, frames still to come) per quote unsubscription
+    unsubscribed = []
+    manager.on_symbol_removed.append(lambda symbol: unsubscribed.append((symbol, len(ws.frames))))
+
+    await websocket_api.websocket_market(ws, token=create_access_token(data={"sub": "1"}), encoding="json")
+    return [json.loads(frame) for frame in ws.sent], unsubscribed
+
+
+async def test_bad_chart_frames_get_an_error_and_keep_the_socket(monkeypatch):
+    sent, _ = await run_market_socket(monkeypatch, [
+        {"action": "chart", "symbol": "AAPL", "limit": "lots"},
+        {"action": "chart", "symbol": "AAPL", "timeframe": ["1D"]},
+        {"action": "unchart", "symbol": "AAPL", "timeframe": ["1D"]},
+        {"action": "chart", "symbol": "AAPL", "timeframe": "5Min", "limit": "20"},
+    ])
+
+    assert [frame["type"] for frame in sent] == ["error", "error", "bars"]
+
+
+async def test_closing_the_last_chart_drops_quotes_unless_subscribed(monkeypatch):
+    _, unsubscribed = await run_market_socket(monkeypatch, [
+        {"action": "chart", "symbol": "AAPL", "timeframe": "5Min"},
+        {"action": "chart", "symbol": "AAPL", "timeframe": "1D"},
+        {"action": "unchart", "symbol": "AAPL", "timeframe": "5Min"},
+        {"action": "subscribe", "symbols": ["MSFT"]},
+        {"action": "chart", "symbol": "MSFT", "timeframe": "1D"},
+        {"action": "unchart", "symbol": "MSFT", "timeframe": "1D"},
+        {"action": "unchart", "symbol": "AAPL", "timeframe": "1D"},
+        {"action": "subscribe", "symbols": ["TSLA"]},
+        {"action": "chart", "symbol": "TSLA", "timeframe": "1D"},
+        {"action": "unsubscribe", "symbols": ["TSLA"]},
+    ])
+
+    # Only AAPL goes before the disconnect releases the rest
+    assert unsubscribed[0] == ("AAPL", 3)
+    assert sorted(unsubscribed[1:]) == [("MSFT", 0), ("TSLA", 0)]
+
+
+async def test_personal_message_is_routed_to_other_nodes_in_cluster_mode():
+    class FakePresence:
+        def __init__(self):
+            self.routed = []
+
+        async def route(self, user_id, payload):
+            self.routed.append((user_id, payload))
+            return 1
+
+    manager = ConnectionManager()
+    manager.presence = FakePresence()
+    ws = FakeWebSocket()
+    await manager.connect(ws, 5)
+
+    await manager.send_personal_message({"type": "price_alert"}, 5)
+
+    assert ws.sent == ['{"type":"price_alert"}']
+    assert manager.presence.routed == [(5, '{"type":"price_alert"}')]
+
+
+async def test_reconnecting_client_gets_the_gap_or_a_snapshot(monkeypatch):
+    monkeypatch.setattr(settings, "ws_replay_size", 3)
+    manager = ConnectionManager()
+    channel = "alerts:user:5"
+    for n in range(2):
+        manager.relay_channel(channel, json.dumps({"type": "arbitrage", "n": n}))
+    epoch, seen = manager.replay.epoch, manager.replay.last_seq(channel)
+
+    # Sent while the client was away
+    for n in range(2, 4):
+        manager.relay_channel(channel, json.dumps({"type": "arbitrage", "n": n}))
+
+    ws = FakeWebSocket()
+    await manager.connect(ws, 5)
+    manager.open_outbox(ws)
+    assert manager.resume_channel(ws, channel, epoch, seen)
+    await settle()
+    [replay] = [json.loads(frame) for frame in ws.sent]
+    assert replay["type"] == "replay"
+    assert [m["n"] for m in replay["messages"]] == [2, 3]
+    assert replay["seq"] == replay["messages"][-1]["seq"]
+
+    # Older than the ring (or from another process): one snapshot instead
+    ws.sent.clear()
+    assert not manager.resume_channel(ws, channel, epoch, 0)
+    assert not manager.resume_channel(ws, channel, "other-node", seen)
+    await settle()
+    snapshots = [json.loads(frame) for frame in ws.sent]
+    assert [s["type"] for s in snapshots] == ["snapshot", "snapshot"]
+    assert [m["n"] for m in snapshots[0]["messages"]] == [1, 2, 3]
+
+    # Live frames resume after the replay
+    ws.sent.clear()
+    manager.join_channel(ws, channel)
+    manager.relay_channel(channel, json.dumps({"type": "arbitrage", "n": 4}))
+    await settle()
+    assert json.loads(ws.sent[0])["seq"] > replay["seq"]
+    manager.leave_channel(ws, channel)
+    manager.disconnect(ws, 5)
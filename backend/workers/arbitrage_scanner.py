@@ -0,0 +1,149 @@
+"""Kalshi/Polymarket arbitrage scanner, publishing to the arbitrage alerts topic."""
+
+import asyncio
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+from aiokafka import AIOKafkaProducer
+
+from core.config import settings
+from core.redis import redis_client
+from services.arbitrage_engine import OPPORTUNITIES_KEY, ArbitrageEngine
+from services.kalshi_service import kalshi_client
+from services.kalshi_snapshot import KalshiSnapshot
+from services.polymarket_service import polymarket_client
+
+
+class ArbitrageScanner:
+    """
+    Keeps Kalshi and Polymarket books in an ArbitrageEngine and announces
+    pairs whose fee-adjusted edge is new or growing on the arbitrage alerts
+    topic.
+
+    Kalshi prices come from a KalshiSnapshot refreshing every
+    KALSHI_SNAPSHOT_INTERVAL seconds, Polymarket prices from polling every
+    POLYMARKET_POLL_INTERVAL seconds. Each refresh only re-evaluates the
+    pairs whose price changed.
+    """
+
+    def __init__(self) -> None:
+        self.engine = ArbitrageEngine(
+            min_edge=float(os.getenv("ARBITRAGE_MIN_EDGE", "0")),
+        )
+        self.kalshi = KalshiSnapshot(
+            kalshi_client,
+            refresh_interval=float(os.getenv("KALSHI_SNAPSHOT_INTERVAL", "30")),
+            max_pages=int(os.getenv("KALSHI_SNAPSHOT_MAX_PAGES", "100")),
+        )
+        self.polymarket = polymarket_client
+        self.poll_interval = float(os.getenv("POLYMARKET_POLL_INTERVAL", "10"))
+        self.producer: Optional[AIOKafkaProducer] = None
+        self._pending: List[Dict[str, Any]] = []
+        self._changed = asyncio.Event()
+        self._running = False
+
+    async def start(self) -> None:
+        """Start the Kafka producer and the Kalshi snapshot."""
+        self.producer = AIOKafkaProducer(
+            bootstrap_servers=settings.kafka_bootstrap_servers,
+            value_serializer=lambda v: json.dumps(v).encode("utf-8"),
+        )
+        await self.producer.start()
+
+        self.kalshi.add_listener(self._on_kalshi)
+        await self.kalshi.start()
+        self._running = True
+
+        print(f"✅ Arbitrage Scanner started, publishing to: {settings.kafka_topic_alerts}")
+
+    async def stop(self) -> None:
+        """Stop polling and publishing."""
+        self._running = False
+        await self.kalshi.stop()
+        await self.polymarket.close()
+        await kalshi_client.close()
+        if self.producer:
+            await self.producer.stop()
+        print("🛑 Arbitrage Scanner stopped")
+
+    def _on_kalshi(self, markets: List[Dict[str, Any]]) -> None:
+        open_tickers = {m["id"] for m in markets}
+        self.engine.remove_kalshi([t for t in self.engine.kalshi if t not in open_tickers])
+        self._queue(self.engine.update_kalshi(markets))
+
+    def _queue(self, opportunities: List[Dict[str, Any]]) -> None:
+        self._pending.extend(opportunities)
+        self._changed.set()
+
+    async def poll_polymarket(self) -> None:
+        """Poll Polymarket prices forever."""
+        while self._running:
+            try:
+                contracts, complete = await self.polymarket.get_contracts()
+                self._queue(self.engine.update_polymarket(contracts, complete))
+            except Exception as e:
+                print(f"⚠️ Polymarket poll failed: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    @staticmethod
+    def to_alert(opportunity: Dict[str, Any]) -> Dict[str, Any]:
+        """Message for ArbitrageAlertConsumer."""
+        kalshi_yes = opportunity["kalshi"]["yes"]
+        poly_yes = opportunity["polymarket"]["yes"]
+        cheaper = "Kalshi" if kalshi_yes < poly_yes else "Polymarket"
+        return {
+            "type": "arbitrage",
+            "symbol": opportunity["id"],
+            "description": (
+                f"{opportunity['event']}: YES {kalshi_yes:.2f} on Kalshi vs "
+                f"{poly_yes:.2f} on Polymarket, buy YES on {cheaper}"
+            ),
+            # Dollars per $100 of payout from buying both sides, after fees
+            "potential_profit": opportunity["edge"],
+            "confidence": {"High": 0.9, "Medium": 0.75, "Low": 0.6}[opportunity["confidence"]],
+            "target_users": "all",
+            "opportunity": opportunity,
+        }
+
+    async def publish(self) -> None:
+        """Publish queued opportunities and the current set, whenever they change."""
+        while self._running:
+            await self._changed.wait()
+            self._changed.clear()
+            pending, self._pending = self._pending, []
+
+            try:
+                for opportunity in pending:
+                    await self.producer.send_and_wait(
+                        settings.kafka_topic_alerts, self.to_alert(opportunity)
+                    )
+                await redis_client.set(
+                    OPPORTUNITIES_KEY,
+                    json.dumps(self.engine.top(100)),
+                    expire=int(self.kalshi.refresh_interval * 4),
+                )
+            except Exception as e:
+                print(f"⚠️ Failed to publish arbitrage opportunities: {e}")
+
+    async def run(self) -> None:
+        """Main scanner loop."""
+        await self.start()
+        try:
+            await asyncio.gather(self.poll_polymarket(), self.publish())
+        except Exception as e:
+            print(f"Scanner error: {e}")
+        finally:
+            await self.stop()
+
+
+async def run_arbitrage_scanner() -> None:
+    """Entry point for running the scanner."""
+    await redis_client.connect()
+
+    scanner = ArbitrageScanner()
+    await scanner.run()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_arbitrage_scanner())